@@ -30,6 +30,12 @@ class NPVSettings(BaseModel):
     custom_rate: Optional[float] = None
 
 
+class RateCurveSettings(BaseModel):
+    maturities: List[int]  # Knot maturities in days
+    base_rates: List[float]
+    reinvest_rates: List[float]
+
+
 class OptimizationSettings(BaseModel):
     optimization_method: str = Field(default="classic")
     selected_strategies: List[str] = Field(default=["equal", "increasing", "decreasing", "middle_weighted"])
@@ -41,10 +47,21 @@ class OptimizationSettings(BaseModel):
     additional_days_for_class_b: int = Field(default=10)
     class_b_percent_deviation: float = Field(default=1.0)  # New field with tighter default value
     selected_default_model: str = Field(default="previous")  # Added field for default model selection
+    rate_curve: Optional[RateCurveSettings] = Field(default=None)  # Class A rate table; default: the selected model's table
+    rate_interpolation: str = Field(default="nearest")  # Rates between curve knots: "nearest", "step" or "linear"
+    nominal_solver: str = Field(default="heuristic")  # "heuristic" or "newton" Class A nominal scaling
+    num_workers: Optional[int] = Field(default=1)  # Worker processes for the grid search and GA fitness (<= 0: all cores)
+    max_seconds: Optional[float] = Field(default=None)  # Wall-clock budget; the best-so-far result is returned as partial
+    max_evaluations: Optional[int] = Field(default=None)  # Structure evaluation budget, same partial result
     
     # Evolutionary algorithm parameters
     population_size: Optional[int] = Field(default=50)
     num_generations: Optional[int] = Field(default=40)
+    random_seed: Optional[int] = Field(default=None)  # Seed for reproducible genetic and Bayesian runs
+    
+    # Bayesian optimization parameters (experimental method)
+    evaluation_budget: Optional[int] = Field(default=60)  # Structure evaluations of the Bayesian search
+    bayesian_surrogate: Optional[str] = Field(default="GP")  # skopt surrogate: "GP", "RF", "ET" or "GBRT"
 
 
 class CalculationRequest(BaseModel):
@@ -81,4 +98,49 @@ class ScenarioParameters(BaseModel):
 
 class StressTestRequest(BaseModel):
     structure: StructureParameters
-    scenario: ScenarioParameters
\ No newline at end of file
+    scenario: ScenarioParameters
+
+
+class StressGridAxis(BaseModel):
+    start: float
+    stop: float
+    steps: int = Field(default=1)  # Evenly spaced values from start to stop
+
+
+class StressGridRequest(BaseModel):
+    structure: StructureParameters
+    npl_rate: StressGridAxis
+    prepayment_rate: StressGridAxis
+    reinvestment_shift: StressGridAxis = Field(default_factory=lambda: StressGridAxis(start=0.0, stop=0.0))
+
+
+class StressDistribution(BaseModel):
+    distribution: str = Field(default="fixed")  # fixed | uniform | normal | triangular
+    value: float = 0.0  # Fixed value, normal mean or triangular mode
+    std: float = 0.0  # Normal standard deviation
+    low: Optional[float] = None  # Uniform/triangular bounds, clip bounds for normal
+    high: Optional[float] = None
+
+
+class MonteCarloRequest(BaseModel):
+    structure: StructureParameters
+    npl_rate: StressDistribution
+    prepayment_rate: StressDistribution
+    reinvestment_shift: StressDistribution = Field(default_factory=StressDistribution)
+    paths: int = Field(default=1000)
+    seed: Optional[int] = None
+    min_buffer: float = Field(default=5.0)  # Breach threshold for min_buffer_actual
+    num_workers: Optional[int] = Field(default=0)  # Worker threads for path chunks (<= 0: all cores)
+
+
+class BreakevenRequest(BaseModel):
+    structure: StructureParameters
+    min_buffer: float = Field(default=5.0)  # Threshold for min_buffer_actual
+    factors: List[str] = Field(default_factory=lambda: ["npl_rate", "prepayment_rate", "reinvestment_shift"])
+    # Stress levels held fixed while another factor is solved
+    npl_rate: float = 0.0
+    prepayment_rate: float = 0.0
+    reinvestment_shift: float = 0.0
+    max_reinvestment_shift: float = Field(default=50.0)  # Reinvestment rates are searched down by at most this
+    tolerance: float = Field(default=0.01)  # Width of the final bracket in percentage points
+    max_iterations: int = Field(default=50)
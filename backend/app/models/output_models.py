@@ -39,4 +39,18 @@ class OptimizationResult(BaseModel):
     last_cash_flow_day: int
     additional_days: int
     results_by_strategy: Dict[str, Dict[str, Any]]
-    class_b_percent: Optional[float] = None  # Optional field for Class B percentage
\ No newline at end of file
+    class_b_percent: Optional[float] = None  # Optional field for Class B percentage
+    solver_stats: Optional[Dict[str, Any]] = None  # Class A nominal solver convergence statistics
+    search_stats: Optional[Dict[str, Any]] = None  # Search statistics (branch-and-bound node counts, Bayesian evaluations)
+    is_partial: bool = False  # Run cancelled or out of budget: best structure found before stopping
+    stop_reason: Optional[str] = None  # "cancelled", "max_seconds" or "max_evaluations" for partial results
+    from_cache: bool = False  # Served from the persistent result cache
+
+class OptimizationJobInfo(BaseModel):
+    job_id: str
+    method: str
+    status: str  # queued, running, completed, failed or cancelled
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
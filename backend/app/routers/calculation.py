@@ -1,26 +1,48 @@
 # backend/app/routers/calculation.py
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from app.models.input_models import CalculationRequest
 from app.models.output_models import CalculationResult, CashFlowSummary
 from app.services.calculation_service import perform_calculation, load_excel_data
+from app.utils.cash_flow_utils import build_daily_ledger
+from app.utils.evaluation_cache import evaluation_cache, dataset_fingerprint
+from app.utils.result_cache import result_cache
+from app.services.stress_testing_service import stress_baseline_cache
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import io
 
 router = APIRouter()
 
 # Global variable to store the dataframe after upload
 # In a production app, you would use a database or Redis cache instead
-df_store = {"df": None}
+df_store = {"df": None, "ledger": None}
+
+
+def get_engine_data() -> Optional[pd.DataFrame]:
+    """Return the per-day ledger for the calculation engines, or the raw tape if no ledger exists."""
+    ledger = df_store.get("ledger")
+    return ledger if ledger is not None else df_store.get("df")
 
 @router.post("/upload-excel/", response_model=CashFlowSummary)
-async def upload_excel(file: UploadFile = File(...)):
+async def upload_excel(
+    file: UploadFile = File(...),
+    holidays: Optional[str] = Form(None)
+):
     try:
         contents = await file.read()
-        df = load_excel_data(contents)
+        # Optional comma separated holiday list (YYYY-MM-DD) for reinvestment dates
+        holiday_list = [h.strip() for h in holidays.split(",") if h.strip()] if holidays else None
+        df = load_excel_data(contents, holiday_list)
         
         # Store the dataframe in memory for later use
         df_store["df"] = df
+        # Daily ledger used by calculation, optimization and stress engines
+        df_store["ledger"] = build_daily_ledger(df)
+        # Önceki verinin değerlendirme sonuçları artık kullanılmaz
+        evaluation_cache.clear()
+        stress_baseline_cache.clear()
+        # Kayıtlı optimizasyon sonuçlarından yalnızca bu veri setininkiler tutulur
+        result_cache.invalidate(keep_dataset=dataset_fingerprint(df_store["ledger"]))
         
         # Return summary data
         return CashFlowSummary(
@@ -37,8 +59,8 @@ async def upload_excel(file: UploadFile = File(...)):
 @router.post("/calculate/", response_model=CalculationResult)
 async def calculate(request: CalculationRequest):
     try:
-        # Get the stored dataframe
-        df = df_store.get("df")
+        # Get the stored daily ledger
+        df = get_engine_data()
         if df is None:
             raise HTTPException(status_code=400, detail="No data found. Please upload Excel file first.")
         
@@ -46,4 +68,14 @@ async def calculate(request: CalculationRequest):
         result = perform_calculation(df, request)
         return result
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+
+@router.get("/evaluation-cache/stats/")
+async def get_evaluation_cache_stats():
+    """Hit, miss and eviction counters and memory use of the evaluation cache."""
+    return evaluation_cache.stats()
+
+@router.get("/result-cache/stats/")
+async def get_result_cache_stats():
+    """Hit and miss counters and size of the persistent optimization result cache."""
+    return result_cache.stats()
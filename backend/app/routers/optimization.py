@@ -2,18 +2,24 @@ import time
 import traceback
 import logging
 import asyncio
-from fastapi.responses import JSONResponse
-from fastapi import APIRouter, HTTPException, Path
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi import APIRouter, HTTPException, Path, Query
 from app.models.input_models import OptimizationSettings, GeneralSettings
-from app.models.output_models import OptimizationResult
+from app.models.output_models import OptimizationResult, OptimizationJobInfo
 
 # Import the optimization_progress object and all optimization functions
 from app.services.optimization_service import (
     optimization_progress,  # Import the progress tracker
+    shared_optimization_progress,
     perform_optimization, 
-    perform_genetic_optimization
+    perform_genetic_optimization,
+    perform_branch_and_bound_optimization,
+    perform_bayesian_optimization,
+    cancel_active_runs
 )
-from app.routers.calculation import df_store  # Import the shared dataframe store
+from app.services.job_service import job_manager, JobNotFoundError, JobQueueFullError, RUNNING, QUEUED, FAILED
+from app.routers.calculation import get_engine_data  # Shared daily ledger
+from app.utils.progress_stream import stream_progress, DEFAULT_MAX_RATE
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -30,7 +36,7 @@ async def optimize_classic(
         optimization_progress.reset()
         
         # Get the stored dataframe
-        df = df_store.get("df")
+        df = get_engine_data()
         if df is None:
             raise HTTPException(status_code=400, detail="No data found. Please upload Excel file first.")
         
@@ -81,7 +87,7 @@ async def optimize_genetic(
         # Reset progress tracker
         optimization_progress.reset()
         
-        df = df_store.get("df")
+        df = get_engine_data()
         if df is None:
             raise HTTPException(status_code=400, detail="No data found. Please upload Excel file first.")
         
@@ -122,7 +128,106 @@ async def optimize_genetic(
         
         raise HTTPException(status_code=500, detail=f"Genetic optimization error: {str(e)}")
 
-# Backward compatibility main endpoint - updated to only support classic and genetic
+@router.post("/optimize/branch-and-bound/", response_model=OptimizationResult)
+async def optimize_branch_and_bound(
+    optimization_settings: OptimizationSettings,
+    general_settings: GeneralSettings
+):
+    try:
+        # Reset progress tracker
+        optimization_progress.reset()
+        
+        df = get_engine_data()
+        if df is None:
+            raise HTTPException(status_code=400, detail="No data found. Please upload Excel file first.")
+        
+        logger.info(f"Starting branch and bound optimization with parameters: {optimization_settings}")
+        logger.info(f"Using default model: {optimization_settings.selected_default_model}")
+        
+        # Perform the optimization in a separate thread
+        def run_optimization():
+            return perform_branch_and_bound_optimization(df, general_settings, optimization_settings)
+        
+        # Run the CPU-bound optimization task in a thread pool
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(None, run_optimization)
+        
+        logger.info(f"Branch and bound optimization completed successfully: {result.search_stats}")
+        
+        optimization_progress.update(
+            step=100,
+            phase="Complete",
+            message="Optimization completed successfully"
+        )
+        
+        return result
+    except Exception as e:
+        logger.error(f"Branch and bound optimization error: {str(e)}")
+        logger.error(traceback.format_exc())
+        
+        # Update progress tracker in case of error (don't reset)
+        optimization_progress.update(
+            phase="Error",
+            message=f"Branch and bound optimization error: {str(e)}",
+            step=100
+        )
+        
+        raise HTTPException(status_code=500, detail=f"Branch and bound optimization error: {str(e)}")
+
+@router.post("/optimize/bayesian/", response_model=OptimizationResult)
+async def optimize_bayesian(
+    optimization_settings: OptimizationSettings,
+    general_settings: GeneralSettings
+):
+    """
+    Experimental: Bayesian search of the genetic algorithm's structure space.
+
+    Finds good structures in few evaluations, but within the evaluation budget
+    it does not reach the best score of the genetic algorithm
+    (see benchmarks/bench_bayesian.py); use the genetic method for final structures.
+    """
+    try:
+        # Reset progress tracker
+        optimization_progress.reset()
+        
+        df = get_engine_data()
+        if df is None:
+            raise HTTPException(status_code=400, detail="No data found. Please upload Excel file first.")
+        
+        logger.info(f"Starting Bayesian optimization with parameters: {optimization_settings}")
+        logger.info(f"Using default model: {optimization_settings.selected_default_model}")
+        
+        # Perform the optimization in a separate thread
+        def run_optimization():
+            return perform_bayesian_optimization(df, general_settings, optimization_settings)
+        
+        # Run the CPU-bound optimization task in a thread pool
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(None, run_optimization)
+        
+        logger.info(f"Bayesian optimization completed successfully: {result.search_stats}")
+        
+        optimization_progress.update(
+            step=100,
+            phase="Complete",
+            message="Optimization completed successfully"
+        )
+        
+        return result
+    except Exception as e:
+        logger.error(f"Bayesian optimization error: {str(e)}")
+        logger.error(traceback.format_exc())
+        
+        # Update progress tracker in case of error (don't reset)
+        optimization_progress.update(
+            phase="Error",
+            message=f"Bayesian optimization error: {str(e)}",
+            step=100
+        )
+        
+        raise HTTPException(status_code=500, detail=f"Bayesian optimization error: {str(e)}")
+
+# Backward compatibility main endpoint - classic, genetic, branch_and_bound and bayesian
 @router.post("/optimize/", response_model=OptimizationResult)
 async def optimize(
     optimization_settings: OptimizationSettings,
@@ -137,18 +242,14 @@ async def optimize(
     
     # Add timeout handling
     try:
-        # Sınırlı kombinasyon sayısı ve iterasyon
-        if hasattr(optimization_settings, "maturity_range") and len(optimization_settings.maturity_range) == 2:
-            # İşlem süresini azaltmak için parametreleri sınırla
-            range_diff = optimization_settings.maturity_range[1] - optimization_settings.maturity_range[0]
-            if range_diff > 200 and optimization_settings.maturity_step < 15:
-                logger.warning(f"Large maturity range ({range_diff}) with small step ({optimization_settings.maturity_step}). Adjusting step.")
-                optimization_settings.maturity_step = max(15, optimization_settings.maturity_step)
-        
         if method == "classic":
             return await optimize_classic(optimization_settings, general_settings)
         elif method == "genetic":
             return await optimize_genetic(optimization_settings, general_settings)
+        elif method == "branch_and_bound":
+            return await optimize_branch_and_bound(optimization_settings, general_settings)
+        elif method == "bayesian":
+            return await optimize_bayesian(optimization_settings, general_settings)
         else:
             # Default to classic method for any unsupported types
             logger.warning(f"Unknown optimization method: {method}, defaulting to classic")
@@ -166,10 +267,110 @@ async def optimize(
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Optimization error: {str(e)}")
 
+@router.post("/optimize/cancel/")
+async def cancel_optimization():
+    """Stop the running direct optimizations; they return their best-so-far result flagged partial"""
+    cancelled = cancel_active_runs()
+    if cancelled:
+        optimization_progress.update(message="Cancellation requested, finishing with the best structure so far...")
+    return {"cancelled_runs": cancelled}
+
 @router.get("/optimize/progress/")
 async def get_optimization_progress():
     """Get the current status of the optimization process"""
     # İlerleme sıfırlanmış olabileceğinden force_update
     progress_data = optimization_progress.get_info()
     logger.debug(f"Progress data: {progress_data}")  # Debugging için loglama ekleyin
-    return progress_data
\ No newline at end of file
+    return progress_data
+
+# Headers keeping proxies from buffering server-sent events
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+@router.get("/optimize/progress/stream")
+async def stream_optimization_progress(
+    max_rate: float = Query(DEFAULT_MAX_RATE, gt=0, le=50, description="Maximum events per second")
+):
+    """
+    Progress of the direct optimizations as server-sent events.
+    
+    Pushes the /optimize/progress/ payload, including the best-so-far Class B
+    coupon rate and percent, whenever it changes, coalesced to at most
+    max_rate events per second.
+    """
+    tracker = shared_optimization_progress
+    return StreamingResponse(
+        stream_progress(tracker.stream, tracker.get_info(), max_rate=max_rate),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+# Background optimization jobs: each job has its own progress tracker and
+# result, so concurrent optimizations do not overwrite each other
+@router.post("/optimize/jobs", response_model=OptimizationJobInfo, status_code=202)
+async def create_optimization_job(
+    optimization_settings: OptimizationSettings,
+    general_settings: GeneralSettings
+):
+    """Queue an optimization with optimization_settings.optimization_method and return its job id"""
+    df = get_engine_data()
+    if df is None:
+        raise HTTPException(status_code=400, detail="No data found. Please upload Excel file first.")
+    
+    try:
+        job = job_manager.submit(df, general_settings, optimization_settings)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return job.info()
+
+def _get_job(job_id: str):
+    try:
+        return job_manager.get(job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Optimization job not found: {job_id}")
+
+@router.get("/optimize/jobs/{job_id}", response_model=OptimizationJobInfo)
+async def get_optimization_job(job_id: str = Path(..., description="Optimization job id")):
+    """Status of an optimization job"""
+    return _get_job(job_id).info()
+
+@router.get("/optimize/jobs/{job_id}/progress")
+async def get_optimization_job_progress(job_id: str = Path(..., description="Optimization job id")):
+    """Progress of an optimization job, in the format of /optimize/progress/"""
+    job = _get_job(job_id)
+    return {**job.progress.get_info(), "job_id": job.job_id, "status": job.status}
+
+@router.get("/optimize/jobs/{job_id}/progress/stream")
+async def stream_optimization_job_progress(
+    job_id: str = Path(..., description="Optimization job id"),
+    max_rate: float = Query(DEFAULT_MAX_RATE, gt=0, le=50, description="Maximum events per second")
+):
+    """Progress of an optimization job as server-sent events, ending when the job finishes"""
+    job = _get_job(job_id)
+    return StreamingResponse(
+        stream_progress(job.progress.stream, job.progress.get_info(), max_rate=max_rate,
+                        finished=lambda: job.finished),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+@router.get("/optimize/jobs/{job_id}/result", response_model=OptimizationResult)
+async def get_optimization_job_result(job_id: str = Path(..., description="Optimization job id")):
+    """Result of a completed optimization job"""
+    job = _get_job(job_id)
+    if job.status in (QUEUED, RUNNING):
+        raise HTTPException(status_code=409, detail=f"Optimization job {job_id} is {job.status}")
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=f"Optimization error: {job.error}")
+    if job.result is None:
+        raise HTTPException(status_code=409, detail=f"Optimization job {job_id} is {job.status}")
+    return job.result
+
+@router.delete("/optimize/jobs/{job_id}", response_model=OptimizationJobInfo)
+async def delete_optimization_job(job_id: str = Path(..., description="Optimization job id")):
+    """Cancel a queued or running optimization job, or drop a finished one"""
+    try:
+        return job_manager.delete(job_id).info()
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Optimization job not found: {job_id}")
@@ -1,67 +1,98 @@
 from fastapi import APIRouter, HTTPException
-from app.models.input_models import StressTestRequest
-from app.services.stress_testing_service import perform_stress_test
-from app.routers.calculation import df_store
+from app.models.input_models import StressTestRequest, StressGridRequest, StructureParameters, MonteCarloRequest, BreakevenRequest
+from app.services.stress_testing_service import (
+    perform_stress_test, perform_stress_grid, perform_monte_carlo, perform_breakeven,
+    stress_baseline_cache
+)
+from app.routers.calculation import get_engine_data
+import asyncio
+import functools
 import logging
 import traceback
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Stres ızgarası sınırları
+MAX_GRID_STEPS = 200
+MAX_GRID_POINTS = 100_000
+MAX_MONTE_CARLO_PATHS = 100_000
+MAX_BREAKEVEN_ITERATIONS = 200
+
+def _get_stress_data():
+    """Stored engine data, validated for stress testing"""
+    # Get the stored dataframe with better error message
+    df = get_engine_data()
+    if df is None:
+        raise HTTPException(
+            status_code=400, 
+            detail="No loan data found. Please upload an Excel file on the Structure Analysis page first."
+        )
+    
+    # Validate dataframe has required columns
+    required_columns = ['principal_amount', 'interest_amount', 'cash_flow', 'installment_date']
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required columns in uploaded data: {', '.join(missing_columns)}"
+        )
+    return df
+
+def _validate_structure(structure: StructureParameters):
+    # Basic validation of input data
+    if not structure:
+        raise HTTPException(status_code=400, detail="Structure details are missing")
+        
+    # Validate structure parameters
+    if not structure.a_maturities:
+        raise HTTPException(status_code=400, detail="No Class A maturities provided")
+    
+    # Ensure lists are of equal length
+    list_lengths = [
+        len(structure.a_maturities),
+        len(structure.a_base_rates),
+        len(structure.a_spreads),
+        len(structure.a_reinvest_rates),
+        len(structure.a_nominals)
+    ]
+    if len(set(list_lengths)) > 1:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Inconsistent lengths in Class A parameters: {list_lengths}"
+        )
+
+def _validate_percentage(label: str, value: float):
+    if value < 0 or value > 100:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{label} must be between 0 and 100, got {value}"
+        )
+
+def _raise_stress_error(e: Exception):
+    # Capture and log the full exception details
+    stack_trace = traceback.format_exc()
+    error_message = str(e)
+    logger.error(f"Stress testing error: {error_message}\n{stack_trace}")
+    
+    # Provide a meaningful error message
+    if not error_message:
+        error_message = "Unknown error occurred during stress testing. Check server logs for details."
+        
+    raise HTTPException(
+        status_code=400, 
+        detail=f"Stress testing error: {error_message}"
+    )
+
 @router.post("/stress-test/", response_model=dict)
 async def stress_test(request: StressTestRequest):
     try:
-        # Get the stored dataframe with better error message
-        df = df_store.get("df")
-        if df is None:
-            raise HTTPException(
-                status_code=400, 
-                detail="No loan data found. Please upload an Excel file on the Structure Analysis page first."
-            )
-        
-        # Validate dataframe has required columns
-        required_columns = ['principal_amount', 'interest_amount', 'cash_flow', 'installment_date']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Missing required columns in uploaded data: {', '.join(missing_columns)}"
-            )
-        
-        # Basic validation of input data
-        if not request.structure:
-            raise HTTPException(status_code=400, detail="Structure details are missing")
-            
-        # Validate structure parameters
-        if not request.structure.a_maturities:
-            raise HTTPException(status_code=400, detail="No Class A maturities provided")
-        
-        # Ensure lists are of equal length
-        list_lengths = [
-            len(request.structure.a_maturities),
-            len(request.structure.a_base_rates),
-            len(request.structure.a_spreads),
-            len(request.structure.a_reinvest_rates),
-            len(request.structure.a_nominals)
-        ]
-        if len(set(list_lengths)) > 1:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Inconsistent lengths in Class A parameters: {list_lengths}"
-            )
+        df = _get_stress_data()
+        _validate_structure(request.structure)
         
         # Validate scenario parameters
-        if request.scenario.npl_rate < 0 or request.scenario.npl_rate > 100:
-            raise HTTPException(
-                status_code=400,
-                detail=f"NPL rate must be between 0 and 100, got {request.scenario.npl_rate}"
-            )
-            
-        if request.scenario.prepayment_rate < 0 or request.scenario.prepayment_rate > 100:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Prepayment rate must be between 0 and 100, got {request.scenario.prepayment_rate}"
-            )
+        _validate_percentage("NPL rate", request.scenario.npl_rate)
+        _validate_percentage("Prepayment rate", request.scenario.prepayment_rate)
         
         # Log inputs for debugging
         logger.info(f"Running stress test with scenario: {request.scenario.name}")
@@ -73,22 +104,121 @@ async def stress_test(request: StressTestRequest):
         # Log results for debugging
         logger.info(f"Stress test completed. Baseline rate: {result['baseline']['class_b_coupon_rate']}%, Stress rate: {result['stress_test']['class_b_coupon_rate']}%")
         logger.info(f"Difference: {result['difference']['class_b_coupon_rate']}%")
+        logger.info(f"Baseline cache hit: {result['baseline_cache_hit']}, timing: {result['timing']}")
         
         return result
     except HTTPException:
         # Re-raise HTTP exceptions directly
         raise
     except Exception as e:
-        # Capture and log the full exception details
-        stack_trace = traceback.format_exc()
-        error_message = str(e)
-        logger.error(f"Stress testing error: {error_message}\n{stack_trace}")
+        _raise_stress_error(e)
+
+@router.post("/stress-test/grid", response_model=dict)
+async def stress_test_grid(request: StressGridRequest):
+    """
+    Class B coupon and minimum buffer over an NPL x prepayment x reinvestment
+    shift grid, returned as dense [npl][prepayment][shift] arrays.
+    """
+    try:
+        df = _get_stress_data()
+        _validate_structure(request.structure)
         
-        # Provide a meaningful error message
-        if not error_message:
-            error_message = "Unknown error occurred during stress testing. Check server logs for details."
-            
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Stress testing error: {error_message}"
-        )
\ No newline at end of file
+        axes = {
+            "NPL rate": request.npl_rate,
+            "Prepayment rate": request.prepayment_rate,
+            "Reinvestment shift": request.reinvestment_shift
+        }
+        grid_points = 1
+        for label, axis in axes.items():
+            if axis.steps < 1 or axis.steps > MAX_GRID_STEPS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{label} steps must be between 1 and {MAX_GRID_STEPS}, got {axis.steps}"
+                )
+            if label != "Reinvestment shift":
+                _validate_percentage(f"{label} start", axis.start)
+                _validate_percentage(f"{label} stop", axis.stop)
+            grid_points *= axis.steps
+        if grid_points > MAX_GRID_POINTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Stress grid has {grid_points} points, the limit is {MAX_GRID_POINTS}"
+            )
+        
+        # Run the CPU-bound stress evaluation in a thread pool
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(None, functools.partial(perform_stress_grid, df, request))
+        logger.info(f"Stress grid of {grid_points} points completed in {result['elapsed_seconds']}s")
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        _raise_stress_error(e)
+
+@router.post("/stress-test/monte-carlo", response_model=dict)
+async def stress_test_monte_carlo(request: MonteCarloRequest):
+    """
+    Class B coupon and minimum buffer percentiles over seeded random
+    NPL / prepayment / reinvestment shift paths.
+    """
+    try:
+        df = _get_stress_data()
+        _validate_structure(request.structure)
+        
+        if request.paths < 1 or request.paths > MAX_MONTE_CARLO_PATHS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Number of paths must be between 1 and {MAX_MONTE_CARLO_PATHS}, got {request.paths}"
+            )
+        
+        # Run the CPU-bound stress evaluation in a thread pool
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(None, functools.partial(perform_monte_carlo, df, request))
+        logger.info(f"Monte Carlo stress test of {request.paths} paths completed in {result['elapsed_seconds']}s")
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        _raise_stress_error(e)
+
+@router.post("/stress-test/breakeven", response_model=dict)
+async def stress_test_breakeven(request: BreakevenRequest):
+    """
+    Stress level of each factor at which min_buffer_actual falls below
+    min_buffer or the Class B coupon reaches zero.
+    """
+    try:
+        df = _get_stress_data()
+        _validate_structure(request.structure)
+        
+        _validate_percentage("NPL rate", request.npl_rate)
+        _validate_percentage("Prepayment rate", request.prepayment_rate)
+        if request.tolerance <= 0:
+            raise HTTPException(status_code=400, detail=f"Tolerance must be positive, got {request.tolerance}")
+        if request.max_reinvestment_shift <= 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Maximum reinvestment shift must be positive, got {request.max_reinvestment_shift}"
+            )
+        if request.max_iterations < 1 or request.max_iterations > MAX_BREAKEVEN_ITERATIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Iterations must be between 1 and {MAX_BREAKEVEN_ITERATIONS}, got {request.max_iterations}"
+            )
+        
+        # Run the CPU-bound stress evaluation in a thread pool
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(None, functools.partial(perform_breakeven, df, request))
+        for factor, solution in result['breakeven'].items():
+            logger.info(f"Break-even {factor}: {solution['breakeven']} ({solution['status']}, "
+                        f"{solution['evaluations']} evaluations)")
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        _raise_stress_error(e)
+
+@router.get("/stress-test/baseline-cache/stats")
+async def get_stress_baseline_cache_stats():
+    """Hit, miss and eviction counters of the per-structure stress baseline cache."""
+    return stress_baseline_cache.stats()
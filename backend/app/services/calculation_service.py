@@ -5,7 +5,7 @@ Calculation Service – 2025‑04‑18
 * Class B kupon oranı hesaplama optimization ve calculation servisleri arasında uyumlu
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterable
 import io
 import pandas as pd
 import numpy as np
@@ -13,12 +13,19 @@ import numpy as np
 from app.models.input_models import CalculationRequest
 from app.models.output_models import CalculationResult
 from app.utils.tranche_utils import calculate_tranche_results
+from app.utils.finance_utils import calculate_reinvestment_dates
+from app.utils.evaluation_cache import evaluation_cache
 
 # --------------------------------------------------------------------------- #
 #                               FILE LOADER                                   #
 # --------------------------------------------------------------------------- #
-def load_excel_data(contents: bytes) -> pd.DataFrame:
-    """Excel dosyasını okuyup minimum temizliği yapar."""
+def load_excel_data(contents: bytes,
+                    holidays: Optional[Iterable] = None) -> pd.DataFrame:
+    """Excel dosyasını okuyup minimum temizliği yapar.
+
+    Yeniden yatırım tarihleri burada bir kez hesaplanıp ``reinvest_date``
+    kolonuna yazılır; ``holidays`` hafta sonlarına ek tatil günleridir.
+    """
     try:
         df = pd.read_excel(io.BytesIO(contents))
         df.rename(columns={"Copyinstallment_date": "installment_date"},
@@ -33,6 +40,9 @@ def load_excel_data(contents: bytes) -> pd.DataFrame:
 
         df["cash_flow"] = df["principal_amount"] + df["interest_amount"]
         df["original_cash_flow"] = df["cash_flow"].copy()
+        df["reinvest_date"] = calculate_reinvestment_dates(
+            df["installment_date"], holidays
+        )
         return df
 
     except Exception as exc:
@@ -81,7 +91,7 @@ def perform_calculation(df: pd.DataFrame,
         df, start_date,
         a_maturities, a_base_rates, a_spreads, a_reinvest_rates, a_nominals,
         b_maturity, b_base_rate, b_spread, b_reinvest_rate, b_nominal,
-        ops_exp
+        ops_exp, cache=evaluation_cache
     )
 
     # Sonuçları çıktı formatına dönüştür
@@ -0,0 +1,238 @@
+# backend/app/services/job_service.py
+"""
+Background optimization jobs.
+
+A job runs one optimization on a snapshot of the uploaded data, so later
+uploads do not change it, and reports to its own progress tracker instead
+of the shared one of the direct /optimize/ endpoints. At most
+max_concurrent_jobs jobs run at a time on a thread pool, further jobs wait
+in a bounded queue, and finished jobs are kept for result_ttl_seconds.
+"""
+
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from app.models.input_models import GeneralSettings, OptimizationSettings
+from app.models.output_models import OptimizationResult
+from app.utils.run_control import RunControl, run_control_scope
+from app.services.optimization_service import (
+    OptimizationProgress,
+    job_progress,
+    perform_bayesian_optimization,
+    perform_branch_and_bound_optimization,
+    perform_genetic_optimization,
+    perform_optimization
+)
+
+logger = logging.getLogger(__name__)
+
+# optimization_method -> optimizer
+OPTIMIZATION_METHODS: Dict[str, Callable[..., OptimizationResult]] = {
+    "classic": perform_optimization,
+    "genetic": perform_genetic_optimization,
+    "branch_and_bound": perform_branch_and_bound_optimization,
+    "bayesian": perform_bayesian_optimization,
+}
+
+# Varsayılan sınırlar
+DEFAULT_MAX_CONCURRENT_JOBS = 2
+DEFAULT_MAX_QUEUED_JOBS = 20
+DEFAULT_RESULT_TTL_SECONDS = 3600
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobNotFoundError(KeyError):
+    """No job with this id (never created, deleted or evicted)."""
+
+
+class JobQueueFullError(RuntimeError):
+    """Too many jobs are waiting to run."""
+
+
+class OptimizationJob:
+    """
+    One optimization run with its own progress tracker.
+
+    Args:
+        job_id: Unique id of the job
+        method: Key of OPTIMIZATION_METHODS
+        df: Data the optimization runs on
+        general_settings: General settings for the optimization
+        optimization_settings: Optimization-specific settings
+    """
+
+    def __init__(self, job_id: str, method: str, df: pd.DataFrame,
+                 general_settings: GeneralSettings, optimization_settings: OptimizationSettings):
+        self.job_id = job_id
+        self.method = method
+        self.df = df
+        self.general_settings = general_settings
+        self.optimization_settings = optimization_settings
+        self.status = QUEUED
+        self.progress = OptimizationProgress()
+        self.run_control = RunControl()
+        self.result: Optional[OptimizationResult] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def info(self) -> Dict[str, Any]:
+        """Status of the job without its result."""
+        return {
+            "job_id": self.job_id,
+            "method": self.method,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Runs optimization jobs on a bounded thread pool and keeps their results.
+
+    Args:
+        max_concurrent_jobs: Jobs running at the same time
+        max_queued_jobs: Jobs waiting to run; more submissions are rejected
+        result_ttl_seconds: How long finished jobs are kept
+    """
+
+    def __init__(self, max_concurrent_jobs: int = DEFAULT_MAX_CONCURRENT_JOBS,
+                 max_queued_jobs: int = DEFAULT_MAX_QUEUED_JOBS,
+                 result_ttl_seconds: float = DEFAULT_RESULT_TTL_SECONDS):
+        self.max_concurrent_jobs = max(1, int(max_concurrent_jobs))
+        self.max_queued_jobs = max(0, int(max_queued_jobs))
+        self.result_ttl_seconds = result_ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_jobs,
+                                            thread_name_prefix="optimization-job")
+        self._jobs: Dict[str, OptimizationJob] = {}
+        # Deleted jobs whose thread has not returned yet; they still take a slot
+        self._stopping = set()
+        self._lock = threading.Lock()
+
+    def submit(self, df: pd.DataFrame, general_settings: GeneralSettings,
+               optimization_settings: OptimizationSettings) -> OptimizationJob:
+        """
+        Queue an optimization with the method of optimization_settings.
+
+        Raises:
+            ValueError: Unknown optimization method
+            JobQueueFullError: max_queued_jobs jobs are already waiting
+        """
+        method = optimization_settings.optimization_method
+        if method not in OPTIMIZATION_METHODS:
+            raise ValueError(f"Unknown optimization method: {method}. Expected one of {tuple(OPTIMIZATION_METHODS)}")
+
+        self._evict_expired()
+        with self._lock:
+            # Jobs beyond the running slots wait in the executor queue
+            active = sum(1 for job in self._jobs.values() if not job.finished) + len(self._stopping)
+            waiting = max(0, active - self.max_concurrent_jobs)
+            if active >= self.max_concurrent_jobs and waiting >= self.max_queued_jobs:
+                raise JobQueueFullError(f"{waiting} optimization jobs are already waiting, try again later")
+            job = OptimizationJob(uuid.uuid4().hex, method, df, general_settings, optimization_settings)
+            self._jobs[job.job_id] = job
+            job.future = self._executor.submit(self._run, job)
+        logger.info(f"Queued optimization job {job.job_id} ({method})")
+        return job
+
+    def _run(self, job: OptimizationJob) -> None:
+        try:
+            with self._lock:
+                if job.status != QUEUED:
+                    return
+                job.status = RUNNING
+                job.started_at = time.time()
+            logger.info(f"Running optimization job {job.job_id} ({job.method})")
+
+            result, error = None, None
+            try:
+                with job_progress(job.progress), run_control_scope(job.run_control):
+                    result = OPTIMIZATION_METHODS[job.method](job.df, job.general_settings, job.optimization_settings)
+            except Exception as e:
+                logger.error(f"Optimization job {job.job_id} failed: {str(e)}")
+                error = str(e)
+
+            with self._lock:
+                job.finished_at = time.time()
+                job.df = None  # the snapshot is only needed while running
+                if job.status == CANCELLED:
+                    return
+                if error is None:
+                    job.result = result
+                    job.status = COMPLETED
+                    job.progress.update(step=100, phase="Complete", message="Optimization completed successfully")
+                else:
+                    job.error = error
+                    job.status = FAILED
+                    job.progress.update(step=100, phase="Error", message=f"Optimization error: {error}")
+            logger.info(f"Optimization job {job.job_id} {job.status} in {job.finished_at - job.started_at:.1f}s")
+        finally:
+            with self._lock:
+                self._stopping.discard(job)
+
+    def get(self, job_id: str) -> OptimizationJob:
+        """The job with this id; raises JobNotFoundError."""
+        self._evict_expired()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return job
+
+    def delete(self, job_id: str) -> OptimizationJob:
+        """
+        Remove a job. A queued job never starts; a running job is asked to
+        stop at its next check and its partial result is discarded.
+        """
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                raise JobNotFoundError(job_id)
+            if not job.finished:
+                if job.future is not None and job.future.cancel():
+                    job.df = None
+                else:
+                    # Counted against the limits until _run returns
+                    self._stopping.add(job)
+                job.run_control.cancel()
+                job.status = CANCELLED
+                job.progress.update(phase="Cancelled", message="Optimization job cancelled")
+        logger.info(f"Deleted optimization job {job_id}")
+        return job
+
+    def _evict_expired(self) -> None:
+        """Drop finished jobs older than result_ttl_seconds."""
+        expiry = time.time() - self.result_ttl_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at is not None and job.finished_at < expiry]
+            for job_id in expired:
+                del self._jobs[job_id]
+        if expired:
+            logger.info(f"Evicted {len(expired)} expired optimization jobs")
+
+
+# Uygulama genelinde paylaşılan iş yöneticisi
+job_manager = JobManager()
@@ -5,18 +5,21 @@ Ortak hesaplama mantığını tranche_utils.py'den kullanarak uyumlu hale getiri
 import time
 import pandas as pd
 import numpy as np
-import itertools
+import math
 from datetime import datetime, timedelta
 import random
 import traceback
 import logging
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Dict, List, Any, Tuple, Optional
 
 from app.models.input_models import OptimizationSettings, GeneralSettings
 from app.models.output_models import OptimizationResult
 from app.utils.finance_utils import (
     simple_to_compound_annual,
-    get_nearest_maturity,
     get_last_cash_flow_day
 )
 from app.utils.cash_flow_utils import (
@@ -24,8 +27,33 @@ from app.utils.cash_flow_utils import (
     calculate_totals
 )
 from app.utils.tranche_utils import (
-    calculate_tranche_results,
-    adjust_class_a_nominals_for_target_coupon
+    NOMINAL_SOLVERS,
+    TrancheEvaluationContext,
+    calculate_tranche_metrics,
+    calculate_tranche_metrics_batch,
+    adjust_class_a_nominals_for_target_coupon,
+    class_a_buffer_ratio_bound,
+    class_b_coupon_rate_bound,
+    merge_solver_stats
+)
+from app.utils.cash_flow_index import CashFlowIndex, prepare_cash_flows
+from app.utils.evaluation_cache import EvaluationCache, evaluation_cache, tranche_evaluation_key, dataset_fingerprint
+from app.utils.maturity_combinations import count_maturity_combinations, sample_maturity_combinations
+from app.utils.progress_stream import ProgressBroadcaster
+from app.utils.rate_curve import RateCurve, get_rate_model
+from app.utils.result_cache import result_cache, settings_key
+from app.utils.run_control import (
+    RunControl,
+    count_evaluations,
+    current_run_control,
+    run_control_scope,
+    should_stop
+)
+from app.utils.parallel_utils import (
+    SharedFrame,
+    attach_shared_frame,
+    create_worker_pool,
+    resolve_num_workers
 )
 
 # Configure logger
@@ -34,6 +62,8 @@ logger = logging.getLogger(__name__)
 class OptimizationProgress:
     """Class to track and report optimization progress"""
     def __init__(self):
+        # Subscribers of /optimize/progress/stream; kept across resets
+        self.stream = ProgressBroadcaster()
         self.reset()
         
     def reset(self):
@@ -43,13 +73,18 @@ class OptimizationProgress:
         self.current_phase = "Initializing"
         self.status_message = "Starting optimization..."
         self.progress = 0
+        self.best_coupon_rate = None
+        self.best_class_b_percent = None
         self.last_update_time = time.time()
         self.start_time = time.time()
         logger.info("Progress tracker reset")
+        self.stream.publish(self.get_info())
         
-    def update(self, step=None, total=None, phase=None, message=None):
-        """Update progress information"""
+    def update(self, step=None, total=None, phase=None, message=None,
+               best_coupon_rate=None, best_class_b_percent=None):
+        """Update progress information, best_* with the best structure found so far"""
         current_time = time.time()
+        progress_changed = False
         
         # Update more frequently
         force_update = (current_time - self.last_update_time) > 0.2
@@ -62,6 +97,10 @@ class OptimizationProgress:
             self.current_phase = phase
         if message is not None:
             self.status_message = message
+        if best_coupon_rate is not None:
+            self.best_coupon_rate = float(best_coupon_rate)
+        if best_class_b_percent is not None:
+            self.best_class_b_percent = float(best_class_b_percent)
             
         # Calculate percentage
         if self.total_steps > 0:
@@ -78,6 +117,9 @@ class OptimizationProgress:
             logger.info(f"Progress: {self.progress}% - {self.current_phase} - {self.status_message} (elapsed: {elapsed:.1f}s)")
             self.last_update_time = current_time
         
+        # Streams coalesce on their side, so every update is offered
+        self.stream.publish(self.get_info())
+        
     def get_info(self):
         """Get current progress information with additional data"""
         current_time = time.time()
@@ -91,11 +133,156 @@ class OptimizationProgress:
             "total_steps": self.total_steps,
             "timestamp": current_time,
             "elapsed_seconds": elapsed,
-            "start_time": self.start_time
+            "start_time": self.start_time,
+            "best_coupon_rate": self.best_coupon_rate,
+            "best_class_b_percent": self.best_class_b_percent
         }
 
+# Tracker of the optimization job running in the current thread, set by job_progress
+_job_progress: ContextVar[Optional[OptimizationProgress]] = ContextVar("job_progress", default=None)
+
+class _ContextProgress:
+    """Forwards to the tracker of the running job, or to the shared tracker
+    of the direct /optimize/ endpoints outside of jobs"""
+    def __init__(self, shared: OptimizationProgress):
+        self._shared = shared
+    
+    def __getattr__(self, name):
+        return getattr(_job_progress.get() or self._shared, name)
+
+@contextmanager
+def job_progress(progress: OptimizationProgress):
+    """Report the optimization progress of this thread to progress while the block runs."""
+    token = _job_progress.set(progress)
+    try:
+        yield progress
+    finally:
+        _job_progress.reset(token)
+
 # Create the global optimization_progress instance
-optimization_progress = OptimizationProgress()
+shared_optimization_progress = OptimizationProgress()
+optimization_progress = _ContextProgress(shared_optimization_progress)
+
+# Run controls of the optimizations started without one (direct endpoints), for cancel_active_runs
+_active_run_controls = set()
+_active_run_controls_lock = threading.Lock()
+
+def controlled_run(optimizer):
+    """Run an optimizer under a RunControl with the budgets of its settings.
+    
+    The control installed by the caller (e.g. an optimization job) is used when
+    there is one, otherwise a new one is registered for cancel_active_runs.
+    Nested runs (the genetic fallback to the classic search) share the control
+    of the outer run. A result returned after the control stopped the run holds
+    the best structure found until then and is flagged partial.
+    """
+    @functools.wraps(optimizer)
+    def run(df: pd.DataFrame, general_settings: GeneralSettings, optimization_settings: OptimizationSettings) -> OptimizationResult:
+        control = current_run_control()
+        if control is not None and control.started:
+            return optimizer(df, general_settings, optimization_settings)
+        
+        owned = control is None
+        if owned:
+            control = RunControl()
+            with _active_run_controls_lock:
+                _active_run_controls.add(control)
+        control.start(
+            max_seconds=getattr(optimization_settings, "max_seconds", None),
+            max_evaluations=getattr(optimization_settings, "max_evaluations", None)
+        )
+        try:
+            with run_control_scope(control):
+                result = optimizer(df, general_settings, optimization_settings)
+        except ValueError as e:
+            if control.stop_reason is not None:
+                raise ValueError(f"{e} (run stopped early: {control.stop_reason})") from e
+            raise
+        finally:
+            if owned:
+                with _active_run_controls_lock:
+                    _active_run_controls.discard(control)
+        
+        if control.stop_reason is not None:
+            result.is_partial = True
+            result.stop_reason = control.stop_reason
+            logger.info(f"Returning partial result ({control.stop_reason}) after {control.evaluations} evaluations")
+        return result
+    return run
+
+# Settings that change how a run is executed but not a completed result
+_EXECUTION_ONLY_SETTINGS = {"num_workers", "max_seconds", "max_evaluations"}
+# Optimizers whose results depend on random_seed
+_STOCHASTIC_OPTIMIZERS = {"perform_genetic_optimization", "perform_bayesian_optimization"}
+
+def cached_result(optimizer):
+    """Serve an optimizer from the persistent result cache.
+    
+    Completed results are stored under the dataset fingerprint, the optimizer
+    and the settings, and an identical request returns the stored result,
+    flagged from_cache. Partial results and unseeded stochastic runs are not
+    stored; nested runs always execute.
+    """
+    @functools.wraps(optimizer)
+    def run(df: pd.DataFrame, general_settings: GeneralSettings, optimization_settings: OptimizationSettings) -> OptimizationResult:
+        control = current_run_control()
+        seeded = optimizer.__name__ not in _STOCHASTIC_OPTIMIZERS or getattr(optimization_settings, "random_seed", None) is not None
+        if not result_cache.enabled or not seeded or (control is not None and control.started):
+            return optimizer(df, general_settings, optimization_settings)
+        
+        dataset = dataset_fingerprint(df)
+        key = settings_key(dataset, optimizer.__name__, [
+            general_settings.model_dump(mode="json"),
+            optimization_settings.model_dump(mode="json", exclude=_EXECUTION_ONLY_SETTINGS)
+        ])
+        cached = result_cache.get(key)
+        if cached is not None:
+            logger.info(f"{optimizer.__name__}: returning cached result")
+            optimization_progress.reset()
+            optimization_progress.update(
+                step=100,
+                total=100,
+                phase="Complete",
+                message=f"Returned cached result: {cached.get('best_strategy')}, "
+                        f"coupon_rate: {cached.get('class_b_coupon_rate', 0):.2f}%",
+                best_coupon_rate=cached.get('class_b_coupon_rate'),
+                best_class_b_percent=cached.get('class_b_percent')
+            )
+            return OptimizationResult(**{**cached, 'from_cache': True})
+        
+        result = optimizer(df, general_settings, optimization_settings)
+        if not result.is_partial:
+            result_cache.put(key, dataset, optimizer.__name__, result.model_dump(mode="json"))
+        return result
+    return run
+
+def cancel_active_runs() -> int:
+    """Cancel the optimizations started without a RunControl (the direct endpoints).
+    
+    Returns:
+        Number of runs asked to stop
+    """
+    with _active_run_controls_lock:
+        controls = list(_active_run_controls)
+    for control in controls:
+        control.cancel()
+    return len(controls)
+
+def _model_rate_curve(optimization_settings: OptimizationSettings) -> Tuple[Dict[str, Any], RateCurve]:
+    """
+    Rate model of the selected default model and the Class A rate curve of a run.
+    
+    The curve uses optimization_settings.rate_curve when the request supplies
+    one and the rate table of the model otherwise.
+    """
+    rate_model = get_rate_model(getattr(optimization_settings, "selected_default_model", "previous"))
+    mode = getattr(optimization_settings, "rate_interpolation", None) or "nearest"
+    curve_settings = getattr(optimization_settings, "rate_curve", None)
+    if curve_settings is not None:
+        rate_curve = RateCurve(curve_settings.maturities, curve_settings.base_rates, curve_settings.reinvest_rates, mode)
+    else:
+        rate_curve = RateCurve(rate_model['maturities'], rate_model['base_rates'], rate_model['reinvest_rates'], mode)
+    return rate_model, rate_curve
 
 def evaluate_params(
     df: pd.DataFrame,
@@ -103,17 +290,19 @@ def evaluate_params(
     maturities: List[int], 
     nominals: List[float], 
     class_b_maturity: int, 
-    maturity_to_base_rate_A: Dict[int, float], 
-    maturity_to_reinvest_rate_A: Dict[int, float],
+    rate_curve: RateCurve,
     class_b_base_rate: float, 
     class_b_reinvest_rate: float,
     target_class_b_percent: float, 
     class_b_percent_deviation: float,
     target_class_b_coupon_rate: float, 
     min_buffer: float,
-    ops_expenses: float = 0.0
+    ops_expenses: float = 0.0,
+    cash_flow_index: Optional[CashFlowIndex] = None,
+    evaluation_context: Optional[TrancheEvaluationContext] = None,
+    cache: Optional[EvaluationCache] = None
 ) -> Dict[str, Any]:
-    """Helper function to evaluate a set of parameters using shared calculate_tranche_results logic"""
+    """Helper function to evaluate a set of parameters using the shared calculate_tranche_metrics logic"""
     # Verify input parameters
     if not maturities or not nominals or len(maturities) != len(nominals):
         return {
@@ -132,13 +321,9 @@ def evaluate_params(
     # Round nominals to nearest 1000 and ensure no zeros
     nominals = [max(1000, round(n / 1000) * 1000) for n in nominals]
     
-    # Get rates from lookup tables with fallback values
-    available_lookup_keys = list(maturity_to_base_rate_A.keys())
-    base_rates = [maturity_to_base_rate_A.get(
-        get_nearest_maturity(m, available_lookup_keys), 42.0) for m in maturities]
-    
-    reinvest_rates = [maturity_to_reinvest_rate_A.get(
-        get_nearest_maturity(m, list(maturity_to_reinvest_rate_A.keys())), 30.0) for m in maturities]
+    # Get rates from the Class A rate curve
+    base_rates = rate_curve.base_rate_list(maturities)
+    reinvest_rates = rate_curve.reinvest_rate_list(maturities)
     
     # Default all spreads to 0
     spreads = [0.0] * len(maturities)
@@ -191,11 +376,12 @@ def evaluate_params(
     
     try:
         # Use shared calculation logic
-        result = calculate_tranche_results(
+        result = calculate_tranche_metrics(
             df, start_date,
             maturities, base_rates, spreads, reinvest_rates, nominals,
             class_b_maturity, class_b_base_rate, 0.0, class_b_reinvest_rate, class_b_nominal,
-            ops_expenses
+            ops_expenses, cash_flow_index=cash_flow_index, evaluation_context=evaluation_context,
+            cache=cache
         )
         
         # Extract relevant metrics
@@ -267,6 +453,357 @@ def evaluate_params(
             'class_b_percent': actual_class_b_percent
         }
 
+def evaluate_params_batch(
+    df: pd.DataFrame,
+    start_date: pd.Timestamp,
+    maturities_list: List[List[int]],
+    nominals_list: List[List[float]],
+    class_b_maturity: int,
+    rate_curve: RateCurve,
+    class_b_base_rate: float,
+    class_b_reinvest_rate: float,
+    target_class_b_percent: float,
+    class_b_percent_deviation: float,
+    target_class_b_coupon_rate: float,
+    min_buffer: float,
+    ops_expenses: float = 0.0,
+    cash_flow_index: Optional[CashFlowIndex] = None,
+    evaluation_context: Optional[TrancheEvaluationContext] = None,
+    cache: Optional[EvaluationCache] = None
+) -> List[Dict[str, Any]]:
+    """Score many candidates with one calculate_tranche_metrics_batch call.
+
+    Same rules and return format as evaluate_params, one dict per candidate.
+    All candidates must have the same number of Class A tranches; otherwise
+    (or on any error) each candidate is evaluated with evaluate_params.
+    evaluation_context may be given when all candidates share its maturities.
+    With a cache, candidates already evaluated (by either function) are
+    read from it and only the rest go through the batch call.
+    """
+    if not maturities_list:
+        return []
+
+    def evaluate_one_by_one():
+        return [
+            evaluate_params(
+                df, start_date, maturities, nominals, class_b_maturity,
+                rate_curve, class_b_base_rate, class_b_reinvest_rate,
+                target_class_b_percent, class_b_percent_deviation,
+                target_class_b_coupon_rate, min_buffer,
+                ops_expenses, cash_flow_index=cash_flow_index, evaluation_context=evaluation_context,
+                cache=cache
+            )
+            for maturities, nominals in zip(maturities_list, nominals_list)
+        ]
+
+    num_a_tranches = len(maturities_list[0])
+    if num_a_tranches == 0 or any(
+        len(m) != num_a_tranches or len(n) != num_a_tranches
+        for m, n in zip(maturities_list, nominals_list)
+    ):
+        return evaluate_one_by_one()
+
+    try:
+        if cash_flow_index is None:
+            cash_flow_index = prepare_cash_flows(df, ops_expenses)
+
+        maturities = np.array(maturities_list, dtype=float).astype(np.int64)
+        # Round nominals to nearest 1000 and ensure no zeros
+        nominals = np.maximum(1000, np.round(np.array(nominals_list, dtype=float) / 1000) * 1000)
+
+        base_rates, reinvest_rates = rate_curve.rates(maturities)
+
+        # Class B nominal from the target percentage, clamped into the allowed band
+        total_a_nominal = nominals.sum(axis=1)
+        target_b_share = target_class_b_percent / 100
+        class_b_nominal = np.round((total_a_nominal * target_b_share) / (1 - target_b_share) / 1_000) * 1_000
+        actual_class_b_percent = (class_b_nominal / (total_a_nominal + class_b_nominal)) * 100
+
+        min_class_b_percent = max(0.1, target_class_b_percent - class_b_percent_deviation)
+        max_class_b_percent = min(50, target_class_b_percent + class_b_percent_deviation)
+
+        out_of_band = (actual_class_b_percent < min_class_b_percent) | (actual_class_b_percent > max_class_b_percent)
+        if out_of_band.any():
+            corrected_b_share = np.where(
+                actual_class_b_percent < min_class_b_percent,
+                min_class_b_percent / 100, max_class_b_percent / 100
+            )
+            corrected_b_nominal = np.round(
+                (total_a_nominal * corrected_b_share) / (1 - corrected_b_share) / 1_000
+            ) * 1_000
+            class_b_nominal = np.where(out_of_band, corrected_b_nominal, class_b_nominal)
+            actual_class_b_percent = (class_b_nominal / (total_a_nominal + class_b_nominal)) * 100
+
+        num_candidates = len(maturities)
+        all_maturities = np.column_stack([maturities, np.full(num_candidates, class_b_maturity)])
+        all_base_rates = np.column_stack([base_rates, np.full(num_candidates, class_b_base_rate)])
+        all_spreads = np.zeros((num_candidates, num_a_tranches + 1))
+        all_reinvest_rates = np.column_stack([reinvest_rates, np.full(num_candidates, class_b_reinvest_rate)])
+        all_nominals = np.column_stack([nominals, class_b_nominal])
+
+        # Önbellekte olan adaylar okunur, yalnızca kalanlar toplu hesaplanır
+        cache_keys = [None] * num_candidates
+        cached_metrics = {}
+        if cache is not None:
+            for k in range(num_candidates):
+                cache_keys[k] = tranche_evaluation_key(
+                    "metrics", df, start_date, all_maturities[k], all_base_rates[k],
+                    all_spreads[k], all_reinvest_rates[k], all_nominals[k], ops_expenses
+                )
+                cached = cache.get(cache_keys[k])
+                if cached is not None:
+                    cached_metrics[k] = cached
+        missing = np.array([k for k in range(num_candidates) if k not in cached_metrics], dtype=np.int64)
+
+        if missing.size == num_candidates:
+            metrics = calculate_tranche_metrics_batch(
+                cash_flow_index, start_date,
+                all_maturities, all_base_rates, all_spreads, all_reinvest_rates, all_nominals,
+                num_a_tranches,
+                evaluation_context=evaluation_context
+            )
+        else:
+            metrics = {
+                name: np.array([float(cached_metrics[k][name]) if k in cached_metrics else np.nan
+                                for k in range(num_candidates)])
+                for name in next(iter(cached_metrics.values()))
+            }
+            if missing.size:
+                computed = calculate_tranche_metrics_batch(
+                    cash_flow_index, start_date,
+                    all_maturities[missing], all_base_rates[missing], all_spreads[missing],
+                    all_reinvest_rates[missing], all_nominals[missing],
+                    num_a_tranches,
+                    evaluation_context=evaluation_context
+                )
+                for name in metrics:
+                    metrics[name][missing] = computed[name]
+        if cache is not None:
+            for k in missing:
+                cache.put(cache_keys[k], {name: float(values[k]) for name, values in metrics.items()})
+
+        # Validity and score, vectorized as in evaluate_params
+        class_b_percent_diff = np.abs(actual_class_b_percent - target_class_b_percent)
+        is_valid = (
+            (metrics['min_buffer_actual'] >= min_buffer) &
+            (min_class_b_percent <= actual_class_b_percent) &
+            (actual_class_b_percent <= max_class_b_percent)
+        )
+        coupon_rate_diff = np.abs(metrics['effective_coupon_rate'] - target_class_b_coupon_rate)
+        total_principal = metrics['class_a_principal'] + metrics['class_b_principal']
+        combined_weight = (np.exp(-coupon_rate_diff / 3.0) * 0.6) + (np.exp(-class_b_percent_diff / 2.0) * 0.4)
+        weighted_principal = total_principal * combined_weight
+    except Exception as e:
+        logger.error(f"Error in evaluate_params_batch: {str(e)}")
+        logger.debug(traceback.format_exc())
+        return evaluate_one_by_one()
+
+    evaluations = []
+    for k in range(num_candidates):
+        result_dict = None
+        if is_valid[k]:
+            result_dict = {
+                'class_a_principal': float(metrics['class_a_principal'][k]),
+                'class_b_principal': float(metrics['class_b_principal'][k]),
+                'class_a_interest': float(metrics['class_a_interest'][k]),
+                'class_b_coupon': float(metrics['class_b_coupon'][k]),
+                'class_a_total': float(metrics['class_a_total'][k]),
+                'class_b_total': float(metrics['class_b_total'][k]),
+                'min_buffer_actual': float(metrics['min_buffer_actual'][k]),
+                'total_principal': float(total_principal[k]),
+                'class_b_coupon_rate': float(metrics['effective_coupon_rate'][k]),
+                'direct_coupon_rate': float(metrics['direct_coupon_rate'][k]),
+                'class_b_percent': float(actual_class_b_percent[k]),
+                'class_b_percent_diff': float(class_b_percent_diff[k]),
+                'coupon_rate_diff': float(coupon_rate_diff[k]),
+                'num_a_tranches': num_a_tranches
+            }
+        evaluations.append({
+            'is_valid': bool(is_valid[k]),
+            'score': float(weighted_principal[k]) if is_valid[k] else 0,
+            'results': result_dict,
+            'b_nominal': int(class_b_nominal[k]),
+            'class_b_percent': float(actual_class_b_percent[k])
+        })
+    return evaluations
+
+def _search_grid_combination(
+    df: pd.DataFrame,
+    cash_flow_index: CashFlowIndex,
+    maturities: List[int],
+    grid_settings: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Adjust and score every distribution strategy for one maturity combination.
+
+    This is the per-combination work of perform_optimization. It only reads
+    its inputs, so combinations can be processed in any order or process;
+    choosing the best structures from the outcomes stays in the caller.
+
+    Args:
+        df: DataFrame containing cash flow data
+        cash_flow_index: CashFlowIndex prepared for df and the operational expenses
+        maturities: Sorted Class A maturities in days
+        grid_settings: Settings shared by all combinations (see perform_optimization)
+
+    Returns:
+        Dictionary with the rates and Class B nominal of the combination,
+        (strategy, a_nominals, adjustment_success) candidates, their
+        evaluate_params results and the nominal solver statistics
+    """
+    start_date = grid_settings['start_date']
+    ops_expenses = grid_settings['ops_expenses']
+    total_a_nominal = grid_settings['total_a_nominal']
+    class_b_maturity = grid_settings['class_b_maturity']
+    target_class_b_percent = grid_settings['target_class_b_percent']
+    num_a_tranches = len(maturities)
+    
+    # Assign rates from the Class A rate curve
+    a_base_rates = grid_settings['rate_curve'].base_rate_list(maturities)
+    a_reinvest_rates = grid_settings['rate_curve'].reinvest_rate_list(maturities)
+    
+    # Use the base rate of the longest Class A tranche for Class B
+    # but always use the original reinvest rate from UI
+    if len(a_base_rates) > 0:
+        b_base_rate = a_base_rates[-1]  # Use the base rate of the longest-maturity Class A tranche
+    else:
+        b_base_rate = grid_settings['class_b_base_rate_orig']
+    b_reinvest_rate = grid_settings['class_b_reinvest_rate_orig']  # Always use original reinvest rate
+    
+    # Calculate required Class B nominal to achieve target percentage
+    # Formula: class_b_nominal = total_a_nominal * (target_percent / (100 - target_percent))
+    target_b_share = target_class_b_percent / 100
+    class_b_nominal = (total_a_nominal * target_b_share) / (1 - target_b_share)
+    
+    # Round to nearest 1000
+    class_b_nominal = round(class_b_nominal / 1000) * 1000
+    
+    # Tranche totals depend only on maturities and reinvest rates: compute them
+    # once per combination and reuse them for every nominal strategy
+    evaluation_context = TrancheEvaluationContext(
+        df, start_date,
+        list(maturities) + [class_b_maturity], a_reinvest_rates + [b_reinvest_rate],
+        ops_expenses, cash_flow_index
+    )
+    
+    # Distribute and adjust nominals for each strategy
+    solver_stats = {}
+    strategy_candidates = []
+    for strategy in grid_settings['distribution_strategies']:
+        # Calculate total nominal amount based on Class A and B
+        remaining_nominal = total_a_nominal
+        
+        # Distribute nominal amounts based on strategy
+        if strategy == "equal":
+            a_nominals = [remaining_nominal / num_a_tranches] * num_a_tranches
+            
+        elif strategy == "increasing":
+            # Weight by maturity days
+            weights = np.array(maturities)
+            a_nominals = (weights / weights.sum()) * remaining_nominal
+            
+        elif strategy == "decreasing":
+            # Inverse weight by maturity days
+            weights = 1 / np.array(maturities)
+            a_nominals = (weights / weights.sum()) * remaining_nominal
+            
+        elif strategy == "middle_weighted":
+            # Give more weight to middle tranches
+            if num_a_tranches >= 3:
+                weights = np.ones(num_a_tranches)
+                mid_idx = num_a_tranches // 2
+                weights[mid_idx] = 1.5
+                if num_a_tranches > 3:
+                    weights[mid_idx-1] = 1.3
+                    weights[mid_idx+1] = 1.3
+                a_nominals = (weights / weights.sum()) * remaining_nominal
+            else:
+                a_nominals = [remaining_nominal / num_a_tranches] * num_a_tranches
+        else:
+            # Invalid strategy, use equal distribution as fallback
+            logger.warning(f"Unknown strategy: {strategy}, using equal distribution")
+            a_nominals = [remaining_nominal / num_a_tranches] * num_a_tranches
+        
+        # Round to nearest 1000
+        a_nominals = [round(n / 1000) * 1000 for n in a_nominals]
+        
+        # Ensure sum equals the remaining nominal
+        adjustment = (remaining_nominal - sum(a_nominals)) / num_a_tranches
+        a_nominals = [n + adjustment for n in a_nominals]
+        a_nominals = [round(n / 1000) * 1000 for n in a_nominals]
+        
+        # Make final adjustment to last tranche to ensure exact total
+        a_nominals[-1] += remaining_nominal - sum(a_nominals)
+        
+        # Now adjust the nominals to achieve target coupon rate - use shared utility function
+        try:
+            # Generate default spreads (all zeros)
+            a_spreads = [0.0] * len(a_nominals)
+            b_spread = 0.0
+            
+            adjusted_a_nominals, adjustment_success, adjusted_b_percent = adjust_class_a_nominals_for_target_coupon(
+                df, start_date,
+                maturities, a_nominals, a_base_rates, a_spreads, a_reinvest_rates,
+                class_b_maturity, b_base_rate, b_spread, b_reinvest_rate, class_b_nominal,
+                grid_settings['target_class_b_coupon_rate'], target_class_b_percent,
+                grid_settings['min_buffer'], ops_expenses,
+                grid_settings['max_allowed_diff'], grid_settings['class_b_percent_deviation'],
+                cash_flow_index=cash_flow_index,
+                solver=grid_settings['nominal_solver'], stats=solver_stats,
+                evaluation_context=evaluation_context
+            )
+            
+            if adjustment_success:
+                a_nominals = adjusted_a_nominals
+        except Exception as e:
+            logger.error(f"Error adjusting nominals: {str(e)}")
+            adjustment_success = False
+            # Continue with original nominals
+        
+        strategy_candidates.append((strategy, a_nominals, adjustment_success))
+    
+    # Evaluate all strategies of this combination in one vectorized call
+    eval_results = evaluate_params_batch(
+        df, start_date,
+        [maturities] * len(strategy_candidates),
+        [a_nominals for _, a_nominals, _ in strategy_candidates],
+        class_b_maturity,
+        grid_settings['rate_curve'],
+        b_base_rate, b_reinvest_rate,
+        target_class_b_percent, grid_settings['class_b_percent_deviation'],
+        grid_settings['target_class_b_coupon_rate'], grid_settings['min_buffer'],
+        ops_expenses, cash_flow_index=cash_flow_index,
+        evaluation_context=evaluation_context, cache=evaluation_cache
+    )
+    
+    return {
+        'a_base_rates': a_base_rates,
+        'a_reinvest_rates': a_reinvest_rates,
+        'b_base_rate': b_base_rate,
+        'b_reinvest_rate': b_reinvest_rate,
+        'class_b_nominal': class_b_nominal,
+        'candidates': strategy_candidates,
+        'eval_results': eval_results,
+        'solver_stats': solver_stats
+    }
+
+# Request data of a grid search worker process, set once by _init_grid_worker
+_grid_worker_state: Dict[str, Any] = {}
+
+def _init_grid_worker(df: pd.DataFrame, grid_settings: Dict[str, Any]) -> None:
+    """Process pool initializer: keep the data set and build its CashFlowIndex once per worker."""
+    _grid_worker_state['df'] = df
+    _grid_worker_state['grid_settings'] = grid_settings
+    _grid_worker_state['cash_flow_index'] = prepare_cash_flows(df, grid_settings['ops_expenses'])
+
+def _search_grid_combination_in_worker(maturities: List[int]) -> Dict[str, Any]:
+    """_search_grid_combination on the data set of this worker process."""
+    return _search_grid_combination(
+        _grid_worker_state['df'], _grid_worker_state['cash_flow_index'],
+        maturities, _grid_worker_state['grid_settings']
+    )
+
+@cached_result
+@controlled_run
 def perform_optimization(df: pd.DataFrame, general_settings: GeneralSettings, optimization_settings: OptimizationSettings) -> OptimizationResult:
     """Perform ABS structure optimization with improved coupon rate and Class B percentage targeting
     
@@ -298,6 +835,12 @@ def perform_optimization(df: pd.DataFrame, general_settings: GeneralSettings, op
     target_class_b_coupon_rate = optimization_settings.target_class_b_coupon_rate
     additional_days = optimization_settings.additional_days_for_class_b
     
+    # Class A nominal scaling solver and its convergence statistics
+    nominal_solver = getattr(optimization_settings, "nominal_solver", "heuristic")
+    if nominal_solver not in NOMINAL_SOLVERS:
+        raise ValueError(f"Unknown nominal solver: {nominal_solver}. Expected one of {NOMINAL_SOLVERS}")
+    solver_stats = {}
+    
     # Log the actual values used for debugging
     logger.info(f"Target Class B percent: {target_class_b_percent}, deviation: {class_b_percent_deviation}")
     logger.info(f"Selected default model: {selected_default_model}")
@@ -320,43 +863,17 @@ def perform_optimization(df: pd.DataFrame, general_settings: GeneralSettings, op
     min_buffer = general_settings.min_buffer
     
     # Get original parameters for Class A based on selected default model
-    if selected_default_model == "new":
-        # New model parameters (April 16, 2025)
-        original_maturities_A = [59, 94, 150, 189, 275]
-        original_base_rates_A = [45.5, 45.5, 45.5, 45.5, 45.5]
-        original_reinvest_rates_A = [41.0, 38.5, 35.0, 33.5, 31.5]
-        
-        # Class B values for new model
-        class_b_maturity_orig = 346
-        class_b_base_rate_orig = 0.0
-        class_b_reinvest_rate_orig = 30.0
-        
-        # Calculate total nominal amount for new model
-        total_a_nominal = 3169600000  # Sum of all Class A tranches in new model
-    else:
-        # Previous model parameters (February 13, 2025)
-        original_maturities_A = [61, 120, 182, 274]
-        original_base_rates_A = [45.6, 44.5, 43.3, 42.5]
-        original_reinvest_rates_A = [40.0, 37.25, 32.5, 30.0]
-        
-        # Class B values for previous model
-        class_b_maturity_orig = 300
-        class_b_base_rate_orig = 0.0
-        class_b_reinvest_rate_orig = 25.5
-        
-        # Calculate total nominal amount for previous model
-        total_a_nominal = 1765000000  # Original sum from previous model
+    rate_model, rate_curve = _model_rate_curve(optimization_settings)
+    class_b_base_rate_orig = rate_model['class_b_base_rate']
+    class_b_reinvest_rate_orig = rate_model['class_b_reinvest_rate']
+    total_a_nominal = rate_model['total_a_nominal']
     
     optimization_progress.update(step=10, 
-                               message="Creating rate lookup tables and preparing data...")
-    
-    # Create rate lookup tables for Class A
-    maturity_to_base_rate_A = dict(zip(original_maturities_A, original_base_rates_A))
-    maturity_to_reinvest_rate_A = dict(zip(original_maturities_A, original_reinvest_rates_A))
+                               message="Creating rate curve and preparing data...")
     
     # Define search space
     num_a_tranches_options = range(min_a_tranches, max_a_tranches + 1)
-    possible_maturities = list(range(maturity_range[0], maturity_range[1] + 1, maturity_step))
+    num_possible_maturities = len(range(maturity_range[0], maturity_range[1] + 1, maturity_step))
     
     optimization_progress.update(step=15, 
                                message=f"Using tranches from {min_a_tranches} to {max_a_tranches}")
@@ -376,19 +893,9 @@ def perform_optimization(df: pd.DataFrame, general_settings: GeneralSettings, op
     optimization_progress.update(step=20, 
                                message=f"Last cash flow day: {last_cash_flow_day}")
     
-    # Create a temporary copy of dataframe for calculations
-    df_temp = df.copy()
-    df_temp['cash_flow'] = df_temp['original_cash_flow'].copy()
-    
-    # Fix: Ensure target_date uses standard hyphen
-    target_date = pd.Timestamp('2025-02-16')
-    target_rows = df_temp[df_temp['installment_date'].dt.date == target_date.date()]
-    
-    if not target_rows.empty:
-        t_idx = target_rows.index[0]
-        orig_cf = df_temp.at[t_idx, 'cash_flow']
-        new_cf = max(0, orig_cf - ops_expenses)
-        df_temp.at[t_idx, 'cash_flow'] = new_cf
+    # Operasyonel giderler düşülmüş nakit akışları istek başına bir kez hazırlanır;
+    # salt okunur veri seti her değerlendirmede kopyalanmadan paylaşılır
+    cash_flow_index = prepare_cash_flows(df, ops_expenses)
     
     # Initialize progress counter
     current_iteration = 0
@@ -397,7 +904,7 @@ def perform_optimization(df: pd.DataFrame, general_settings: GeneralSettings, op
     total_maturity_combinations = 0
     for num_a_tranches in num_a_tranches_options:
         # Rough estimate of combinations, will be reduced later
-        total_maturity_combinations += min(1000, len(list(itertools.combinations(possible_maturities, num_a_tranches))))
+        total_maturity_combinations += min(1000, math.comb(num_possible_maturities, num_a_tranches))
     
     # 4 strategies per maturity combo
     total_iterations = total_maturity_combinations * len(selected_strategies)
@@ -411,300 +918,260 @@ def perform_optimization(df: pd.DataFrame, general_settings: GeneralSettings, op
     # Calculate Class B maturity as Last Cash Flow Day + Additional Days
     class_b_maturity = max(1, min(365, last_cash_flow_day + additional_days))
     
-    # Loop through Class A tranche counts
-    for num_a_tranches_idx, num_a_tranches in enumerate(num_a_tranches_options):
-        tranche_progress_base = 20 + (num_a_tranches_idx * 15)  # 15% progress per tranche count
-        
-        optimization_progress.update(
-            step=tranche_progress_base,
-            message=f"Testing with {num_a_tranches} Class A tranches"
+    # Different nominal distribution strategies
+    distribution_strategies = [
+        strategy for strategy in selected_strategies 
+        if strategy in ["equal", "increasing", "decreasing", "middle_weighted"]
+    ]
+    
+    # If no valid strategies, use all
+    if not distribution_strategies:
+        distribution_strategies = ["equal", "increasing", "decreasing", "middle_weighted"]
+        logger.warning(f"No valid strategies selected, using all: {distribution_strategies}")
+    
+    # Settings shared by every maturity combination (sent once to each worker process)
+    grid_settings = {
+        'start_date': start_date,
+        'ops_expenses': ops_expenses,
+        'distribution_strategies': distribution_strategies,
+        'total_a_nominal': total_a_nominal,
+        'rate_curve': rate_curve,
+        'class_b_maturity': class_b_maturity,
+        'class_b_base_rate_orig': class_b_base_rate_orig,
+        'class_b_reinvest_rate_orig': class_b_reinvest_rate_orig,
+        'target_class_b_percent': target_class_b_percent,
+        'class_b_percent_deviation': class_b_percent_deviation,
+        'target_class_b_coupon_rate': target_class_b_coupon_rate,
+        'min_buffer': min_buffer,
+        'max_allowed_diff': max_allowed_diff,
+        'nominal_solver': nominal_solver,
+    }
+    
+    # Minimum gap between consecutive maturities
+    min_gap = 15  # In days
+    
+    # Maturity combinations to test for each Class A tranche count: all gap-valid
+    # combinations if there are few, otherwise a sample stratified by average
+    # maturity. Samples are built from their rank, so large grids (e.g. step 1)
+    # never enumerate the combinations
+    max_samples = 20  # Reduced from 30 to 20 for faster processing
+    combination_plan = []
+    for num_a_tranches in num_a_tranches_options:
+        maturity_combinations = sample_maturity_combinations(
+            maturity_range[0], maturity_range[1], maturity_step,
+            num_a_tranches, min_gap, max_samples
         )
-        
-        # Minimum gap between consecutive maturities
-        min_gap = 15  # In days
-        
-        # Create sequential maturity combinations
-        maturity_combinations = []
-        for maturities in itertools.combinations(possible_maturities, num_a_tranches):
-            # Check if sorted and with minimum gap
-            sorted_maturities = sorted(maturities)
-            if all(sorted_maturities[i+1] - sorted_maturities[i] >= min_gap for i in range(len(sorted_maturities)-1)):
-                maturity_combinations.append(sorted_maturities)
-        
-        # More intelligent sampling of maturity combinations
-        # If too many combinations, use stratified sampling
-        max_samples = 20  # Reduced from 30 to 20 for faster processing
-        if len(maturity_combinations) > max_samples:
-            # Sort by average maturity and select samples from different parts of the distribution
-            sorted_combinations = sorted(maturity_combinations, 
-                                        key=lambda x: sum(x)/len(x))
-            step = len(sorted_combinations) // max_samples
-            sampled_indices = [i * step for i in range(max_samples)]
-            maturity_combinations = [sorted_combinations[i] for i in sampled_indices]
-        
-        # Calculate progress step for this set of combinations
-        combo_count = len(maturity_combinations)
-        combo_progress_step = 10 / max(1, combo_count)
-        
-        # Track consecutive failures to optimize performance
-        consecutive_failures = 0
-        max_consecutive_failures = 10  # Fast-fail threshold
-        
-        # Process maturity combinations
-        for combo_idx, maturities in enumerate(maturity_combinations):
-            combo_progress = tranche_progress_base + (combo_idx * combo_progress_step)
-            
-            # Skip updates for most combinations to reduce overhead
-            if combo_idx % 5 == 0:  # Update every 5 combinations
-                optimization_progress.update(
-                    step=int(combo_progress),
-                    message=f"Testing maturity combination {combo_idx+1}/{combo_count}: {maturities}"
-                )
-            
-            # Assign rates based on nearest original Class A maturity
-            a_base_rates = []
-            a_reinvest_rates = []
-            for m in maturities:
-                nearest = get_nearest_maturity(m, original_maturities_A)
-                a_base_rates.append(maturity_to_base_rate_A[nearest])
-                a_reinvest_rates.append(maturity_to_reinvest_rate_A[nearest])
+        combination_plan.append((num_a_tranches, maturity_combinations))
+    
+    # Combinations are adjusted and scored in worker processes when more than one
+    # worker is requested; outcomes are merged below in the serial order, so the
+    # selected structures do not depend on the worker count
+    num_workers = resolve_num_workers(
+        getattr(optimization_settings, "num_workers", 1),
+        sum(len(combinations) for _, combinations in combination_plan)
+    )
+    logger.info(f"Classic grid search with {num_workers} worker process(es)")
+    pool = None
+    futures_by_count = [None] * len(combination_plan)
+    if num_workers > 1:
+        pool = create_worker_pool(num_workers, _init_grid_worker, (df, grid_settings))
+        futures_by_count = [
+            [pool.submit(_search_grid_combination_in_worker, maturities) for maturities in combinations]
+            for _, combinations in combination_plan
+        ]
+    
+    try:
+        # Loop through Class A tranche counts
+        for num_a_tranches_idx, (num_a_tranches, maturity_combinations) in enumerate(combination_plan):
+            # Cancelled or out of budget: keep the best structures found so far
+            if should_stop():
+                break
             
-            # Use the base rate of the longest Class A tranche for Class B
-            # but always use the original reinvest rate from UI
-            if len(a_base_rates) > 0:
-                b_base_rate = a_base_rates[-1]  # Use the base rate of the longest-maturity Class A tranche
-                b_reinvest_rate = class_b_reinvest_rate_orig  # Always use original reinvest rate
-            else:
-                b_base_rate = class_b_base_rate_orig
-                b_reinvest_rate = class_b_reinvest_rate_orig
+            tranche_progress_base = 20 + (num_a_tranches_idx * 15)  # 15% progress per tranche count
             
-            # Different nominal distribution strategies
-            distribution_strategies = [
-                strategy for strategy in selected_strategies 
-                if strategy in ["equal", "increasing", "decreasing", "middle_weighted"]
-            ]
+            optimization_progress.update(
+                step=tranche_progress_base,
+                message=f"Testing with {num_a_tranches} Class A tranches"
+            )
             
-            # If no valid strategies, use all
-            if not distribution_strategies:
-                distribution_strategies = ["equal", "increasing", "decreasing", "middle_weighted"]
-                logger.warning(f"No valid strategies selected, using all: {distribution_strategies}")
+            # Calculate progress step for this set of combinations
+            combo_count = len(maturity_combinations)
+            combo_progress_step = 10 / max(1, combo_count)
+            combination_futures = futures_by_count[num_a_tranches_idx]
             
-            # Reset consecutive failures counter for each new maturity combination
+            # Track consecutive failures to optimize performance
             consecutive_failures = 0
+            max_consecutive_failures = 10  # Fast-fail threshold
             
-            # Process each strategy
-            for strategy in distribution_strategies:
-                # Calculate required Class B nominal to achieve target percentage
-                # Formula: class_b_nominal = total_a_nominal * (target_percent / (100 - target_percent))
-                target_b_share = target_class_b_percent / 100
-                class_b_nominal = (total_a_nominal * target_b_share) / (1 - target_b_share)
+            # Process maturity combinations
+            for combo_idx, maturities in enumerate(maturity_combinations):
+                if should_stop():
+                    break
                 
-                # Round to nearest 1000
-                class_b_nominal = round(class_b_nominal / 1000) * 1000
+                combo_progress = tranche_progress_base + (combo_idx * combo_progress_step)
                 
-                # Calculate total nominal amount based on Class A and B
-                remaining_nominal = total_a_nominal
+                # Skip updates for most combinations to reduce overhead
+                if combo_idx % 5 == 0:  # Update every 5 combinations
+                    optimization_progress.update(
+                        step=int(combo_progress),
+                        message=f"Testing maturity combination {combo_idx+1}/{combo_count}: {maturities}"
+                    )
                 
-                # Distribute nominal amounts based on strategy
-                if strategy == "equal":
-                    a_nominals = [remaining_nominal / num_a_tranches] * num_a_tranches
-                    
-                elif strategy == "increasing":
-                    # Weight by maturity days
-                    weights = np.array(maturities)
-                    a_nominals = (weights / weights.sum()) * remaining_nominal
-                    
-                elif strategy == "decreasing":
-                    # Inverse weight by maturity days
-                    weights = 1 / np.array(maturities)
-                    a_nominals = (weights / weights.sum()) * remaining_nominal
-                    
-                elif strategy == "middle_weighted":
-                    # Give more weight to middle tranches
-                    if num_a_tranches >= 3:
-                        weights = np.ones(num_a_tranches)
-                        mid_idx = num_a_tranches // 2
-                        weights[mid_idx] = 1.5
-                        if num_a_tranches > 3:
-                            weights[mid_idx-1] = 1.3
-                            weights[mid_idx+1] = 1.3
-                        a_nominals = (weights / weights.sum()) * remaining_nominal
-                    else:
-                        a_nominals = [remaining_nominal / num_a_tranches] * num_a_tranches
+                # Adjust and score every strategy of this combination
+                if combination_futures is None:
+                    outcome = _search_grid_combination(df, cash_flow_index, maturities, grid_settings)
                 else:
-                    # Invalid strategy, use equal distribution as fallback
-                    logger.warning(f"Unknown strategy: {strategy}, using equal distribution")
-                    a_nominals = [remaining_nominal / num_a_tranches] * num_a_tranches
-                
-                # Round to nearest 1000
-                a_nominals = [round(n / 1000) * 1000 for n in a_nominals]
+                    outcome = combination_futures[combo_idx].result()
+                merge_solver_stats(solver_stats, outcome['solver_stats'])
+                count_evaluations(len(outcome['eval_results']))
                 
-                # Ensure sum equals the remaining nominal
-                adjustment = (remaining_nominal - sum(a_nominals)) / num_a_tranches
-                a_nominals = [n + adjustment for n in a_nominals]
-                a_nominals = [round(n / 1000) * 1000 for n in a_nominals]
+                a_base_rates = outcome['a_base_rates']
+                a_reinvest_rates = outcome['a_reinvest_rates']
+                b_base_rate = outcome['b_base_rate']
+                b_reinvest_rate = outcome['b_reinvest_rate']
+                class_b_nominal = outcome['class_b_nominal']
                 
-                # Make final adjustment to last tranche to ensure exact total
-                a_nominals[-1] += remaining_nominal - sum(a_nominals)
+                # Reset consecutive failures counter for each new maturity combination
+                consecutive_failures = 0
                 
-                # Now adjust the nominals to achieve target coupon rate - use shared utility function
-                try:
-                    # Generate default spreads (all zeros)
-                    a_spreads = [0.0] * len(a_nominals)
-                    b_spread = 0.0
-                    
-                    adjusted_a_nominals, adjustment_success, adjusted_b_percent = adjust_class_a_nominals_for_target_coupon(
-                        df_temp, start_date,
-                        maturities, a_nominals, a_base_rates, a_spreads, a_reinvest_rates,
-                        class_b_maturity, b_base_rate, b_spread, b_reinvest_rate, class_b_nominal,
-                        target_class_b_coupon_rate, target_class_b_percent, min_buffer, ops_expenses,
-                        max_allowed_diff, class_b_percent_deviation
-                    )
-                    
+                # Process each strategy in order
+                for (strategy, a_nominals, adjustment_success), eval_result in zip(outcome['candidates'], outcome['eval_results']):
                     if adjustment_success:
-                        a_nominals = adjusted_a_nominals
                         # Reset consecutive failures counter on success
                         consecutive_failures = 0
                     else:
                         # Increment consecutive failures counter
                         consecutive_failures += 1
-                except Exception as e:
-                    logger.error(f"Error adjusting nominals: {str(e)}")
-                    consecutive_failures += 1
-                    # Continue with original nominals
-                
-                # Evaluate the result with the shared evaluate_params function
-                eval_result = evaluate_params(
-                    df_temp, start_date,
-                    maturities, a_nominals, class_b_maturity,
-                    maturity_to_base_rate_A, maturity_to_reinvest_rate_A,
-                    b_base_rate, b_reinvest_rate,
-                    target_class_b_percent, class_b_percent_deviation,
-                    target_class_b_coupon_rate, min_buffer,
-                    ops_expenses
-                )
-                
-                # Check if valid and meets buffer requirement
-                if eval_result['is_valid'] and eval_result['results']:
-                    result_dict = eval_result['results']
-                    total_principal = result_dict['total_principal']
-                    class_b_coupon_rate = result_dict['class_b_coupon_rate']
-                    min_buffer_actual = result_dict['min_buffer_actual']
-                    class_b_percent = result_dict['class_b_percent']
-                    class_b_percent_diff = result_dict['class_b_percent_diff']
-                    coupon_rate_diff = result_dict['coupon_rate_diff']
-                    
-                    # Improved scoring function combining both objectives
-                    # Exponential penalty for rate difference
-                    coupon_rate_weight = np.exp(-coupon_rate_diff / 2.0)
-                    # Exponential penalty for Class B percentage difference
-                    class_b_percent_weight = np.exp(-class_b_percent_diff / 2.0)
-                    # Combined weight with 60% emphasis on coupon rate, 40% on Class B percentage
-                    combined_weight = (coupon_rate_weight * 0.6) + (class_b_percent_weight * 0.4)
-                    
-                    weighted_principal = total_principal * combined_weight
-                    
-                    # Check if this is the best solution for this strategy
-                    # Use a balanced approach between coupon rate and Class B percentage matching
-                    # with a slight preference for coupon rate matching
-                    is_better = False
                     
-                    # Determine if this solution is better based on combined criteria
-                    if coupon_rate_diff <= best_coupon_rate_diff_by_strategy[strategy] * 1.1 and \
-                       class_b_percent_diff <= best_class_b_percent_diff_by_strategy[strategy] * 1.1:
-                        # If both metrics are comparable or better, use weighted principal as tiebreaker
-                        if weighted_principal > best_weighted_principal_by_strategy[strategy]:
-                            is_better = True
-                    elif coupon_rate_diff <= max_allowed_diff and \
-                         class_b_percent_diff <= class_b_percent_deviation and \
-                         weighted_principal > best_weighted_principal_by_strategy[strategy] * 1.15:
-                        # If within allowed differences and significantly better weighted principal
-                        is_better = True
-                    elif (coupon_rate_diff < best_coupon_rate_diff_by_strategy[strategy] * 0.7 or \
-                          class_b_percent_diff < best_class_b_percent_diff_by_strategy[strategy] * 0.7) and \
-                         weighted_principal > best_weighted_principal_by_strategy[strategy] * 0.9:
-                        # If one metric is much better without sacrificing too much weighted principal
-                        is_better = True
-                    
-                    if is_better:
-                        best_coupon_rate_diff_by_strategy[strategy] = coupon_rate_diff
-                        best_class_b_percent_diff_by_strategy[strategy] = class_b_percent_diff
-                        best_weighted_principal_by_strategy[strategy] = weighted_principal
+                    # Check if valid and meets buffer requirement
+                    if eval_result['is_valid'] and eval_result['results']:
+                        result_dict = eval_result['results']
+                        total_principal = result_dict['total_principal']
+                        class_b_coupon_rate = result_dict['class_b_coupon_rate']
+                        min_buffer_actual = result_dict['min_buffer_actual']
+                        class_b_percent = result_dict['class_b_percent']
+                        class_b_percent_diff = result_dict['class_b_percent_diff']
+                        coupon_rate_diff = result_dict['coupon_rate_diff']
                         
-                        # Reset consecutive failures on finding a good solution
-                        consecutive_failures = 0
+                        # Improved scoring function combining both objectives
+                        # Exponential penalty for rate difference
+                        coupon_rate_weight = np.exp(-coupon_rate_diff / 2.0)
+                        # Exponential penalty for Class B percentage difference
+                        class_b_percent_weight = np.exp(-class_b_percent_diff / 2.0)
+                        # Combined weight with 60% emphasis on coupon rate, 40% on Class B percentage
+                        combined_weight = (coupon_rate_weight * 0.6) + (class_b_percent_weight * 0.4)
                         
-                        best_params_by_strategy[strategy] = {
-                            'num_a_tranches': num_a_tranches,
-                            'a_maturity_days': list(maturities),
-                            'a_base_rates': a_base_rates,
-                            'a_reinvest_rates': a_reinvest_rates,
-                            'a_nominal_amounts': a_nominals,
-                            'b_maturity_days': [class_b_maturity],
-                            'b_base_rates': [b_base_rate],
-                            'b_reinvest_rates': [b_reinvest_rate],
-                            'b_nominal': [class_b_nominal],
-                            'strategy': strategy,
-                            'last_cash_flow_day': last_cash_flow_day,
-                            'added_days': additional_days,
-                            'class_b_percent': class_b_percent,
-                            'direct_coupon_rate': result_dict['direct_coupon_rate'],
-                            'effective_coupon_rate': result_dict['class_b_coupon_rate']
-                        }
+                        weighted_principal = total_principal * combined_weight
                         
-                        best_results_by_strategy[strategy] = {
-                            'class_a_principal': result_dict['class_a_principal'],
-                            'class_b_principal': result_dict['class_b_principal'],
-                            'class_a_interest': result_dict['class_a_interest'],
-                            'class_b_coupon': result_dict['class_b_coupon'],
-                            'class_a_total': result_dict['class_a_total'],
-                            'class_b_total': result_dict['class_b_total'],
-                            'min_buffer_actual': min_buffer_actual,
-                            'total_principal': total_principal,
-                            'class_b_coupon_rate': class_b_coupon_rate,
-                            'direct_coupon_rate': result_dict['direct_coupon_rate'],
-                            'target_class_b_coupon_rate': target_class_b_coupon_rate,
-                            'coupon_rate_diff': coupon_rate_diff,
-                            'class_b_percent': class_b_percent,
-                            'target_class_b_percent': target_class_b_percent,
-                            'class_b_percent_diff': class_b_percent_diff,
-                            'class_b_base_rate': b_base_rate,
-                            'num_a_tranches': num_a_tranches
-                        }
+                        # Check if this is the best solution for this strategy
+                        # Use a balanced approach between coupon rate and Class B percentage matching
+                        # with a slight preference for coupon rate matching
+                        is_better = False
+                        
+                        # Determine if this solution is better based on combined criteria
+                        if coupon_rate_diff <= best_coupon_rate_diff_by_strategy[strategy] * 1.1 and \
+                           class_b_percent_diff <= best_class_b_percent_diff_by_strategy[strategy] * 1.1:
+                            # If both metrics are comparable or better, use weighted principal as tiebreaker
+                            if weighted_principal > best_weighted_principal_by_strategy[strategy]:
+                                is_better = True
+                        elif coupon_rate_diff <= max_allowed_diff and \
+                             class_b_percent_diff <= class_b_percent_deviation and \
+                             weighted_principal > best_weighted_principal_by_strategy[strategy] * 1.15:
+                            # If within allowed differences and significantly better weighted principal
+                            is_better = True
+                        elif (coupon_rate_diff < best_coupon_rate_diff_by_strategy[strategy] * 0.7 or \
+                              class_b_percent_diff < best_class_b_percent_diff_by_strategy[strategy] * 0.7) and \
+                             weighted_principal > best_weighted_principal_by_strategy[strategy] * 0.9:
+                            # If one metric is much better without sacrificing too much weighted principal
+                            is_better = True
                         
+                        if is_better:
+                            best_coupon_rate_diff_by_strategy[strategy] = coupon_rate_diff
+                            best_class_b_percent_diff_by_strategy[strategy] = class_b_percent_diff
+                            best_weighted_principal_by_strategy[strategy] = weighted_principal
+                            
+                            # Reset consecutive failures on finding a good solution
+                            consecutive_failures = 0
+                            
+                            best_params_by_strategy[strategy] = {
+                                'num_a_tranches': num_a_tranches,
+                                'a_maturity_days': list(maturities),
+                                'a_base_rates': a_base_rates,
+                                'a_reinvest_rates': a_reinvest_rates,
+                                'a_nominal_amounts': a_nominals,
+                                'b_maturity_days': [class_b_maturity],
+                                'b_base_rates': [b_base_rate],
+                                'b_reinvest_rates': [b_reinvest_rate],
+                                'b_nominal': [class_b_nominal],
+                                'strategy': strategy,
+                                'last_cash_flow_day': last_cash_flow_day,
+                                'added_days': additional_days,
+                                'class_b_percent': class_b_percent,
+                                'direct_coupon_rate': result_dict['direct_coupon_rate'],
+                                'effective_coupon_rate': result_dict['class_b_coupon_rate']
+                            }
+                            
+                            best_results_by_strategy[strategy] = {
+                                'class_a_principal': result_dict['class_a_principal'],
+                                'class_b_principal': result_dict['class_b_principal'],
+                                'class_a_interest': result_dict['class_a_interest'],
+                                'class_b_coupon': result_dict['class_b_coupon'],
+                                'class_a_total': result_dict['class_a_total'],
+                                'class_b_total': result_dict['class_b_total'],
+                                'min_buffer_actual': min_buffer_actual,
+                                'total_principal': total_principal,
+                                'class_b_coupon_rate': class_b_coupon_rate,
+                                'direct_coupon_rate': result_dict['direct_coupon_rate'],
+                                'target_class_b_coupon_rate': target_class_b_coupon_rate,
+                                'coupon_rate_diff': coupon_rate_diff,
+                                'class_b_percent': class_b_percent,
+                                'target_class_b_percent': target_class_b_percent,
+                                'class_b_percent_diff': class_b_percent_diff,
+                                'class_b_base_rate': b_base_rate,
+                                'num_a_tranches': num_a_tranches
+                            }
+                            
+                            optimization_progress.update(
+                                message=f"Found better solution for {strategy}: coupon_rate={class_b_coupon_rate:.2f}%, " +
+                                       f"diff={coupon_rate_diff:.2f}%, Class B={class_b_percent:.2f}%, " +
+                                       f"total_principal={total_principal:,.2f}",
+                                best_coupon_rate=class_b_coupon_rate,
+                                best_class_b_percent=class_b_percent
+                            )
+                    
+                    # Update iteration counter
+                    current_iteration += 1
+                    
+                    # Update progress periodically
+                    if current_iteration % 20 == 0:  # Reduced frequency of updates
+                        progress_percent = min(80, 20 + int(current_iteration / total_iterations * 60))
                         optimization_progress.update(
-                            message=f"Found better solution for {strategy}: coupon_rate={class_b_coupon_rate:.2f}%, " +
-                                   f"diff={coupon_rate_diff:.2f}%, Class B={class_b_percent:.2f}%, " +
-                                   f"total_principal={total_principal:,.2f}"
+                            step=progress_percent,
+                            message=f"Completed {current_iteration} iterations out of approximately {total_iterations}"
                         )
+                    
+                    # Check if we should skip remaining strategies for this maturity combination
+                    if consecutive_failures >= max_consecutive_failures:
+                        optimization_progress.update(
+                            message=f"Skipping remaining strategies for this maturity combination due to {consecutive_failures} consecutive failures"
+                        )
+                        break
                 
-                # Update iteration counter
-                current_iteration += 1
-                
-                # Update progress periodically
-                if current_iteration % 20 == 0:  # Reduced frequency of updates
-                    progress_percent = min(80, 20 + int(current_iteration / total_iterations * 60))
-                    optimization_progress.update(
-                        step=progress_percent,
-                        message=f"Completed {current_iteration} iterations out of approximately {total_iterations}"
-                    )
-                
-                # Check if we should skip remaining strategies for this maturity combination
-                if consecutive_failures >= max_consecutive_failures:
+                # Early termination if we've found very good solutions across multiple strategies
+                good_strategies_count = sum(1 for strat in strategy_names if 
+                                          best_coupon_rate_diff_by_strategy[strat] <= 0.3 and
+                                          best_class_b_percent_diff_by_strategy[strat] <= 0.5)
+                if good_strategies_count >= 2 and combo_idx > combo_count // 4:
                     optimization_progress.update(
-                        message=f"Skipping remaining strategies for this maturity combination due to {consecutive_failures} consecutive failures"
+                        message=f"Found {good_strategies_count} very good solutions, ending search early"
                     )
+                    if combination_futures is not None:
+                        for future in combination_futures[combo_idx + 1:]:
+                            future.cancel()
                     break
-            
-            # Early termination if we've found very good solutions across multiple strategies
-            good_strategies_count = sum(1 for strat in strategy_names if 
-                                      best_coupon_rate_diff_by_strategy[strat] <= 0.3 and
-                                      best_class_b_percent_diff_by_strategy[strat] <= 0.5)
-            if good_strategies_count >= 2 and combo_idx > combo_count // 4:
-                optimization_progress.update(
-                    message=f"Found {good_strategies_count} very good solutions, ending search early"
-                )
-                break
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
     
     # Update progress to preparing results phase
     optimization_progress.update(
@@ -761,6 +1228,9 @@ def perform_optimization(df: pd.DataFrame, general_settings: GeneralSettings, op
     class_b_nominal = best_params['b_nominal'][0]
     class_b_percent = best_params['class_b_percent']
     
+    logger.info(f"Nominal solver stats: {solver_stats}")
+    logger.info(f"Evaluation cache stats: {evaluation_cache.stats()}")
+    
     # Debug logging
     print(f"*** OPTIMIZATION RESULTS ***")
     print(f"Class B coupon rate (effective): {best_results['class_b_coupon_rate']}")
@@ -791,12 +1261,508 @@ def perform_optimization(df: pd.DataFrame, general_settings: GeneralSettings, op
         min_buffer_actual=best_results['min_buffer_actual'],
         last_cash_flow_day=last_cash_flow_day,
         additional_days=additional_days,
-        results_by_strategy={k: v for k, v in best_results_by_strategy.items() if v is not None}
+        results_by_strategy={k: v for k, v in best_results_by_strategy.items() if v is not None},
+        solver_stats=solver_stats or None
+    )
+
+def _strategy_weight_lower_bounds(
+    strategy: str,
+    prefix: List[int],
+    num_a_tranches: int,
+    future_min: List[int],
+    future_max: List[int]
+) -> List[float]:
+    """Lower bounds of the distribution weights of the leading tranches.
+
+    The weights of a strategy depend on every maturity of the structure.
+    Maturities not chosen yet lie in future_min[t]..future_max[t] for the
+    positions after prefix; for a complete structure the bounds are the
+    weights _search_grid_combination uses.
+    """
+    num_prefix = len(prefix)
+    if strategy == "increasing":
+        denominator = sum(prefix) + sum(future_max)
+        return [m / denominator for m in prefix]
+    if strategy == "decreasing":
+        denominator = sum(1 / m for m in prefix) + sum(1 / m for m in future_min)
+        return [(1 / m) / denominator for m in prefix]
+    if strategy == "middle_weighted" and num_a_tranches >= 3:
+        weights = np.ones(num_a_tranches)
+        mid_idx = num_a_tranches // 2
+        weights[mid_idx] = 1.5
+        if num_a_tranches > 3:
+            weights[mid_idx-1] = 1.3
+            weights[mid_idx+1] = 1.3
+        return list(weights[:num_prefix] / weights.sum())
+    return [1 / num_a_tranches] * num_prefix
+
+def _strategy_weight_upper_bounds(
+    strategy: str,
+    prefix: List[int],
+    num_a_tranches: int,
+    future_min: List[int],
+    future_max: List[int]
+) -> List[float]:
+    """Upper bounds of the distribution weights of the leading tranches.
+
+    Counterpart of _strategy_weight_lower_bounds: the maturities not chosen
+    yet are taken at the end of their range that makes the leading weights largest.
+    """
+    if strategy in ("increasing", "decreasing"):
+        return _strategy_weight_lower_bounds(strategy, prefix, num_a_tranches, future_max, future_min)
+    return _strategy_weight_lower_bounds(strategy, prefix, num_a_tranches, future_min, future_max)
+
+# Largest maturity grid branch and bound searches without a max_seconds or max_evaluations budget
+MAX_BRANCH_AND_BOUND_COMBINATIONS = 100_000
+
+@cached_result
+@controlled_run
+def perform_branch_and_bound_optimization(df: pd.DataFrame, general_settings: GeneralSettings, optimization_settings: OptimizationSettings) -> OptimizationResult:
+    """Exact maturity search over the whole maturity grid with buffer bound pruning
+    
+    Every gap-valid maturity combination of the grid is reached by a depth-first
+    search that picks the Class A maturities in increasing order. At each node the
+    buffer ratios of the chosen leading tranches are bounded from above by running
+    the waterfall with the smallest nominals any distribution strategy and nominal
+    adjustment can give them. A strategy whose bound is below the minimum buffer
+    cannot produce a valid structure anywhere in the subtree. The Class B coupon
+    rate of the subtree is bounded from below the same way with the largest
+    nominals, and a strategy whose coupon is already too far above the target to
+    beat its best structure so far is dropped as well. Subtrees without strategies
+    left are pruned. Combinations that survive are adjusted and scored exactly like
+    in perform_optimization, and the best structure is chosen with the classic
+    final criteria over all of them instead of over a sample.
+    
+    Grids with more than MAX_BRANCH_AND_BOUND_COMBINATIONS combinations are only
+    searched with a max_seconds or max_evaluations budget.
+    
+    Args:
+        df: DataFrame containing cash flow data
+        general_settings: General settings for the optimization
+        optimization_settings: Optimization-specific settings
+        
+    Returns:
+        OptimizationResult object with the optimized structure and the search statistics
+    """
+    optimization_progress.update(step=0, total=100,
+                                phase="Branch and Bound",
+                                message="Starting exhaustive maturity search...")
+    
+    # Extract settings
+    min_a_tranches, max_a_tranches = optimization_settings.a_tranches_range
+    maturity_range = optimization_settings.maturity_range
+    maturity_step = optimization_settings.maturity_step
+    target_class_b_percent = getattr(optimization_settings, "min_class_b_percent", 15.0)
+    class_b_percent_deviation = getattr(optimization_settings, "class_b_percent_deviation", 1.0)
+    target_class_b_coupon_rate = optimization_settings.target_class_b_coupon_rate
+    additional_days = optimization_settings.additional_days_for_class_b
+    
+    nominal_solver = getattr(optimization_settings, "nominal_solver", "heuristic")
+    if nominal_solver not in NOMINAL_SOLVERS:
+        raise ValueError(f"Unknown nominal solver: {nominal_solver}. Expected one of {NOMINAL_SOLVERS}")
+    solver_stats = {}
+    
+    strategy_names = ["equal", "increasing", "decreasing", "middle_weighted"]
+    selected_strategies = getattr(optimization_settings, "selected_strategies", strategy_names)
+    distribution_strategies = [strategy for strategy in selected_strategies if strategy in strategy_names]
+    if not distribution_strategies:
+        distribution_strategies = list(strategy_names)
+        logger.warning(f"No valid strategies selected, using all: {distribution_strategies}")
+    
+    max_allowed_diff = 0.5
+    start_date = pd.Timestamp(general_settings.start_date)
+    ops_expenses = general_settings.operational_expenses
+    min_buffer = general_settings.min_buffer
+    
+    # Get original parameters for Class A based on selected default model
+    rate_model, rate_curve = _model_rate_curve(optimization_settings)
+    class_b_base_rate_orig = rate_model['class_b_base_rate']
+    class_b_reinvest_rate_orig = rate_model['class_b_reinvest_rate']
+    total_a_nominal = rate_model['total_a_nominal']
+    
+    last_cash_flow_day = get_last_cash_flow_day(df, start_date)
+    class_b_maturity = max(1, min(365, last_cash_flow_day + additional_days))
+    cash_flow_index = prepare_cash_flows(df, ops_expenses)
+    
+    grid_settings = {
+        'start_date': start_date,
+        'ops_expenses': ops_expenses,
+        'distribution_strategies': distribution_strategies,
+        'total_a_nominal': total_a_nominal,
+        'rate_curve': rate_curve,
+        'class_b_maturity': class_b_maturity,
+        'class_b_base_rate_orig': class_b_base_rate_orig,
+        'class_b_reinvest_rate_orig': class_b_reinvest_rate_orig,
+        'target_class_b_percent': target_class_b_percent,
+        'class_b_percent_deviation': class_b_percent_deviation,
+        'target_class_b_coupon_rate': target_class_b_coupon_rate,
+        'min_buffer': min_buffer,
+        'max_allowed_diff': max_allowed_diff,
+        'nominal_solver': nominal_solver,
+    }
+    
+    # Maturity grid and the minimum gap between consecutive maturities in grid positions
+    min_gap = 15  # In days
+    grid = list(range(maturity_range[0], maturity_range[1] + 1, maturity_step))
+    gap = max(1, math.ceil(min_gap / maturity_step))
+    
+    # Smallest Class A total a candidate can have: adjusted nominals keep the
+    # Class B share at most max_class_b_percent of the grid Class B nominal,
+    # and failed adjustments keep the original total
+    target_b_share = target_class_b_percent / 100
+    class_b_nominal = round(total_a_nominal * target_b_share / (1 - target_b_share) / 1000) * 1000
+    max_class_b_percent = min(50, target_class_b_percent + class_b_percent_deviation)
+    min_a_total = min(total_a_nominal, max(0.001 * total_a_nominal, class_b_nominal * (100 / max_class_b_percent - 1)))
+    # Largest one likewise, from the other end of the Class B band; candidates
+    # are evaluated with the target share of their total as Class B nominal
+    min_class_b_percent = max(0.1, target_class_b_percent - class_b_percent_deviation)
+    max_a_total = max(total_a_nominal, class_b_nominal * (100 / min_class_b_percent - 1))
+    class_b_share_ratio = target_b_share / (1 - target_b_share)
+    
+    # Reinvest rate of each grid maturity, as assigned in _search_grid_combination
+    grid_reinvest_rates = rate_curve.reinvest_rate_list(grid)
+    
+    # The coupon bound needs non-negative reinvestment returns and buffer growth
+    start_row = cash_flow_index.tranche_bounds(start_date, [0])[2]
+    total_cash = float(cash_flow_index.cash_flows[start_row:].sum())
+    coupon_bound_applies = (
+        bool((cash_flow_index.cash_flows >= 0).all()) and
+        min(grid_reinvest_rates + [class_b_reinvest_rate_orig]) >= 0
+    )
+    
+    total_combinations = sum(
+        count_maturity_combinations(len(grid), n, maturity_step, min_gap)
+        for n in range(min_a_tranches, max_a_tranches + 1)
+    )
+    if total_combinations > MAX_BRANCH_AND_BOUND_COMBINATIONS and \
+            getattr(optimization_settings, "max_seconds", None) is None and \
+            getattr(optimization_settings, "max_evaluations", None) is None:
+        raise ValueError(
+            f"Branch and bound would search {total_combinations} maturity combinations, more than "
+            f"{MAX_BRANCH_AND_BOUND_COMBINATIONS}. Set max_seconds or max_evaluations, or use a "
+            f"larger maturity_step, a narrower maturity_range or fewer Class A tranches."
+        )
+    search_stats = {
+        'total_combinations': total_combinations,
+        'evaluated_combinations': 0,
+        'pruned_combinations': 0,
+        'explored_nodes': 0,
+        'pruned_nodes': 0,
+        'pruned_strategies': 0,
+        'score_pruned_strategies': 0,
+    }
+    optimization_progress.update(step=5, message=f"Searching {total_combinations} maturity combinations")
+    
+    best_key_by_strategy = {}
+    best_params_by_strategy = {}
+    best_results_by_strategy = {}
+    
+    def record_outcome(num_a_tranches, maturities, outcome):
+        """Keep the best valid candidate of every strategy by the final selection key."""
+        for (strategy, a_nominals, _), eval_result in zip(outcome['candidates'], outcome['eval_results']):
+            if not (eval_result['is_valid'] and eval_result['results']):
+                continue
+            result_dict = eval_result['results']
+            key = (
+                (result_dict['coupon_rate_diff'] / target_class_b_coupon_rate * 0.6) +
+                (result_dict['class_b_percent_diff'] / target_class_b_percent * 0.4),
+                -result_dict['total_principal']
+            )
+            if strategy in best_key_by_strategy and not key < best_key_by_strategy[strategy]:
+                continue
+            best_key_by_strategy[strategy] = key
+            best_params_by_strategy[strategy] = {
+                'a_maturity_days': list(maturities),
+                'a_base_rates': outcome['a_base_rates'],
+                'a_reinvest_rates': outcome['a_reinvest_rates'],
+                'a_nominal_amounts': a_nominals,
+                'b_base_rate': outcome['b_base_rate'],
+                'b_reinvest_rate': outcome['b_reinvest_rate'],
+                'b_nominal': outcome['class_b_nominal'],
+                'class_b_percent': result_dict['class_b_percent'],
+            }
+            best_results_by_strategy[strategy] = {
+                'class_a_principal': result_dict['class_a_principal'],
+                'class_b_principal': result_dict['class_b_principal'],
+                'class_a_interest': result_dict['class_a_interest'],
+                'class_b_coupon': result_dict['class_b_coupon'],
+                'class_a_total': result_dict['class_a_total'],
+                'class_b_total': result_dict['class_b_total'],
+                'min_buffer_actual': result_dict['min_buffer_actual'],
+                'total_principal': result_dict['total_principal'],
+                'class_b_coupon_rate': result_dict['class_b_coupon_rate'],
+                'direct_coupon_rate': result_dict['direct_coupon_rate'],
+                'target_class_b_coupon_rate': target_class_b_coupon_rate,
+                'coupon_rate_diff': result_dict['coupon_rate_diff'],
+                'class_b_percent': result_dict['class_b_percent'],
+                'target_class_b_percent': target_class_b_percent,
+                'class_b_percent_diff': result_dict['class_b_percent_diff'],
+                'class_b_base_rate': outcome['b_base_rate'],
+                'num_a_tranches': num_a_tranches
+            }
+            if key <= min(best_key_by_strategy.values()):
+                optimization_progress.update(
+                    best_coupon_rate=result_dict['class_b_coupon_rate'],
+                    best_class_b_percent=result_dict['class_b_percent']
+                )
+    
+    def competitive_a_totals(best_score):
+        """Class A total range of the successfully adjusted candidates with a selection key below best_score.
+        
+        A successful adjustment brings the coupon at the grid Class B nominal within
+        max_allowed_diff of the target. The candidate is then evaluated with the
+        target share of its total as Class B nominal (within rounding), so its coupon
+        rate moves away from the target as the total moves away from the original one.
+        """
+        period = class_b_maturity / 36500
+        rate_tolerance = best_score / 0.6 * target_class_b_coupon_rate
+        lower, upper = min_a_total, max_a_total
+        if target_class_b_coupon_rate > max_allowed_diff:
+            class_b_nominal_min = ((target_class_b_coupon_rate - max_allowed_diff) * period + 1) * class_b_nominal / (
+                1 + (target_class_b_coupon_rate + rate_tolerance) * period
+            )
+            lower = max(min_a_total, (class_b_nominal_min - 1000) / class_b_share_ratio)
+        denominator = 1 + (target_class_b_coupon_rate - rate_tolerance) * period
+        if denominator > 0:
+            class_b_nominal_max = ((target_class_b_coupon_rate + max_allowed_diff) * period + 1) * class_b_nominal / denominator
+            upper = min(max_a_total, (class_b_nominal_max + 1000) / class_b_share_ratio)
+        return lower, upper
+    
+    def report_progress():
+        done = search_stats['evaluated_combinations'] + search_stats['pruned_combinations']
+        optimization_progress.update(
+            step=min(90, 5 + int(done / max(1, total_combinations) * 85)),
+            message=f"Searched {done}/{total_combinations} combinations "
+                    f"({search_stats['pruned_combinations']} pruned)"
+        )
+    
+    def visit(num_a_tranches, positions, strategies):
+        """Depth-first search below the leading grid positions with the strategies still possible."""
+        if should_stop():
+            return
+        search_stats['explored_nodes'] += 1
+        num_prefix = len(positions)
+        
+        if num_prefix > 0:
+            prefix = [grid[p] for p in positions]
+            reinvest_rates = [grid_reinvest_rates[p] for p in positions]
+            totals = cash_flow_index.tranche_totals(start_date, prefix, reinvest_rates, include_tail=False)
+            
+            # Earliest and latest grid maturities of the tranches still to choose
+            future_min = [grid[positions[-1] + (t + 1) * gap] for t in range(num_a_tranches - num_prefix)]
+            future_max = [grid[len(grid) - 1 - (num_a_tranches - num_prefix - 1 - t) * gap]
+                          for t in range(num_a_tranches - num_prefix)]
+            rounding_margin = 1000 * (3 * num_a_tranches + 4)
+            
+            # Coupon bound inputs; a complete structure adds its Class B tranche
+            if coupon_bound_applies and best_key_by_strategy:
+                if num_prefix == num_a_tranches:
+                    coupon_days = prefix + [class_b_maturity]
+                    coupon_rates = reinvest_rates + [class_b_reinvest_rate_orig]
+                    coupon_totals = cash_flow_index.tranche_totals(start_date, coupon_days, coupon_rates)
+                    remaining_cash = 0.0
+                else:
+                    coupon_days, coupon_rates, coupon_totals = prefix, reinvest_rates, totals
+                    remaining_cash = total_cash - float(totals[0].sum())
+            
+            def coupon_rate_bound(weights, a_total, class_b_nominal_bound):
+                """Class B coupon rate lower bound for Class A totals up to a_total."""
+                # Adjusted nominals keep the strategy proportions of the rounded originals
+                nominal_slack = rounding_margin * a_total / total_a_nominal
+                return class_b_coupon_rate_bound(
+                    coupon_totals, coupon_days, coupon_rates, [w * a_total + nominal_slack for w in weights],
+                    remaining_cash, a_total + rounding_margin, class_b_nominal_bound, class_b_maturity
+                )
+            
+            surviving = []
+            for strategy in strategies:
+                weights = _strategy_weight_lower_bounds(strategy, prefix, num_a_tranches, future_min, future_max)
+                nominal_lower_bounds = [max(1000, w * min_a_total - rounding_margin) for w in weights]
+                if class_a_buffer_ratio_bound(totals, prefix, reinvest_rates, nominal_lower_bounds) < min_buffer:
+                    continue
+                
+                best_key = best_key_by_strategy.get(strategy)
+                if best_key is None:
+                    surviving.append(strategy)
+                    continue
+                
+                # Candidates that can still beat the best key of the strategy keep the
+                # original Class A total or are adjusted to one in the competitive range
+                competitive_lower, competitive_upper = competitive_a_totals(best_key[0])
+                a_lower = min(total_a_nominal, competitive_lower)
+                if a_lower > min_a_total:
+                    nominal_lower_bounds = [max(1000, w * a_lower - rounding_margin) for w in weights]
+                    if class_a_buffer_ratio_bound(totals, prefix, reinvest_rates, nominal_lower_bounds) < min_buffer:
+                        search_stats['score_pruned_strategies'] += 1
+                        continue
+                
+                # The selection key is at least its coupon part. Successful adjustments
+                # are only possible when the coupon at the grid Class B nominal can come
+                # down to the target within the range; otherwise all candidates keep
+                # the original total
+                if coupon_bound_applies:
+                    upper_weights = _strategy_weight_upper_bounds(strategy, prefix, num_a_tranches, future_min, future_max)
+                    a_total = total_a_nominal
+                    if coupon_rate_bound(upper_weights, competitive_upper, class_b_nominal) <= target_class_b_coupon_rate + max_allowed_diff:
+                        a_total = max(total_a_nominal, competitive_upper)
+                    lower_bound = coupon_rate_bound(
+                        upper_weights, a_total, (a_total + rounding_margin) * class_b_share_ratio + 1000
+                    )
+                    if (lower_bound - target_class_b_coupon_rate) / target_class_b_coupon_rate * 0.6 > best_key[0]:
+                        search_stats['score_pruned_strategies'] += 1
+                        continue
+                surviving.append(strategy)
+            search_stats['pruned_strategies'] += len(strategies) - len(surviving)
+            strategies = surviving
+            
+            if not strategies:
+                search_stats['pruned_nodes'] += 1
+                search_stats['pruned_combinations'] += count_maturity_combinations(
+                    len(grid) - positions[-1] - gap, num_a_tranches - num_prefix, maturity_step, min_gap
+                ) if num_prefix < num_a_tranches else 1
+                return
+        
+        if num_prefix == num_a_tranches:
+            maturities = [grid[p] for p in positions]
+            outcome = _search_grid_combination(
+                df, cash_flow_index, maturities, dict(grid_settings, distribution_strategies=strategies)
+            )
+            merge_solver_stats(solver_stats, outcome['solver_stats'])
+            count_evaluations(len(outcome['eval_results']))
+            record_outcome(num_a_tranches, maturities, outcome)
+            search_stats['evaluated_combinations'] += 1
+            if search_stats['evaluated_combinations'] % 50 == 0:
+                report_progress()
+            return
+        
+        first = positions[-1] + gap if positions else 0
+        last = len(grid) - 1 - (num_a_tranches - num_prefix - 1) * gap
+        for p in range(first, last + 1):
+            visit(num_a_tranches, positions + [p], strategies)
+    
+    for num_a_tranches in range(min_a_tranches, max_a_tranches + 1):
+        optimization_progress.update(message=f"Searching structures with {num_a_tranches} Class A tranches")
+        if count_maturity_combinations(len(grid), num_a_tranches, maturity_step, min_gap) > 0:
+            visit(num_a_tranches, [], distribution_strategies)
+        report_progress()
+    
+    logger.info(f"Branch and bound search stats: {search_stats}")
+    
+    if not best_results_by_strategy:
+        optimization_progress.update(
+            step=90,
+            message="No valid configuration found. Try adjusting optimization parameters."
+        )
+        raise ValueError("No valid configuration found. Try adjusting optimization parameters.")
+    
+    # The strategy keys are the classic final selection criteria
+    best_strategy = min(best_key_by_strategy, key=best_key_by_strategy.get)
+    best_params = best_params_by_strategy[best_strategy]
+    best_results = best_results_by_strategy[best_strategy]
+    
+    optimization_progress.update(
+        step=100,
+        phase="Complete",
+        message=f"Selected best strategy: {best_strategy}, coupon_rate: {best_results['class_b_coupon_rate']:.2f}%, " +
+               f"Class B: {best_results['class_b_percent']:.2f}%, searched {search_stats['evaluated_combinations']} " +
+               f"and pruned {search_stats['pruned_combinations']} combinations"
+    )
+    
+    return OptimizationResult(
+        best_strategy=best_strategy,
+        class_a_maturities=best_params['a_maturity_days'],
+        class_a_nominals=best_params['a_nominal_amounts'],
+        class_a_rates=best_params['a_base_rates'],
+        class_a_reinvest=best_params['a_reinvest_rates'],
+        class_b_maturity=class_b_maturity,
+        class_b_rate=best_params['b_base_rate'],
+        class_b_reinvest=best_params['b_reinvest_rate'],
+        class_b_nominal=best_params['b_nominal'],
+        class_b_percent=best_params['class_b_percent'],
+        class_b_coupon_rate=best_results['class_b_coupon_rate'],
+        direct_class_b_coupon_rate=best_results['direct_coupon_rate'],
+        min_buffer_actual=best_results['min_buffer_actual'],
+        last_cash_flow_day=last_cash_flow_day,
+        additional_days=additional_days,
+        results_by_strategy=best_results_by_strategy,
+        solver_stats=solver_stats or None,
+        search_stats=search_stats
     )
 
+def _adjust_individual(
+    df: pd.DataFrame,
+    cash_flow_index: CashFlowIndex,
+    task: Tuple[List[int], List[float], List[float], List[float], float],
+    ga_settings: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Nominal adjustment of one genetic individual for the target coupon rate.
+
+    Args:
+        df: DataFrame containing cash flow data
+        cash_flow_index: CashFlowIndex prepared for df and the operational expenses
+        task: (maturities, nominals, a_base_rates, a_reinvest_rates, class_b_nominal)
+        ga_settings: Settings shared by all individuals (see perform_genetic_optimization)
+
+    Returns:
+        Dictionary with the adjusted nominals, success flag, adjusted Class B
+        percent, solver statistics and the error message if adjustment failed
+    """
+    maturities, nominals, a_base_rates, a_reinvest_rates, class_b_nominal = task
+    solver_stats = {}
+    try:
+        # Generate default spreads (all zeros)
+        a_spreads = [0.0] * len(nominals)
+        b_spread = 0.0
+        
+        adjusted_nominals, adjustment_success, adjusted_b_percent = adjust_class_a_nominals_for_target_coupon(
+            df, ga_settings['start_date'],
+            maturities, nominals, a_base_rates, a_spreads, a_reinvest_rates,
+            ga_settings['class_b_maturity'], ga_settings['class_b_base_rate'], b_spread,
+            ga_settings['class_b_reinvest_rate'], class_b_nominal,
+            ga_settings['target_class_b_coupon_rate'], ga_settings['target_class_b_percent'],
+            ga_settings['min_buffer'], ga_settings['ops_expenses'],
+            cash_flow_index=cash_flow_index,
+            solver=ga_settings['nominal_solver'], stats=solver_stats
+        )
+    except Exception as e:
+        return {'nominals': None, 'success': False, 'class_b_percent': None,
+                'solver_stats': solver_stats, 'error': str(e)}
+    return {'nominals': adjusted_nominals, 'success': adjustment_success, 'class_b_percent': adjusted_b_percent,
+            'solver_stats': solver_stats, 'error': None}
+
+# Request data of a genetic fitness worker process, set once by _init_genetic_worker
+_genetic_worker_state: Dict[str, Any] = {}
+
+def _init_genetic_worker(frame_spec: List[Tuple[str, str, str, int]], ga_settings: Dict[str, Any]) -> None:
+    """Process pool initializer: attach the shared memory tape and build its CashFlowIndex once per worker."""
+    df, blocks = attach_shared_frame(frame_spec)
+    _genetic_worker_state['blocks'] = blocks  # views stay valid while the blocks are referenced
+    _genetic_worker_state['df'] = df
+    _genetic_worker_state['ga_settings'] = ga_settings
+    _genetic_worker_state['cash_flow_index'] = prepare_cash_flows(df, ga_settings['ops_expenses'])
+
+def _adjust_individual_in_worker(task: Tuple[List[int], List[float], List[float], List[float], float]) -> Dict[str, Any]:
+    """_adjust_individual on the shared tape of this worker process."""
+    return _adjust_individual(
+        _genetic_worker_state['df'], _genetic_worker_state['cash_flow_index'],
+        task, _genetic_worker_state['ga_settings']
+    )
+
+def _release_worker_pool(pool: Optional[Any], shared_frame: Optional[SharedFrame]) -> None:
+    """Stop worker processes, then free the shared memory they read."""
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+    if shared_frame is not None:
+        shared_frame.close()
+
+@cached_result
+@controlled_run
 def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSettings, optimization_settings: OptimizationSettings) -> OptimizationResult:
     """Genetic algorithm optimization with improved Class B percentage targeting - 
     Uses shared calculation logic from tranche_utils"""
+    # Fitness worker processes and the shared memory tape they read, if used
+    pool = None
+    shared_frame = None
     try:
         # Initialize progress tracking
         optimization_progress.update(step=0, total=100, 
@@ -819,6 +1785,12 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
         # Use the tighter class_b_percent_deviation value (default 1.0)
         class_b_percent_deviation = getattr(optimization_settings, "class_b_percent_deviation", 1.0)
         
+        # Class A nominal scaling solver and its convergence statistics
+        nominal_solver = getattr(optimization_settings, "nominal_solver", "heuristic")
+        if nominal_solver not in NOMINAL_SOLVERS:
+            raise ValueError(f"Unknown nominal solver: {nominal_solver}. Expected one of {NOMINAL_SOLVERS}")
+        solver_stats = {}
+        
         # Log the actual values used for debugging
         logger.info(f"Genetic: Target Class B percent: {target_class_b_percent}, deviation: {class_b_percent_deviation}")
         logger.info(f"Genetic: Selected default model: {selected_default_model}")
@@ -828,6 +1800,10 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
         population_size = getattr(optimization_settings, "population_size", 50)
         num_generations = getattr(optimization_settings, "num_generations", 40)
         
+        # Seeded generator for reproducible runs; the module RNG otherwise
+        random_seed = getattr(optimization_settings, "random_seed", None)
+        rng = random.Random(random_seed) if random_seed is not None else random
+        
         optimization_progress.update(step=5, 
                                     message=f"Population size: {population_size}, generations: {num_generations}, " +
                                            f"Target Class B: {target_class_b_percent}±{class_b_percent_deviation}%")
@@ -847,58 +1823,34 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
         class_b_maturity = max(1, min(365, last_cash_flow_day + additional_days))
         
         # Get original parameters for Class A based on selected default model
-        if selected_default_model == "new":
-            # New model parameters (April 16, 2025)
-            original_maturities_A = [59, 94, 150, 189, 275]
-            original_base_rates_A = [45.5, 45.5, 45.5, 45.5, 45.5]
-            original_reinvest_rates_A = [41.0, 38.5, 35.0, 33.5, 31.5]
-            
-            # Class B values for new model
-            class_b_base_rate_orig = 0.0
-            class_b_reinvest_rate_orig = 30.0
-            
-            # Calculate total nominal amount for new model
-            total_a_nominal = 3169600000  # Sum of all Class A tranches in new model
-            
-            # Fixed number of tranches for new model
-            default_num_a_tranches = 5  # New model has 5 tranches
-        else:
-            # Previous model parameters (February 13, 2025)
-            original_maturities_A = [61, 120, 182, 274]
-            original_base_rates_A = [45.6, 44.5, 43.3, 42.5]
-            original_reinvest_rates_A = [40.0, 37.25, 32.5, 30.0]
-            
-            # Class B values for previous model
-            class_b_base_rate_orig = 0.0
-            class_b_reinvest_rate_orig = 25.5
-            
-            # Calculate total nominal amount for previous model
-            total_a_nominal = 1765000000  # Original sum from previous model
-            
-            # Fixed number of tranches for previous model
-            default_num_a_tranches = 4  # Previous model has 4 tranches
+        rate_model, rate_curve = _model_rate_curve(optimization_settings)
+        class_b_base_rate_orig = rate_model['class_b_base_rate']
+        class_b_reinvest_rate_orig = rate_model['class_b_reinvest_rate']
+        total_a_nominal = rate_model['total_a_nominal']
         
-        # Create rate lookup tables for Class A
-        maturity_to_base_rate_A = dict(zip(original_maturities_A, original_base_rates_A))
-        maturity_to_reinvest_rate_A = dict(zip(original_maturities_A, original_reinvest_rates_A))
+        # Fixed number of tranches: the tranche count of the model
+        default_num_a_tranches = len(rate_model['maturities'])
         
         # Update progress to 15%
         optimization_progress.update(step=15, 
                                     message="Preparing optimization data...")
         
-        # Create temporary dataframe for calculation
-        df_temp = df.copy()
-        df_temp['cash_flow'] = df_temp['original_cash_flow'].copy()
-        
-        # Fix: Ensure target_date uses standard hyphen
-        target_date = pd.Timestamp('2025-02-16')
-        target_rows = df_temp[df_temp['installment_date'].dt.date == target_date.date()]
-        
-        if not target_rows.empty:
-            t_idx = target_rows.index[0]
-            orig_cf = df_temp.at[t_idx, 'cash_flow']
-            new_cf = max(0, orig_cf - ops_expenses)
-            df_temp.at[t_idx, 'cash_flow'] = new_cf
+        # Operasyonel giderler düşülmüş nakit akışları istek başına bir kez hazırlanır;
+        # salt okunur veri seti her değerlendirmede kopyalanmadan paylaşılır
+        cash_flow_index = prepare_cash_flows(df, ops_expenses)
+        
+        # Settings of the nominal adjustment (sent once to each worker process)
+        ga_settings = {
+            'start_date': start_date,
+            'ops_expenses': ops_expenses,
+            'class_b_maturity': class_b_maturity,
+            'class_b_base_rate': class_b_base_rate_orig,
+            'class_b_reinvest_rate': class_b_reinvest_rate_orig,
+            'target_class_b_coupon_rate': target_class_b_coupon_rate,
+            'target_class_b_percent': target_class_b_percent,
+            'min_buffer': min_buffer,
+            'nominal_solver': nominal_solver,
+        }
         
         # Fixed number of tranches - use the default for the selected model
         num_a_tranches = default_num_a_tranches
@@ -921,7 +1873,7 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
         def create_valid_individual():
             # Generate valid maturities - ensure they are integers
             maturities = []
-            maturities.append(random.randint(min_maturity, min_maturity + 60))
+            maturities.append(rng.randint(min_maturity, min_maturity + 60))
             
             for j in range(1, num_a_tranches):
                 prev_maturity = maturities[j-1]
@@ -931,13 +1883,13 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
                 if min_new > max_new:
                     min_new = max_new
                 
-                maturities.append(random.randint(min_new, max_new))
+                maturities.append(rng.randint(min_new, max_new))
             
             # Ensure all maturities are integers
             maturities = [int(m) for m in maturities]
             
             # Random weights
-            weights = [random.random() for _ in range(num_a_tranches)]
+            weights = [rng.random() for _ in range(num_a_tranches)]
             total_weight = sum(weights)
             weights = [w / total_weight for w in weights]
             
@@ -948,7 +1900,7 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
             # This is a key enhancement in the genetic algorithm
             min_percent = max(0.1, target_class_b_percent - class_b_percent_deviation)
             max_percent = min(50, target_class_b_percent + class_b_percent_deviation)
-            random_b_percent = random.uniform(min_percent, max_percent)
+            random_b_percent = rng.uniform(min_percent, max_percent)
             
             # Calculate Class B nominal based on random percentage
             # Formula: class_b_nominal = total_a_nominal * (b_percent / (100 - b_percent))
@@ -1014,15 +1966,29 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
         
         generation_progress_step = 50 / num_generations  # 50% of progress for generations
         
+        # Fitness evaluations of a generation are independent: with more than one
+        # worker, nominal adjustments run in processes that read the tape from
+        # shared memory. Outcomes are applied in population order, so a seeded
+        # run gives the same result for any worker count.
+        num_workers = resolve_num_workers(getattr(optimization_settings, "num_workers", 1), len(population))
+        if num_workers > 1:
+            shared_frame = SharedFrame(df)
+            pool = create_worker_pool(num_workers, _init_genetic_worker, (shared_frame.spec, ga_settings))
+            logger.info(f"Genetic: fitness evaluation with {num_workers} worker processes")
+        
         # Tournament selection function
         def tournament_select(pop, tournament_size=3):
             if not pop:
                 raise ValueError("Empty population for tournament selection")
                 
-            contestants = random.sample(pop, min(tournament_size, len(pop)))
+            contestants = rng.sample(pop, min(tournament_size, len(pop)))
             return max(contestants, key=lambda x: x.get('fitness', -float('inf')))
         
         for generation in range(num_generations):
+            # Cancelled or out of budget: keep the best individual found so far
+            if should_stop():
+                break
+            
             # Update progress for each generation
             generation_progress = 25 + int(generation * generation_progress_step)
             optimization_progress.update(
@@ -1036,6 +2002,9 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
             fitness_sum = 0
             valid_count = 0
             
+            # Prepare the nominal adjustment of every individual
+            candidates = []
+            adjustment_tasks = []
             for idx, individual in enumerate(population):
                 try:
                     maturities = individual['maturities']
@@ -1046,11 +2015,9 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
                     maturities_int = [int(m) for m in maturities]
                     
                     # Get rates based on nearest maturity
-                    a_base_rates = [maturity_to_base_rate_A.get(
-                        get_nearest_maturity(m, list(maturity_to_base_rate_A.keys())), 42.0) for m in maturities_int]
+                    a_base_rates = rate_curve.base_rate_list(maturities_int)
                     
-                    a_reinvest_rates = [maturity_to_reinvest_rate_A.get(
-                        get_nearest_maturity(m, list(maturity_to_reinvest_rate_A.keys())), 30.0) for m in maturities_int]
+                    a_reinvest_rates = rate_curve.reinvest_rate_list(maturities_int)
                     
                     # Calculate actual Class B percentage
                     total_a_nominal = sum(nominals)
@@ -1059,78 +2026,91 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
                     
                     individual['class_b_percent'] = actual_b_percent
                     
-                    # Try to adjust nominals for target coupon rate using the shared utility function
-                    try:
-                        # Generate default spreads (all zeros)
-                        a_spreads = [0.0] * len(nominals)
-                        b_spread = 0.0
-                        
-                        adjusted_nominals, adjustment_success, adjusted_b_percent = adjust_class_a_nominals_for_target_coupon(
-                            df_temp, start_date,
-                            maturities_int, nominals, a_base_rates, a_spreads, a_reinvest_rates,
-                            class_b_maturity, class_b_base_rate_orig, b_spread, class_b_reinvest_rate_orig, class_b_nominal,
-                            target_class_b_coupon_rate, target_class_b_percent, min_buffer, ops_expenses
-                        )
-                        
-                        if adjustment_success:
-                            nominals = adjusted_nominals
-                            individual['nominals'] = nominals
-                            individual['class_b_percent'] = adjusted_b_percent
-                    except Exception as e:
-                        logger.error(f"Error adjusting nominals: {str(e)}")
-                        # Continue with original nominals
-                    
-                    # Evaluate the adjusted parameters using shared evaluate_params
-                    eval_result = evaluate_params(
-                        df_temp, start_date,
-                        maturities_int, nominals, class_b_maturity,
-                        maturity_to_base_rate_A, maturity_to_reinvest_rate_A,
-                        class_b_base_rate_orig, class_b_reinvest_rate_orig,
-                        target_class_b_percent, class_b_percent_deviation,
-                        target_class_b_coupon_rate, min_buffer,
-                        ops_expenses
-                    )
-                    
-                    # Set fitness - ensure it's a number
-                    if eval_result['is_valid']:
-                        individual['fitness'] = float(eval_result['score'])
-                        individual['result'] = eval_result
-                        fitness_sum += individual['fitness']
-                        valid_count += 1
-                    else:
-                        individual['fitness'] = -1.0 # Invalid but better than -inf for selection
-                        individual['result'] = None
-                    
-                    # Track the best
-                    if individual['fitness'] > best_fitness:
-                        best_fitness = individual['fitness']
-                        best_individual = individual.copy()
-                        logger.info(f"Found better solution: score={best_fitness}")
-                        
-                        # Update progress message when finding better solution
-                        if 'result' in individual and individual['result'] and 'results' in individual['result']:
-                            results = individual['result']['results']
-                            if results:
-                                coupon_rate = results.get('class_b_coupon_rate', 0)
-                                coupon_diff = abs(coupon_rate - target_class_b_coupon_rate)
-                                class_b_percent = results.get('class_b_percent', 0)
-                                percent_diff = abs(class_b_percent - target_class_b_percent)
-                                
-                                optimization_progress.update(
-                                    message=f"Generation {generation+1}: Found better solution with score {best_fitness:.2f}, " +
-                                           f"coupon rate: {coupon_rate:.2f}% (diff: {coupon_diff:.2f}%), " +
-                                           f"Class B: {class_b_percent:.2f}% (diff: {percent_diff:.2f}%)"
-                                )
-                        else:
-                            optimization_progress.update(
-                                message=f"Generation {generation+1}: Found better solution with score {best_fitness:.2f}"
-                            )
+                    candidates.append((idx, maturities_int, nominals))
+                    adjustment_tasks.append((maturities_int, nominals, a_base_rates, a_reinvest_rates, class_b_nominal))
                 except Exception as e:
                     logger.error(f"Error evaluating individual {idx} in generation {generation}: {str(e)}")
                     # Set very low fitness to avoid selection
                     individual['fitness'] = -float('inf')
                     individual['result'] = None
             
+            # Adjust nominals for target coupon rate, in worker processes if configured;
+            # outcomes come back in population order
+            if pool is None:
+                adjustments = [
+                    _adjust_individual(df, cash_flow_index, task, ga_settings)
+                    for task in adjustment_tasks
+                ]
+            else:
+                chunk_size = max(1, len(adjustment_tasks) // (num_workers * 4))
+                adjustments = list(pool.map(_adjust_individual_in_worker, adjustment_tasks, chunksize=chunk_size))
+            
+            for position, (idx, maturities_int, nominals) in enumerate(candidates):
+                adjustment = adjustments[position]
+                merge_solver_stats(solver_stats, adjustment['solver_stats'])
+                if adjustment['error'] is not None:
+                    logger.error(f"Error adjusting nominals: {adjustment['error']}")
+                    # Continue with original nominals
+                elif adjustment['success']:
+                    nominals = adjustment['nominals']
+                    population[idx]['nominals'] = nominals
+                    population[idx]['class_b_percent'] = adjustment['class_b_percent']
+                    candidates[position] = (idx, maturities_int, nominals)
+            
+            # Evaluate the adjusted parameters in one vectorized call
+            eval_results = evaluate_params_batch(
+                df, start_date,
+                [maturities_int for _, maturities_int, _ in candidates],
+                [nominals for _, _, nominals in candidates],
+                class_b_maturity,
+                rate_curve,
+                class_b_base_rate_orig, class_b_reinvest_rate_orig,
+                target_class_b_percent, class_b_percent_deviation,
+                target_class_b_coupon_rate, min_buffer,
+                ops_expenses, cash_flow_index=cash_flow_index, cache=evaluation_cache
+            )
+            count_evaluations(len(eval_results))
+            
+            for (idx, _, _), eval_result in zip(candidates, eval_results):
+                individual = population[idx]
+                
+                # Set fitness - ensure it's a number
+                if eval_result['is_valid']:
+                    individual['fitness'] = float(eval_result['score'])
+                    individual['result'] = eval_result
+                    fitness_sum += individual['fitness']
+                    valid_count += 1
+                else:
+                    individual['fitness'] = -1.0 # Invalid but better than -inf for selection
+                    individual['result'] = None
+                
+                # Track the best
+                if individual['fitness'] > best_fitness:
+                    best_fitness = individual['fitness']
+                    best_individual = individual.copy()
+                    logger.info(f"Found better solution: score={best_fitness}")
+                    
+                    # Update progress message when finding better solution
+                    if 'result' in individual and individual['result'] and 'results' in individual['result']:
+                        results = individual['result']['results']
+                        if results:
+                            coupon_rate = results.get('class_b_coupon_rate', 0)
+                            coupon_diff = abs(coupon_rate - target_class_b_coupon_rate)
+                            class_b_percent = results.get('class_b_percent', 0)
+                            percent_diff = abs(class_b_percent - target_class_b_percent)
+                            
+                            optimization_progress.update(
+                                message=f"Generation {generation+1}: Found better solution with score {best_fitness:.2f}, " +
+                                       f"coupon rate: {coupon_rate:.2f}% (diff: {coupon_diff:.2f}%), " +
+                                       f"Class B: {class_b_percent:.2f}% (diff: {percent_diff:.2f}%)",
+                                best_coupon_rate=coupon_rate,
+                                best_class_b_percent=class_b_percent
+                            )
+                    else:
+                        optimization_progress.update(
+                            message=f"Generation {generation+1}: Found better solution with score {best_fitness:.2f}"
+                        )
+            
             # Log average fitness for valid individuals
             if valid_count > 0:
                 avg_fitness = fitness_sum / valid_count
@@ -1157,7 +2137,7 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
                     child_maturities = []
                     for i in range(num_a_tranches):
                         # 50% chance from each parent
-                        if random.random() < 0.5:
+                        if rng.random() < 0.5:
                             child_maturities.append(parent1['maturities'][i])
                         else:
                             child_maturities.append(parent2['maturities'][i])
@@ -1184,13 +2164,13 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
                     
                     # Class B percentage crossover
                     # Use weighted average of parent percentages
-                    if random.random() < 0.5:
+                    if rng.random() < 0.5:
                         # Weighted average with random weight
-                        weight = random.random()
+                        weight = rng.random()
                         child_b_percent = (parent1['class_b_percent'] * weight) + (parent2['class_b_percent'] * (1 - weight))
                     else:
                         # Pick one parent's value
-                        child_b_percent = parent1['class_b_percent'] if random.random() < 0.5 else parent2['class_b_percent']
+                        child_b_percent = parent1['class_b_percent'] if rng.random() < 0.5 else parent2['class_b_percent']
                     
                     # Calculate Class B nominal from percentage
                     b_share = child_b_percent / 100
@@ -1198,28 +2178,28 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
                     child_b_nominal = round(child_b_nominal / 1000) * 1000
                     
                     # Mutation - mutate maturities
-                    if random.random() < 0.3:  # 30% mutation rate
-                        mutation_idx = random.randint(0, num_a_tranches-1)
+                    if rng.random() < 0.3:  # 30% mutation rate
+                        mutation_idx = rng.randint(0, num_a_tranches-1)
                         
                         # Different mutation for different positions
                         if mutation_idx == 0:
                             # First maturity
-                            child_maturities[0] = random.randint(min_maturity, min(child_maturities[1] - min_gap, min_maturity + 60))
+                            child_maturities[0] = rng.randint(min_maturity, min(child_maturities[1] - min_gap, min_maturity + 60))
                         elif mutation_idx == num_a_tranches - 1:
                             # Last maturity
-                            child_maturities[-1] = random.randint(child_maturities[-2] + min_gap, max_maturity)
+                            child_maturities[-1] = rng.randint(child_maturities[-2] + min_gap, max_maturity)
                         else:
                             # Middle maturity
                             min_val = child_maturities[mutation_idx-1] + min_gap
                             max_val = child_maturities[mutation_idx+1] - min_gap
                             
                             if min_val < max_val:
-                                child_maturities[mutation_idx] = random.randint(min_val, max_val)
+                                child_maturities[mutation_idx] = rng.randint(min_val, max_val)
                     
                     # Mutation - mutate weights
-                    if random.random() < 0.3:
-                        mutation_idx = random.randint(0, num_a_tranches-1)
-                        mutation_amount = random.uniform(-0.1, 0.1)
+                    if rng.random() < 0.3:
+                        mutation_idx = rng.randint(0, num_a_tranches-1)
+                        mutation_amount = rng.uniform(-0.1, 0.1)
                         child_weights[mutation_idx] = max(0.1, min(0.4, child_weights[mutation_idx] + mutation_amount))
                         
                         # Renormalize
@@ -1228,8 +2208,8 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
                         child_nominals = [w * total_a_nominal for w in child_weights]
                     
                     # Mutation - mutate Class B percentage
-                    if random.random() < 0.3:
-                        mutation_amount = random.uniform(-class_b_percent_deviation / 2, class_b_percent_deviation / 2)
+                    if rng.random() < 0.3:
+                        mutation_amount = rng.uniform(-class_b_percent_deviation / 2, class_b_percent_deviation / 2)
                         child_b_percent = max(0.1, min(50, child_b_percent + mutation_amount))
                         
                         # Recalculate B nominal
@@ -1276,6 +2256,10 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
                         )
                         break
         
+        # Worker processes are only needed during evolution
+        _release_worker_pool(pool, shared_frame)
+        pool, shared_frame = None, None
+        
         # Update to 75% progress
         optimization_progress.update(step=75, 
                                 phase="Finalizing",
@@ -1303,14 +2287,17 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
         best_result = best_individual['result']
         
         # Get rates based on original data
-        best_base_rates = [maturity_to_base_rate_A.get(get_nearest_maturity(m, original_maturities_A), 42.0) for m in best_maturities]
-        best_reinvest_rates = [maturity_to_reinvest_rate_A.get(get_nearest_maturity(m, original_maturities_A), 30.0) for m in best_maturities]
+        best_base_rates = rate_curve.base_rate_list(best_maturities)
+        best_reinvest_rates = rate_curve.reinvest_rate_list(best_maturities)
         
         optimization_progress.update(step=90, 
                                 message="Creating optimization result...")
         
         logger.info("Genetic optimization completed successfully")
         
+        logger.info(f"Genetic: Nominal solver stats: {solver_stats}")
+        logger.info(f"Genetic: Evaluation cache stats: {evaluation_cache.stats()}")
+        
         # Debug logging
         print(f"*** GENETIC OPTIMIZATION RESULTS ***")
         if best_result and best_result['results']:
@@ -1343,9 +2330,11 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
             min_buffer_actual=result_dict.get('min_buffer_actual', 0),
             last_cash_flow_day=int(last_cash_flow_day),
             additional_days=int(additional_days),
-            results_by_strategy={"genetic": result_dict}
+            results_by_strategy={"genetic": result_dict},
+            solver_stats=solver_stats or None
         )
     except Exception as e:
+        _release_worker_pool(pool, shared_frame)
         # Handle any exceptions
         logger.error(f"Error in genetic optimization: {str(e)}")
         logger.debug(traceback.format_exc())
@@ -1356,4 +2345,252 @@ def perform_genetic_optimization(df: pd.DataFrame, general_settings: GeneralSett
             phase="Error Recovery",
             message=f"Error in genetic optimization: {str(e)}. Falling back to classic optimization method..."
         )
-        return perform_optimization(df, general_settings, optimization_settings)
\ No newline at end of file
+        return perform_optimization(df, general_settings, optimization_settings)
+# Surrogate models of scikit-optimize usable for the Bayesian search
+BAYESIAN_SURROGATES = ("GP", "RF", "ET", "GBRT")
+
+@cached_result
+@controlled_run
+def perform_bayesian_optimization(df: pd.DataFrame, general_settings: GeneralSettings, optimization_settings: OptimizationSettings) -> OptimizationResult:
+    """Bayesian optimization of the structure with a scikit-optimize surrogate model (experimental)
+    
+    Searches the same space as the genetic algorithm (Class A maturities, nominal
+    weights and Class B percent for the default tranche count of the model), but
+    chooses each structure to evaluate from a surrogate model fitted to all
+    evaluations so far. Every evaluation adjusts the nominals for the target
+    coupon rate and scores the structure like a genetic individual, so the search
+    stays within evaluation_budget real evaluations. Within such budgets it stays
+    below the best score of the genetic algorithm, so the method is experimental.
+    
+    Maturities are encoded as the first maturity and the gaps between them, like
+    the genetic individuals are generated; maturities past the maturity range are
+    pulled back so every point of the space is a gap-valid structure.
+    
+    Args:
+        df: DataFrame containing cash flow data
+        general_settings: General settings for the optimization
+        optimization_settings: Optimization-specific settings
+        
+    Returns:
+        OptimizationResult object with the optimized structure and the search statistics
+    """
+    try:
+        from skopt import Optimizer
+        from skopt.space import Real
+    except ImportError as e:
+        raise ValueError("Bayesian optimization requires scikit-optimize (pip install scikit-optimize)") from e
+    
+    optimization_progress.update(step=0, total=100,
+                                phase="Bayesian Optimization",
+                                message="Starting Bayesian optimization...")
+    
+    start_date = pd.Timestamp(general_settings.start_date)
+    ops_expenses = general_settings.operational_expenses
+    min_buffer = general_settings.min_buffer
+    
+    target_class_b_percent = getattr(optimization_settings, "min_class_b_percent", 15.0)
+    class_b_percent_deviation = getattr(optimization_settings, "class_b_percent_deviation", 1.0)
+    target_class_b_coupon_rate = optimization_settings.target_class_b_coupon_rate
+    additional_days = optimization_settings.additional_days_for_class_b
+    random_seed = getattr(optimization_settings, "random_seed", None)
+    
+    evaluation_budget = max(1, int(getattr(optimization_settings, "evaluation_budget", None) or 60))
+    surrogate = getattr(optimization_settings, "bayesian_surrogate", None) or "GP"
+    if surrogate not in BAYESIAN_SURROGATES:
+        raise ValueError(f"Unknown Bayesian surrogate: {surrogate}. Expected one of {BAYESIAN_SURROGATES}")
+    
+    nominal_solver = getattr(optimization_settings, "nominal_solver", "heuristic")
+    if nominal_solver not in NOMINAL_SOLVERS:
+        raise ValueError(f"Unknown nominal solver: {nominal_solver}. Expected one of {NOMINAL_SOLVERS}")
+    solver_stats = {}
+    
+    # Get original parameters for Class A based on selected default model
+    rate_model, rate_curve = _model_rate_curve(optimization_settings)
+    class_b_base_rate_orig = rate_model['class_b_base_rate']
+    class_b_reinvest_rate_orig = rate_model['class_b_reinvest_rate']
+    total_a_nominal = rate_model['total_a_nominal']
+    num_a_tranches = len(rate_model['maturities'])
+    
+    last_cash_flow_day = get_last_cash_flow_day(df, start_date)
+    class_b_maturity = max(1, min(365, last_cash_flow_day + additional_days))
+    cash_flow_index = prepare_cash_flows(df, ops_expenses)
+    
+    # Same nominal adjustment as a genetic individual
+    ga_settings = {
+        'start_date': start_date,
+        'ops_expenses': ops_expenses,
+        'class_b_maturity': class_b_maturity,
+        'class_b_base_rate': class_b_base_rate_orig,
+        'class_b_reinvest_rate': class_b_reinvest_rate_orig,
+        'target_class_b_coupon_rate': target_class_b_coupon_rate,
+        'target_class_b_percent': target_class_b_percent,
+        'min_buffer': min_buffer,
+        'nominal_solver': nominal_solver,
+    }
+    
+    min_maturity, max_maturity = optimization_settings.maturity_range
+    min_gap = 15  # Minimum days between maturities
+    if max_maturity - min_maturity < (num_a_tranches - 1) * min_gap:
+        raise ValueError(f"Maturity range {min_maturity}-{max_maturity} is too narrow for {num_a_tranches} Class A tranches")
+    min_percent = max(0.1, target_class_b_percent - class_b_percent_deviation)
+    max_percent = min(50, target_class_b_percent + class_b_percent_deviation)
+    
+    # Search space of the genetic individuals: first maturity, gaps between
+    # maturities, nominal weights and Class B percent
+    max_gap = 120  # Cap on the gap between maturities, as in the genetic algorithm
+    dimensions = (
+        [Real(min_maturity, min(min_maturity + 60, max_maturity), name="maturity_0")] +
+        [Real(min_gap, max(min_gap, max_gap), name=f"gap_{i}") for i in range(1, num_a_tranches)] +
+        [Real(0.05, 1.0, name=f"weight_{i}") for i in range(num_a_tranches)] +
+        [Real(min_percent, max_percent, name="class_b_percent")]
+    )
+    
+    def decode(point):
+        """Structure (maturities, nominals, class_b_nominal) of a point of the search space."""
+        # Maturities past the range are pulled back so every point is gap-valid
+        maturities = [int(round(point[0]))]
+        for i in range(1, num_a_tranches):
+            maturities.append(int(round(maturities[-1] + point[i])))
+        for i in range(num_a_tranches - 1, -1, -1):
+            cap = max_maturity - (num_a_tranches - 1 - i) * min_gap
+            if i < num_a_tranches - 1:
+                cap = min(cap, maturities[i + 1] - min_gap)
+            maturities[i] = min(maturities[i], cap)
+        
+        weights = point[num_a_tranches:2 * num_a_tranches]
+        total_weight = sum(weights)
+        nominals = [w / total_weight * total_a_nominal for w in weights]
+        
+        b_share = point[-1] / 100
+        class_b_nominal = round(total_a_nominal * b_share / (1 - b_share) / 1000) * 1000
+        return maturities, nominals, class_b_nominal
+    
+    optimizer = Optimizer(
+        dimensions,
+        base_estimator=surrogate,
+        n_initial_points=min(evaluation_budget, max(5, evaluation_budget // 5)),
+        acq_optimizer="sampling",
+        acq_optimizer_kwargs={"n_points": 2000},
+        random_state=random_seed
+    )
+    
+    optimization_progress.update(step=10, phase="Bayesian Search",
+                                message=f"Evaluation budget: {evaluation_budget}, surrogate: {surrogate}")
+    
+    best = None
+    best_score = 0.0
+    worst_objective = None
+    search_stats = {
+        'evaluation_budget': evaluation_budget,
+        'surrogate': surrogate,
+        'evaluations': 0,
+        'valid_evaluations': 0,
+        'best_evaluation': None,
+    }
+    
+    for evaluation in range(evaluation_budget):
+        # Cancelled or out of budget: keep the best structure found so far
+        if should_stop():
+            break
+        
+        point = optimizer.ask()
+        maturities, nominals, class_b_nominal = decode(point)
+        
+        a_base_rates = rate_curve.base_rate_list(maturities)
+        a_reinvest_rates = rate_curve.reinvest_rate_list(maturities)
+        adjustment = _adjust_individual(
+            df, cash_flow_index,
+            (maturities, nominals, a_base_rates, a_reinvest_rates, class_b_nominal), ga_settings
+        )
+        merge_solver_stats(solver_stats, adjustment['solver_stats'])
+        if adjustment['error'] is not None:
+            logger.error(f"Error adjusting nominals: {adjustment['error']}")
+        elif adjustment['success']:
+            nominals = adjustment['nominals']
+        
+        eval_result = evaluate_params(
+            df, start_date, maturities, nominals, class_b_maturity,
+            rate_curve,
+            class_b_base_rate_orig, class_b_reinvest_rate_orig,
+            target_class_b_percent, class_b_percent_deviation,
+            target_class_b_coupon_rate, min_buffer,
+            ops_expenses, cash_flow_index=cash_flow_index, cache=evaluation_cache
+        )
+        count_evaluations()
+        score = float(eval_result['score']) if eval_result['is_valid'] else 0.0
+        
+        # The surrogate minimizes scores scaled to the order of one. Invalid
+        # structures get the worst valid value seen, so the surrogate is not
+        # pulled towards a cliff at zero
+        if eval_result['is_valid']:
+            objective = -score / total_a_nominal
+            worst_objective = objective if worst_objective is None else max(worst_objective, objective)
+        else:
+            objective = worst_objective if worst_objective is not None else 0.0
+        optimizer.tell(point, objective)
+        search_stats['evaluations'] += 1
+        
+        if eval_result['is_valid']:
+            search_stats['valid_evaluations'] += 1
+            if score > best_score:
+                best_score = score
+                best = (maturities, nominals, eval_result)
+                search_stats['best_evaluation'] = evaluation + 1
+                results = eval_result['results']
+                optimization_progress.update(
+                    message=f"Evaluation {evaluation+1}: Found better solution with score {best_score:.2f}, " +
+                           f"coupon rate: {results['class_b_coupon_rate']:.2f}%, Class B: {results['class_b_percent']:.2f}%",
+                    best_coupon_rate=results['class_b_coupon_rate'],
+                    best_class_b_percent=results['class_b_percent']
+                )
+                
+                # Same early termination as the genetic algorithm
+                if results['coupon_rate_diff'] < 0.2 and results['class_b_percent_diff'] < 0.5:
+                    optimization_progress.update(
+                        message="Found excellent solution (coupon diff < 0.2%, Class B diff < 0.5%), ending search early"
+                    )
+                    break
+        
+        if evaluation % 5 == 0:
+            optimization_progress.update(
+                step=10 + int((evaluation + 1) / evaluation_budget * 80),
+                message=f"Evaluation {evaluation+1} of {evaluation_budget}"
+            )
+    
+    logger.info(f"Bayesian search stats: {search_stats}")
+    logger.info(f"Bayesian: Nominal solver stats: {solver_stats}")
+    
+    if best is None:
+        optimization_progress.update(
+            step=90,
+            message="No valid configuration found. Try adjusting optimization parameters or the evaluation budget."
+        )
+        raise ValueError("No valid configuration found. Try adjusting optimization parameters or the evaluation budget.")
+    
+    best_maturities, best_nominals, best_result = best
+    result_dict = best_result['results']
+    
+    optimization_progress.update(step=100,
+                            phase="Complete",
+                            message="Bayesian optimization completed successfully")
+    
+    return OptimizationResult(
+        best_strategy="bayesian",
+        class_a_maturities=best_maturities,
+        class_a_nominals=best_nominals,
+        class_a_rates=rate_curve.base_rate_list(best_maturities),
+        class_a_reinvest=rate_curve.reinvest_rate_list(best_maturities),
+        class_b_maturity=int(class_b_maturity),
+        class_b_rate=class_b_base_rate_orig,
+        class_b_reinvest=class_b_reinvest_rate_orig,
+        class_b_nominal=best_result['b_nominal'],
+        class_b_percent=best_result['class_b_percent'],
+        class_b_coupon_rate=result_dict['class_b_coupon_rate'],
+        direct_class_b_coupon_rate=result_dict['direct_coupon_rate'],
+        min_buffer_actual=result_dict['min_buffer_actual'],
+        last_cash_flow_day=int(last_cash_flow_day),
+        additional_days=int(additional_days),
+        results_by_strategy={"bayesian": result_dict},
+        solver_stats=solver_stats or None,
+        search_stats=search_stats
+    )
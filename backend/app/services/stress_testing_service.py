@@ -1,8 +1,18 @@
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
-from app.utils.tranche_utils import calculate_tranche_results
-from typing import Dict, Any, List
-from app.models.input_models import StressTestRequest
+from app.utils.tranche_utils import calculate_tranche_metrics, calculate_tranche_metrics_from_totals
+from app.utils.cash_flow_index import CashFlowIndex, OPS_EXPENSE_DATE
+from app.utils.evaluation_cache import evaluation_cache, EvaluationCache, dataset_fingerprint
+from app.utils.parallel_utils import resolve_num_workers
+from typing import Dict, Any, List, Optional, Sequence, Union, Callable, Tuple
+from app.models.input_models import (
+    StressTestRequest, StressGridRequest, StressGridAxis, StructureParameters,
+    MonteCarloRequest, StressDistribution, BreakevenRequest
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,9 +46,9 @@ def adjust_cash_flow_for_npl(df: pd.DataFrame, npl_rate: float) -> pd.DataFrame:
         # Recalculate total cash flow
         df_adjusted['cash_flow'] = df_adjusted['principal_amount'] + df_adjusted['interest_amount']
         
-        # Keep original cash flow for reference
-        if 'original_cash_flow' not in df_adjusted.columns:
-            df_adjusted['original_cash_flow'] = df['cash_flow'].copy()
+        # The tranche engine reads original_cash_flow (cash flow before
+        # operational expenses), so it must carry the stressed cash flow too
+        df_adjusted['original_cash_flow'] = df_adjusted['cash_flow']
         
         logger.info(f"Applied NPL rate of {npl_rate}%, reducing principal payments")
         return df_adjusted
@@ -56,23 +66,22 @@ def adjust_cash_flow_for_prepayment(df: pd.DataFrame, prepayment_rate: float) ->
         if prepayment_rate <= 0:
             return df
         
-        df_adjusted = df.copy()
-        
         # Ensure required columns exist
-        if 'principal_amount' not in df_adjusted.columns:
+        if 'principal_amount' not in df.columns:
             logger.error("Missing 'principal_amount' column in DataFrame")
             raise ValueError("Missing 'principal_amount' column in data")
             
-        if 'installment_date' not in df_adjusted.columns:
+        if 'installment_date' not in df.columns:
             logger.error("Missing 'installment_date' column in DataFrame")
             raise ValueError("Missing 'installment_date' column in data")
         
         # Convert prepayment_rate to a factor
         prepayment_factor = prepayment_rate / 100.0
         
-        # Sort by date
+        # Sort by date (sort_values returns the only copy we need)
+        df_adjusted = df
         if not pd.api.types.is_datetime64_any_dtype(df_adjusted['installment_date']):
-            df_adjusted['installment_date'] = pd.to_datetime(df_adjusted['installment_date'])
+            df_adjusted = df_adjusted.assign(installment_date=pd.to_datetime(df_adjusted['installment_date']))
             
         df_adjusted = df_adjusted.sort_values('installment_date')
         
@@ -94,34 +103,23 @@ def adjust_cash_flow_for_prepayment(df: pd.DataFrame, prepayment_rate: float) ->
         # Allocate prepayments by weight
         prepayment_allocations = prepayment_amount * prepayment_weights
         
-        # Apply prepayments (reduce later periods, increase earlier periods)
-        n = len(df_adjusted)
-        reduction_indices = range(n//2, n)  # Reduce second half
-        addition_indices = range(0, n//2)   # Add to first half
-        
-        # Reduce later payments (create a deep copy to avoid warnings)
-        df_temp = df_adjusted.copy()
-        for i in reduction_indices:
-            if i < len(prepayment_allocations):
-                max_reduction = df_temp.iloc[i]['principal_amount'] * 0.8
-                reduction = min(prepayment_allocations[i], max_reduction)
-                df_temp.iloc[i, df_temp.columns.get_loc('principal_amount')] -= reduction
-        
-        # Increase earlier payments
-        for i in addition_indices:
-            if i < len(prepayment_allocations):
-                df_temp.iloc[i, df_temp.columns.get_loc('principal_amount')] += prepayment_allocations[i]
-        
-        # Update the adjusted dataframe
-        df_adjusted = df_temp
+        # Apply prepayments: the second half loses its allocation (at most 80% of
+        # its principal), the first half gains its allocation
+        principal = df_adjusted['principal_amount'].to_numpy(dtype=float)
+        first_half = np.arange(n_rows) < n_rows // 2
+        df_adjusted['principal_amount'] = np.where(
+            first_half,
+            principal + prepayment_allocations,
+            principal - np.minimum(prepayment_allocations, principal * 0.8)
+        )
         
         # Recalculate total cash flow
         if 'interest_amount' in df_adjusted.columns:
             df_adjusted['cash_flow'] = df_adjusted['principal_amount'] + df_adjusted['interest_amount']
             
-        # Keep original cash flow for reference
-        if 'original_cash_flow' not in df_adjusted.columns and 'cash_flow' in df.columns:
-            df_adjusted['original_cash_flow'] = df['cash_flow'].copy()
+        # The tranche engine reads original_cash_flow, as after the NPL adjustment
+        if 'cash_flow' in df_adjusted.columns:
+            df_adjusted['original_cash_flow'] = df_adjusted['cash_flow']
         
         logger.info(f"Applied prepayment rate of {prepayment_rate}%, shifting principal payments")
         return df_adjusted
@@ -148,14 +146,12 @@ def perform_stress_test(df: pd.DataFrame, request: StressTestRequest) -> Dict[st
         logger.info(f"Scenario: {scenario.name}")
         logger.info(f"NPL Rate: {npl_rate}%, Prepayment Rate: {prepayment_rate}%, Reinvestment Shift: {reinvestment_shift}%")
         
-        # First calculate baseline results with original data
-        logger.info("Calculating baseline results")
-        baseline_result = calculate_tranche_results(
-            df, structure.start_date,
-            structure.a_maturities, structure.a_base_rates, structure.a_spreads, structure.a_reinvest_rates,
-            structure.a_nominals, structure.b_maturity, structure.b_base_rate, structure.b_spread,
-            structure.b_reinvest_rate, structure.b_nominal, structure.ops_expenses
-        )
+        # Baseline results with original data depend only on the tape and the structure
+        started = time.perf_counter()
+        baseline, baseline_cache_hit = get_stress_baseline(df, structure)
+        baseline_result = baseline.metrics
+        baseline_done = time.perf_counter()
+        logger.info(f"Baseline results {'reused from cache' if baseline_cache_hit else 'calculated'}")
         
         # Apply NPL rate
         df_adjusted = df.copy()
@@ -179,19 +175,18 @@ def perform_stress_test(df: pd.DataFrame, request: StressTestRequest) -> Dict[st
         
         # Calculate stress test results
         logger.info("Calculating stress test results")
-        result = calculate_tranche_results(
+        result = calculate_tranche_metrics(
             df_adjusted, structure.start_date,
             structure.a_maturities, structure.a_base_rates, structure.a_spreads, a_reinvest_rates,
             structure.a_nominals, structure.b_maturity, structure.b_base_rate, structure.b_spread,
             b_reinvest_rate, structure.b_nominal, structure.ops_expenses
         )
         
+        finished = time.perf_counter()
+        
         # Create response
         response = {
-            'baseline': {
-                'class_b_coupon_rate': round(baseline_result['effective_coupon_rate'], 4),
-                'min_buffer_actual': round(baseline_result.get('min_buffer_actual', 0), 4)
-            },
+            'baseline': baseline.summary(),
             'stress_test': {
                 'class_b_coupon_rate': round(result['effective_coupon_rate'], 4),
                 'min_buffer_actual': round(result.get('min_buffer_actual', 0), 4),
@@ -202,6 +197,12 @@ def perform_stress_test(df: pd.DataFrame, request: StressTestRequest) -> Dict[st
             'difference': {
                 'class_b_coupon_rate': round(result['effective_coupon_rate'] - baseline_result['effective_coupon_rate'], 4),
                 'min_buffer_actual': round(result.get('min_buffer_actual', 0) - baseline_result.get('min_buffer_actual', 0), 4)
+            },
+            'baseline_cache_hit': baseline_cache_hit,
+            'timing': {
+                'baseline_seconds': round(baseline_done - started, 4),
+                'stress_seconds': round(finished - baseline_done, 4),
+                'total_seconds': round(finished - started, 4)
             }
         }
         
@@ -213,4 +214,569 @@ def perform_stress_test(df: pd.DataFrame, request: StressTestRequest) -> Dict[st
         
     except Exception as e:
         logger.error(f"Error in perform_stress_test: {str(e)}")
-        raise ValueError(f"Stress test calculation failed: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Stress test calculation failed: {str(e)}")
+
+def stress_axis_values(axis: StressGridAxis) -> np.ndarray:
+    """Evenly spaced values of a stress grid axis, both ends included."""
+    return np.linspace(axis.start, axis.stop, max(1, int(axis.steps)))
+
+def stressed_cash_flows(
+    df: pd.DataFrame,
+    npl_rates: Union[float, Sequence[float]],
+    prepayment_rates: Union[float, Sequence[float]]
+) -> np.ndarray:
+    """
+    Cash flows after adjust_cash_flow_for_npl and adjust_cash_flow_for_prepayment,
+    for many (NPL, prepayment) scenarios at once.
+    
+    Args:
+        df: Cash flow data (the daily ledger)
+        npl_rates: NPL rate (%) of each scenario, or one rate for all
+        prepayment_rates: Prepayment rate (%) of each scenario, or one rate for all
+        
+    Returns:
+        (scenarios x len(df)) cash flows, aligned with the rows of df
+    """
+    npl_rates, prepayment_rates = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(npl_rates, dtype=float)),
+        np.atleast_1d(np.asarray(prepayment_rates, dtype=float))
+    )
+    npl_rates = npl_rates[:, None]
+    prepayment_rates = prepayment_rates[:, None]
+    interest = df['interest_amount'].to_numpy(dtype=float)
+    base_cash = (df['original_cash_flow'] if 'original_cash_flow' in df.columns else df['cash_flow']).to_numpy(dtype=float)
+    
+    # Reduce principal by NPL rate
+    principal = df['principal_amount'].to_numpy(dtype=float) * (1 - npl_rates / 100.0)
+    
+    # Prepayments move principal from the second half of the date-sorted rows to the first
+    n_rows = len(df)
+    adjusted = principal
+    if n_rows > 1:
+        order = np.argsort(df['installment_date'].to_numpy(dtype='datetime64[ns]'), kind='stable')
+        sorted_principal = principal[:, order]
+        weights = np.linspace(3, 1, n_rows)
+        weights = weights / weights.sum()
+        allocations = np.nansum(sorted_principal, axis=1, keepdims=True) * (prepayment_rates / 100.0) * weights
+        first_half = np.arange(n_rows) < n_rows // 2
+        moved = np.where(
+            first_half,
+            sorted_principal + allocations,
+            sorted_principal - np.minimum(allocations, sorted_principal * 0.8)
+        )
+        moved = np.where(prepayment_rates > 0, moved, sorted_principal)
+        adjusted = np.empty_like(moved)
+        adjusted[:, order] = moved
+    
+    # Recalculate total cash flow; unstressed scenarios keep the original cash flows
+    stressed = (prepayment_rates > 0) & (n_rows > 1) | (npl_rates > 0)
+    return np.where(stressed, adjusted + interest, base_cash)
+
+class StressScenarioEvaluator:
+    """
+    Class B coupon and minimum buffer of one structure for many cash flow scenarios.
+    
+    Which rows a tranche collects depends only on the dates and maturities, so
+    the rows are assigned once; each scenario is then two matrix products and
+    the vectorized buffer waterfall, with the same results as running
+    calculate_tranche_metrics on the stressed DataFrame.
+    """
+    
+    def __init__(self, df: pd.DataFrame, structure: StructureParameters):
+        self.structure = structure
+        self.index = CashFlowIndex(df, structure.ops_expenses)
+        self.maturity_days = list(structure.a_maturities) + [structure.b_maturity]
+        self.base_rates = list(structure.a_base_rates) + [structure.b_base_rate]
+        self.spreads = list(structure.a_spreads) + [structure.b_spread]
+        self.reinvest_rates = np.array(list(structure.a_reinvest_rates) + [structure.b_reinvest_rate], dtype=float)
+        self.nominals = list(structure.a_nominals) + [structure.b_nominal]
+        self.num_a_tranches = len(structure.a_maturities)
+        
+        # Operational expenses come out of the first cash flow on OPS_EXPENSE_DATE
+        days = df['installment_date'].to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+        hits = np.flatnonzero(days == np.datetime64(OPS_EXPENSE_DATE, 'D'))
+        self._ops_row = int(hits[0]) if hits.size and structure.ops_expenses > 0 else None
+        self._weights = {}
+        # Rows owned by each tranche do not depend on the reinvestment rates
+        self._tranche_weights(0.0)
+    
+    def _tranche_weights(self, reinvestment_shift: float):
+        weights = self._weights.get(reinvestment_shift)
+        if weights is None:
+            weights = self.index.tranche_weights(
+                self.structure.start_date, self.maturity_days, self.reinvest_rates + reinvestment_shift
+            )
+            self._weights[reinvestment_shift] = weights
+        return weights
+    
+    def evaluate(
+        self,
+        cash_flows: np.ndarray,
+        reinvestment_shift: Union[float, np.ndarray] = 0.0
+    ) -> Dict[str, np.ndarray]:
+        """
+        Tranche metrics of cash flow scenarios.
+        
+        Args:
+            cash_flows: (... x rows) cash flows aligned with the rows of df
+            reinvestment_shift: Shift added to every reinvestment rate (%), one
+                for all scenarios or one per scenario (leading shape of cash_flows)
+            
+        Returns:
+            calculate_tranche_metrics keys, each an array of the leading shape of cash_flows
+        """
+        cash_flows = np.asarray(cash_flows, dtype=float)
+        scenarios = cash_flows.reshape(-1, cash_flows.shape[-1])
+        if self._ops_row is not None:
+            scenarios = scenarios.copy()
+            scenarios[:, self._ops_row] = np.maximum(0.0, scenarios[:, self._ops_row] - self.structure.ops_expenses)
+        
+        sorted_cash = scenarios[:, self.index.row_order]
+        if np.ndim(reinvestment_shift) == 0:
+            membership, reinvest_weights = self._tranche_weights(float(reinvestment_shift))
+            reinvest_rates = self.reinvest_rates + reinvestment_shift
+            reinvest_totals = sorted_cash @ reinvest_weights
+        else:
+            # Her senaryonun kendi oranı var; ağırlıklar senaryo başına kurulmadan toplanır
+            membership, _ = self._tranche_weights(0.0)
+            shifts = np.broadcast_to(np.asarray(reinvestment_shift, dtype=float), cash_flows.shape[:-1]).reshape(-1, 1)
+            reinvest_rates = self.reinvest_rates + shifts
+            reinvest_totals = self.index.scenario_reinvest_totals(
+                sorted_cash, self.structure.start_date, self.maturity_days, reinvest_rates
+            )
+        tranche_totals = (sorted_cash @ membership, reinvest_totals, None, None)
+        metrics = calculate_tranche_metrics_from_totals(
+            tranche_totals, self.maturity_days, self.base_rates, self.spreads,
+            reinvest_rates, self.nominals, self.num_a_tranches
+        )
+        return {key: value.reshape(cash_flows.shape[:-1]) for key, value in metrics.items()}
+
+class StressBaseline:
+    """
+    Scenario-independent part of a stress request for one tape and structure.
+    
+    Holds the unstressed tranche metrics and, built on first use, the
+    StressScenarioEvaluator with the row assignment of the structure. Shared
+    through stress_baseline_cache, so it must not be modified after creation.
+    """
+    
+    def __init__(self, df: pd.DataFrame, structure: StructureParameters):
+        self._df = df
+        self._structure = structure
+        self._evaluator: Optional[StressScenarioEvaluator] = None
+        self._lock = threading.Lock()
+        self.metrics = calculate_tranche_metrics(
+            df, structure.start_date,
+            structure.a_maturities, structure.a_base_rates, structure.a_spreads, structure.a_reinvest_rates,
+            structure.a_nominals, structure.b_maturity, structure.b_base_rate, structure.b_spread,
+            structure.b_reinvest_rate, structure.b_nominal, structure.ops_expenses,
+            cache=evaluation_cache
+        )
+        # Upper bound of the evaluator's arrays, for the cache's memory cap
+        num_tranches = len(structure.a_maturities) + 1
+        self.nbytes = len(df) * (2 * num_tranches + 8) * 8
+    
+    @property
+    def evaluator(self) -> StressScenarioEvaluator:
+        with self._lock:
+            if self._evaluator is None:
+                self._evaluator = StressScenarioEvaluator(self._df, self._structure)
+            return self._evaluator
+    
+    def summary(self) -> Dict[str, float]:
+        """Baseline block of the stress responses."""
+        return {
+            'class_b_coupon_rate': round(self.metrics['effective_coupon_rate'], 4),
+            'min_buffer_actual': round(self.metrics.get('min_buffer_actual', 0), 4)
+        }
+
+# Yapı başına baseline önbelleği; yeni veri yüklendiğinde temizlenir
+stress_baseline_cache = EvaluationCache(max_entries=64, max_bytes=256 * 1024 * 1024)
+
+def structure_hash(structure: StructureParameters) -> str:
+    """Content hash of the structure parameters of a stress request."""
+    return hashlib.sha256(structure.model_dump_json().encode()).hexdigest()
+
+def get_stress_baseline(df: pd.DataFrame, structure: StructureParameters) -> Tuple[StressBaseline, bool]:
+    """
+    Cached StressBaseline per (dataset fingerprint, structure hash).
+    
+    Returns:
+        (baseline, whether it came from the cache)
+    """
+    key = (dataset_fingerprint(df), structure_hash(structure))
+    baseline = stress_baseline_cache.get(key)
+    if baseline is not None:
+        return baseline, True
+    baseline = StressBaseline(df, structure)
+    stress_baseline_cache.put(key, baseline, size=baseline.nbytes)
+    return baseline, False
+
+def perform_stress_grid(df: pd.DataFrame, request: StressGridRequest) -> Dict[str, Any]:
+    """
+    Evaluate a structure on every NPL x prepayment x reinvestment shift grid point
+    
+    The baseline is computed once and the grid points go through
+    StressScenarioEvaluator, one NPL rate at a time.
+    """
+    try:
+        started = time.perf_counter()
+        structure = request.structure
+        npl_rates = stress_axis_values(request.npl_rate)
+        prepayment_rates = stress_axis_values(request.prepayment_rate)
+        reinvestment_shifts = stress_axis_values(request.reinvestment_shift)
+        shape = (len(npl_rates), len(prepayment_rates), len(reinvestment_shifts))
+        logger.info(f"Starting stress grid of {shape[0]}x{shape[1]}x{shape[2]} scenarios")
+        
+        baseline, baseline_cache_hit = get_stress_baseline(df, structure)
+        evaluator = baseline.evaluator
+        baseline_done = time.perf_counter()
+        coupon_rates = np.empty(shape)
+        min_buffers = np.empty(shape)
+        for i, npl_rate in enumerate(npl_rates):
+            cash_flows = stressed_cash_flows(df, npl_rate, prepayment_rates)
+            for k, shift in enumerate(reinvestment_shifts):
+                metrics = evaluator.evaluate(cash_flows, float(shift))
+                coupon_rates[i, :, k] = metrics['effective_coupon_rate']
+                min_buffers[i, :, k] = metrics['min_buffer_actual']
+        
+        elapsed = time.perf_counter() - started
+        logger.info(f"Stress grid completed in {elapsed:.3f}s")
+        return {
+            'baseline': baseline.summary(),
+            'npl_rates': npl_rates.tolist(),
+            'prepayment_rates': prepayment_rates.tolist(),
+            'reinvestment_shifts': reinvestment_shifts.tolist(),
+            # Indexed [npl][prepayment][reinvestment shift]
+            'class_b_coupon_rate': np.round(coupon_rates, 4).tolist(),
+            'min_buffer_actual': np.round(min_buffers, 4).tolist(),
+            'baseline_cache_hit': baseline_cache_hit,
+            'timing': {
+                'baseline_seconds': round(baseline_done - started, 4),
+                'stress_seconds': round(elapsed - (baseline_done - started), 4),
+                'total_seconds': round(elapsed, 4)
+            },
+            'elapsed_seconds': round(elapsed, 4)
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in perform_stress_grid: {str(e)}")
+        raise ValueError(f"Stress grid calculation failed: {str(e)}")
+
+# Monte Carlo: dağılımlar ve yol parçaları
+STRESS_DISTRIBUTIONS = ("fixed", "uniform", "normal", "triangular")
+MONTE_CARLO_PERCENTILES = (1, 5, 50)
+# Upper bound on paths x rows held in memory per chunk of paths
+MONTE_CARLO_CHUNK_CELLS = 2_000_000
+
+def sample_stress_distribution(distribution: StressDistribution, rng: np.random.Generator, size: int) -> np.ndarray:
+    """
+    Draw stress levels from a configured distribution.
+    
+    Args:
+        distribution: fixed (value), uniform (low, high), normal (value as the
+            mean, std) or triangular (low, value as the mode, high); low/high
+            also clip normal draws
+        rng: Random generator of the run
+        size: Number of draws
+        
+    Returns:
+        Array of draws
+    """
+    kind = distribution.distribution.lower()
+    low, high = distribution.low, distribution.high
+    if kind not in STRESS_DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution '{distribution.distribution}', expected one of {', '.join(STRESS_DISTRIBUTIONS)}")
+    if kind in ("uniform", "triangular") and (low is None or high is None):
+        raise ValueError(f"{kind} distribution needs low and high")
+    if low is not None and high is not None and low > high:
+        raise ValueError(f"Distribution low ({low}) is above high ({high})")
+    
+    if kind == "fixed":
+        draws = np.full(size, float(distribution.value))
+    elif kind == "uniform":
+        draws = rng.uniform(low, high, size)
+    elif kind == "normal":
+        if distribution.std < 0:
+            raise ValueError(f"Normal distribution std must be non-negative, got {distribution.std}")
+        draws = rng.normal(distribution.value, distribution.std, size)
+    else:
+        if not low <= distribution.value <= high:
+            raise ValueError(f"Triangular mode {distribution.value} is outside [{low}, {high}]")
+        draws = rng.triangular(low, distribution.value, high, size) if high > low else np.full(size, float(low))
+    
+    if low is not None or high is not None:
+        draws = np.clip(draws, low, high)
+    return draws
+
+def _percentile_summary(values: np.ndarray) -> Dict[str, float]:
+    summary = {
+        f"p{q}": round(float(v), 4)
+        for q, v in zip(MONTE_CARLO_PERCENTILES, np.percentile(values, MONTE_CARLO_PERCENTILES))
+    }
+    summary['mean'] = round(float(values.mean()), 4)
+    return summary
+
+def perform_monte_carlo(df: pd.DataFrame, request: MonteCarloRequest) -> Dict[str, Any]:
+    """
+    Monte Carlo stress test: Class B coupon and minimum buffer distributions
+    
+    NPL, prepayment and reinvestment shift levels of every path are drawn up
+    front from one seeded generator; the paths are then evaluated in chunks
+    with StressScenarioEvaluator, so the results do not depend on the number
+    of worker threads.
+    """
+    try:
+        started = time.perf_counter()
+        structure = request.structure
+        num_paths = int(request.paths)
+        rng = np.random.default_rng(request.seed)
+        npl_rates = np.clip(sample_stress_distribution(request.npl_rate, rng, num_paths), 0.0, 100.0)
+        prepayment_rates = np.clip(sample_stress_distribution(request.prepayment_rate, rng, num_paths), 0.0, 100.0)
+        reinvestment_shifts = sample_stress_distribution(request.reinvestment_shift, rng, num_paths)
+        logger.info(f"Starting Monte Carlo stress test with {num_paths} paths (seed={request.seed})")
+        
+        sampled = time.perf_counter()
+        baseline, baseline_cache_hit = get_stress_baseline(df, structure)
+        evaluator = baseline.evaluator
+        baseline_done = time.perf_counter()
+        
+        coupon_rates = np.empty(num_paths)
+        min_buffers = np.empty(num_paths)
+        chunk_size = max(1, MONTE_CARLO_CHUNK_CELLS // max(1, len(df)))
+        chunks = [slice(i, min(i + chunk_size, num_paths)) for i in range(0, num_paths, chunk_size)]
+        
+        def evaluate_chunk(paths: slice) -> None:
+            cash_flows = stressed_cash_flows(df, npl_rates[paths], prepayment_rates[paths])
+            metrics = evaluator.evaluate(cash_flows, reinvestment_shifts[paths])
+            coupon_rates[paths] = metrics['effective_coupon_rate']
+            min_buffers[paths] = metrics['min_buffer_actual']
+        
+        # NumPy releases the GIL in the array kernels, so chunks overlap on threads
+        num_workers = resolve_num_workers(request.num_workers, len(chunks))
+        if num_workers > 1:
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                list(executor.map(evaluate_chunk, chunks))
+        else:
+            for paths in chunks:
+                evaluate_chunk(paths)
+        
+        finished = time.perf_counter()
+        breaches = min_buffers < request.min_buffer
+        logger.info(f"Monte Carlo stress test completed in {finished - started:.3f}s, "
+                    f"breach probability {breaches.mean():.4f}")
+        return {
+            'paths': num_paths,
+            'seed': request.seed,
+            'baseline': baseline.summary(),
+            'class_b_coupon_rate': _percentile_summary(coupon_rates),
+            'min_buffer_actual': _percentile_summary(min_buffers),
+            'min_buffer': request.min_buffer,
+            'breach_probability': round(float(breaches.mean()), 6),
+            'drawn': {
+                'npl_rate': _percentile_summary(npl_rates),
+                'prepayment_rate': _percentile_summary(prepayment_rates),
+                'reinvestment_shift': _percentile_summary(reinvestment_shifts)
+            },
+            'num_workers': num_workers,
+            'baseline_cache_hit': baseline_cache_hit,
+            'timing': {
+                'sampling_seconds': round(sampled - started, 4),
+                'baseline_seconds': round(baseline_done - sampled, 4),
+                'stress_seconds': round(finished - baseline_done, 4),
+                'total_seconds': round(finished - started, 4)
+            },
+            'elapsed_seconds': round(finished - started, 4),
+            'evaluation_seconds': round(finished - baseline_done, 4)
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in perform_monte_carlo: {str(e)}")
+        raise ValueError(f"Monte Carlo stress test failed: {str(e)}")
+
+# Break-even çözücü: çözülebilen faktörler
+BREAKEVEN_FACTORS = ("npl_rate", "prepayment_rate", "reinvestment_shift")
+# Kırılma koşulları: (ad, marj, marj kırılma mı?) — kupon 0'da tabanlandığı için ayrı kontrol edilir
+BREAKEVEN_CONSTRAINTS: Tuple[Tuple[str, Callable[[Dict[str, float], float], float], Callable[[float], bool]], ...] = (
+    ("min_buffer", lambda metrics, min_buffer: metrics['min_buffer_actual'] - min_buffer, lambda margin: margin < 0),
+    ("class_b_coupon", lambda metrics, min_buffer: metrics['class_b_coupon_rate'], lambda margin: margin <= 0),
+)
+
+def bracketed_root(
+    func: Callable[[float], float],
+    safe: float,
+    breached: float,
+    f_safe: float,
+    f_breached: float,
+    tolerance: float,
+    max_iterations: int,
+    is_breach: Callable[[float], bool] = lambda margin: margin < 0
+) -> Tuple[float, float, int]:
+    """
+    Illinois (modified regula falsi) root finder on a sign-changing bracket.
+    
+    Args:
+        func: Margin function, falling from the safe to the breached side
+        safe, breached: Bracket ends; either may be the larger one
+        f_safe, f_breached: func at the bracket ends
+        tolerance: Stop when the bracket is at most this wide
+        max_iterations: Maximum number of func evaluations
+        is_breach: Whether a margin is on the breached side. With a margin
+            floored at zero (e.g. the coupon) and zero as a breach the secant
+            step lands on the breached end, so the search bisects.
+        
+    Returns:
+        (last safe point, first breached point, evaluations)
+    """
+    evaluations = 0
+    retained = 0  # Which end was kept on the previous step (+1 safe, -1 breached)
+    while abs(breached - safe) > tolerance and evaluations < max_iterations:
+        x = breached - f_breached * (breached - safe) / (f_breached - f_safe)
+        # Fall back to bisection if the secant leaves the open bracket
+        if not min(safe, breached) < x < max(safe, breached):
+            x = 0.5 * (safe + breached)
+        fx = func(x)
+        evaluations += 1
+        if not is_breach(fx):
+            safe, f_safe = x, fx
+            if retained == -1:
+                f_breached *= 0.5
+            retained = -1
+        else:
+            breached, f_breached = x, fx
+            if retained == 1:
+                f_safe *= 0.5
+            retained = 1
+    return safe, breached, evaluations
+
+def perform_breakeven(df: pd.DataFrame, request: BreakevenRequest) -> Dict[str, Any]:
+    """
+    Largest NPL / prepayment / reinvestment rate drop the structure absorbs
+    
+    Each factor is solved separately with the other two held at their
+    request levels. The structure breaks when min_buffer_actual falls below
+    min_buffer or the Class B coupon reaches zero. The coupon is floored at
+    zero, so the two checks are bracketed separately (BREAKEVEN_CONSTRAINTS):
+    the buffer between the request level and the most adverse level, then
+    the coupon only up to the buffer's first breach. The break-even is the
+    nearest breach and the binding constraint is the check that failed there.
+    Every iteration reuses the evaluator's row assignment, so it only costs
+    one stressed cash flow vector and one waterfall.
+    """
+    try:
+        started = time.perf_counter()
+        structure = request.structure
+        factors = list(dict.fromkeys(request.factors))
+        unknown = [factor for factor in factors if factor not in BREAKEVEN_FACTORS]
+        if unknown:
+            raise ValueError(f"Unknown break-even factors: {', '.join(unknown)}")
+        
+        baseline_structure, baseline_cache_hit = get_stress_baseline(df, structure)
+        evaluator = baseline_structure.evaluator
+        baseline_done = time.perf_counter()
+        levels = {
+            'npl_rate': request.npl_rate,
+            'prepayment_rate': request.prepayment_rate,
+            'reinvestment_shift': request.reinvestment_shift
+        }
+        # Most adverse level searched for each factor
+        limits = {
+            'npl_rate': 100.0,
+            'prepayment_rate': 100.0,
+            'reinvestment_shift': request.reinvestment_shift - request.max_reinvestment_shift
+        }
+        
+        # Bracket ends are looked up again for the report
+        evaluated: Dict[Tuple[float, float, float], Dict[str, float]] = {}
+        
+        def evaluate_levels(stress: Dict[str, float]) -> Dict[str, float]:
+            key = (stress['npl_rate'], stress['prepayment_rate'], stress['reinvestment_shift'])
+            if key not in evaluated:
+                cash_flows = stressed_cash_flows(df, stress['npl_rate'], stress['prepayment_rate'])
+                metrics = evaluator.evaluate(cash_flows, np.array([stress['reinvestment_shift']]))
+                evaluated[key] = {
+                    'class_b_coupon_rate': float(metrics['effective_coupon_rate'][0]),
+                    'min_buffer_actual': float(metrics['min_buffer_actual'][0])
+                }
+            return evaluated[key]
+        
+        def failed_checks(metrics: Dict[str, float]) -> List[str]:
+            return [
+                name for name, margin_of, is_breach in BREAKEVEN_CONSTRAINTS
+                if is_breach(margin_of(metrics, request.min_buffer))
+            ]
+        
+        baseline = evaluate_levels(levels)
+        baseline_failures = failed_checks(baseline)
+        results = {}
+        for factor in factors:
+            factor_started = time.perf_counter()
+            known_points = len(evaluated)
+            start, limit = levels[factor], limits[factor]
+            
+            binding = None
+            if baseline_failures:
+                status, safe, breached = 'breached_at_base', None, start
+                binding = baseline_failures
+            else:
+                status, safe, breached = 'not_reached', limit, None
+                for name, margin_of, is_breach in BREAKEVEN_CONSTRAINTS:
+                    # A later check only matters before the breach already found
+                    search_limit = limit if breached is None else breached
+                    
+                    def margin(value: float, margin_of=margin_of) -> float:
+                        return margin_of(evaluate_levels({**levels, factor: value}), request.min_buffer)
+                    
+                    f_limit = margin(search_limit)
+                    if not is_breach(f_limit):
+                        continue
+                    check_safe, breached, _ = bracketed_root(
+                        margin, start, search_limit, margin(start), f_limit,
+                        request.tolerance, request.max_iterations, is_breach
+                    )
+                    # The last safe point must pass every check solved so far
+                    safe = min(safe, check_safe, key=lambda value: abs(value - start))
+                    status = 'found' if abs(breached - safe) <= request.tolerance else 'max_iterations'
+                if breached is not None:
+                    binding = failed_checks(evaluate_levels({**levels, factor: breached}))
+            
+            result = {
+                'status': status,
+                'breakeven': round(safe, 4) if safe is not None else None,
+                'first_breach': round(breached, 4) if breached is not None else None,
+                'search_range': [start, limit],
+                'evaluations': len(evaluated) - known_points,
+                'elapsed_seconds': round(time.perf_counter() - factor_started, 4)
+            }
+            if binding:
+                # Checks failing at the first breach; min_buffer first when both fail
+                result['binding_constraint'] = binding[0]
+                result['failed_constraints'] = binding
+            if safe is not None:
+                metrics = evaluate_levels({**levels, factor: safe})
+                result['class_b_coupon_rate'] = round(metrics['class_b_coupon_rate'], 4)
+                result['min_buffer_actual'] = round(metrics['min_buffer_actual'], 4)
+            results[factor] = result
+        
+        elapsed = time.perf_counter() - started
+        logger.info(f"Break-even analysis of {', '.join(factors)} completed in {elapsed:.3f}s")
+        return {
+            'min_buffer': request.min_buffer,
+            'levels': levels,
+            'baseline': {
+                'class_b_coupon_rate': round(baseline['class_b_coupon_rate'], 4),
+                'min_buffer_actual': round(baseline['min_buffer_actual'], 4)
+            },
+            'breakeven': results,
+            'baseline_cache_hit': baseline_cache_hit,
+            'timing': {
+                'baseline_seconds': round(baseline_done - started, 4),
+                'stress_seconds': round(elapsed - (baseline_done - started), 4),
+                'total_seconds': round(elapsed, 4)
+            },
+            'elapsed_seconds': round(elapsed, 4)
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in perform_breakeven: {str(e)}")
+        raise ValueError(f"Break-even analysis failed: {str(e)}")
@@ -0,0 +1,340 @@
+# backend/app/utils/cash_flow_index.py
+"""
+Prefix-sum index over a date-sorted cash flow tape.
+
+Cash flows sorted by reinvestment date fall into contiguous ranges per
+tranche, so a tranche's cash flow total is a difference of two cumulative
+sums. Its reinvestment return is
+
+    sum(cf * ((1 + r)^((M - t) / 365) - 1))
+        = (1 + r)^(M / 365) * sum(cf * (1 + r)^(-t / 365)) - sum(cf)
+
+which is also a difference of two cumulative sums once the discount
+weighted sums are built for the rate r. Each tranche then costs two binary
+searches, whatever the size of the tape.
+"""
+
+import threading
+import pandas as pd
+import numpy as np
+from typing import Dict, Sequence, Tuple
+
+from app.utils.finance_utils import (
+    simple_to_compound_annual,
+    calculate_reinvestment_dates
+)
+
+# Operasyonel giderlerin düşüldüğü tarih
+OPS_EXPENSE_DATE = pd.Timestamp("2025-02-16")
+
+_DAY_NS = np.timedelta64(1, "D").astype("timedelta64[ns]").astype(np.int64)
+
+
+def apply_operational_expenses(
+    cash_flows: np.ndarray,
+    installment_dates: np.ndarray,
+    ops_expenses: float
+) -> np.ndarray:
+    """
+    Return a copy of cash_flows with ops_expenses deducted from the first
+    cash flow on OPS_EXPENSE_DATE (floored at zero), as calculate_tranche_results does.
+    """
+    adjusted = np.array(cash_flows, dtype=float)
+    if ops_expenses > 0:
+        days = np.asarray(installment_dates, dtype="datetime64[ns]").astype("datetime64[D]")
+        hits = np.flatnonzero(days == np.datetime64(OPS_EXPENSE_DATE, "D"))
+        if hits.size:
+            adjusted[hits[0]] = max(0.0, adjusted[hits[0]] - ops_expenses)
+    return adjusted
+
+
+class CashFlowIndex:
+    """
+    Cumulative-sum index for O(log n) tranche totals.
+
+    Built once per dataset and operational expense amount and then used as
+    the immutable prepared dataset of a request: all arrays are read-only,
+    so it can be shared by every evaluation without copying. Discount
+    weighted sums are built lazily per reinvestment rate and kept for later
+    queries.
+    """
+
+    def __init__(self, df: pd.DataFrame, ops_expenses: float = 0.0):
+        self.ops_expenses = float(ops_expenses)
+
+        inst_dates = df["installment_date"].to_numpy(dtype="datetime64[ns]")
+        base_cash = df["original_cash_flow"] if "original_cash_flow" in df.columns else df["cash_flow"]
+        cash_flows = apply_operational_expenses(base_cash.to_numpy(dtype=float), inst_dates, ops_expenses)
+        principal = (
+            df["principal_amount"].to_numpy(dtype=float)
+            if "principal_amount" in df.columns else np.zeros(len(df))
+        )
+        interest = (
+            df["interest_amount"].to_numpy(dtype=float)
+            if "interest_amount" in df.columns else np.zeros(len(df))
+        )
+        self.total_loan_principal = float(principal.sum())
+
+        valid = ~np.isnat(inst_dates)
+        if "reinvest_date" in df.columns:
+            reinvest_dates = df["reinvest_date"].to_numpy(dtype="datetime64[ns]")[valid]
+        else:
+            reinvest_dates = calculate_reinvestment_dates(inst_dates[valid])
+
+        # Reinvestment dates are non-decreasing in the installment date, so a
+        # single sort keeps both orders and the start date filter is a suffix
+        order = np.argsort(inst_dates[valid], kind="stable")
+        # Positions in df of the sorted rows, to align other cash flow vectors with the index
+        self.row_order = np.flatnonzero(valid)[order]
+        self.installment_ns = inst_dates[valid][order].astype(np.int64)
+        self.reinvest_ns = reinvest_dates[order].astype(np.int64)
+        # Whole days until a midnight maturity: (M - rd).days == M_day - ceil(rd)
+        self.reinvest_day = -np.floor_divide(-self.reinvest_ns, _DAY_NS)
+        self.origin_day = int(self.reinvest_day[0]) if self.reinvest_day.size else 0
+
+        self.cash_flows = cash_flows[valid][order]
+        self._cum_cash = np.concatenate(([0.0], np.cumsum(self.cash_flows)))
+        self._cum_principal = np.concatenate(([0.0], np.cumsum(principal[valid][order])))
+        self._cum_interest = np.concatenate(([0.0], np.cumsum(interest[valid][order])))
+        self._cum_weighted: Dict[float, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+        for array in (self.row_order, self.installment_ns, self.reinvest_ns, self.reinvest_day, self.cash_flows,
+                      self._cum_cash, self._cum_principal, self._cum_interest):
+            array.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.cash_flows)
+
+    def _weighted_prefix(self, reinvest_rate: float) -> np.ndarray:
+        """Cumulative sum of cf * (1 + r)^(-t / 365) for one reinvestment rate."""
+        key = float(reinvest_rate)
+        cum = self._cum_weighted.get(key)
+        if cum is None:
+            growth = 1 + simple_to_compound_annual(key) / 100.0
+            t = (self.reinvest_day - self.origin_day) / 365
+            cum = np.concatenate(([0.0], np.cumsum(self.cash_flows * growth ** (-t))))
+            cum.setflags(write=False)
+            with self._lock:
+                self._cum_weighted[key] = cum
+        return cum
+
+    def tranche_bounds(
+        self,
+        start_date: pd.Timestamp,
+        maturity_days: Sequence[int]
+    ) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Row ranges per tranche in the sorted tape.
+
+        Tranche i owns rows [lower[i], upper[i]); rows from upper[-1] on have
+        a reinvestment date on or after every maturity and belong to the last
+        tranche without any reinvestment return.
+
+        Returns:
+            (lower, upper, start_row)
+        """
+        start = pd.Timestamp(start_date).normalize()
+        start_ns = np.datetime64(start, "ns").astype(np.int64)
+        maturity_ns = start_ns + np.asarray(maturity_days, dtype=np.int64) * _DAY_NS
+        running_max = np.maximum.accumulate(maturity_ns)
+
+        start_row = int(np.searchsorted(self.installment_ns, start_ns, side="left"))
+        upper = np.maximum(np.searchsorted(self.reinvest_ns, running_max, side="left"), start_row)
+        lower = np.empty_like(upper)
+        lower[0] = start_row
+        lower[1:] = upper[:-1]
+        return lower, upper, start_row
+
+    def tranche_totals(
+        self,
+        start_date: pd.Timestamp,
+        maturity_days: Sequence[int],
+        reinvest_rates: Sequence[float],
+        include_tail: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Per-tranche totals, equal to assign_cash_flow_indices + calculate_totals_from_indices.
+
+        Args:
+            start_date: Start date for calculations
+            maturity_days: Maturity of each tranche in days from start_date
+            reinvest_rates: Reinvestment rate of each tranche
+            include_tail: Whether the last tranche collects the cash flows past
+                the last maturity. False gives the totals these tranches have as
+                the leading tranches of a longer structure.
+
+        Returns:
+            Arrays of (total_cash_flow, total_reinvest, total_principal, total_interest)
+        """
+        num_tranches = len(maturity_days)
+        lower, upper, _ = self.tranche_bounds(start_date, maturity_days)
+        # The last tranche also collects everything past the last maturity
+        upper_all = upper.copy()
+        if include_tail:
+            upper_all[-1] = len(self.cash_flows)
+
+        cash = self._cum_cash[upper_all] - self._cum_cash[lower]
+        principal = self._cum_principal[upper_all] - self._cum_principal[lower]
+        interest = self._cum_interest[upper_all] - self._cum_interest[lower]
+
+        start_day = pd.Timestamp(start_date).normalize().value // _DAY_NS
+        reinvest = np.zeros(num_tranches)
+        for i in range(num_tranches):
+            lo, hi = lower[i], upper[i]
+            if hi <= lo:
+                continue
+            weighted = self._weighted_prefix(reinvest_rates[i])
+            growth = 1 + simple_to_compound_annual(reinvest_rates[i]) / 100.0
+            horizon = (start_day + int(maturity_days[i]) - self.origin_day) / 365
+            in_range_cash = self._cum_cash[hi] - self._cum_cash[lo]
+            reinvest[i] = growth ** horizon * (weighted[hi] - weighted[lo]) - in_range_cash
+        return cash, reinvest, principal, interest
+
+    def tranche_weights(
+        self,
+        start_date: pd.Timestamp,
+        maturity_days: Sequence[int],
+        reinvest_rates: Sequence[float]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Linear maps from cash flows to the tranche totals of one structure.
+
+        For any cash flow vector cf aligned with the sorted rows (the df
+        positions in row_order), cf @ membership and cf @ reinvest_weights
+        are the per-tranche cash flow and reinvestment return totals that
+        tranche_totals gives for those cash flows. Many cash flow scenarios
+        of the same structure are then evaluated with two matrix products.
+
+        Args:
+            start_date: Start date for calculations
+            maturity_days: Maturity of each tranche in days from start_date
+            reinvest_rates: Reinvestment rate of each tranche
+
+        Returns:
+            (rows x tranches) membership and reinvestment weight matrices
+        """
+        lower, upper, _ = self.tranche_bounds(start_date, maturity_days)
+        upper_all = upper.copy()
+        upper_all[-1] = len(self.cash_flows)
+        rows = np.arange(len(self.cash_flows))[:, None]
+        membership = ((rows >= lower) & (rows < upper_all)).astype(float)
+
+        # cf * ((1 + r)^((M - t) / 365) - 1) for the rows reinvested until the maturity
+        start_day = pd.Timestamp(start_date).normalize().value // _DAY_NS
+        growth = 1 + simple_to_compound_annual(np.asarray(reinvest_rates, dtype=float)) / 100.0
+        horizon = (start_day + np.asarray(maturity_days, dtype=np.int64) - self.origin_day) / 365
+        t = (self.reinvest_day - self.origin_day) / 365
+        reinvest_weights = np.where(
+            (rows >= lower) & (rows < upper),
+            growth ** (horizon[None, :] - t[:, None]) - 1,
+            0.0
+        )
+        return membership, reinvest_weights
+
+    def scenario_reinvest_totals(
+        self,
+        cash_flows: np.ndarray,
+        start_date: pd.Timestamp,
+        maturity_days: Sequence[int],
+        reinvest_rates: np.ndarray
+    ) -> np.ndarray:
+        """
+        Reinvestment return totals of many cash flow scenarios of one structure,
+        each scenario with its own reinvestment rates.
+
+        Equal to cash_flows @ reinvest_weights of tranche_weights with the
+        rates of that scenario, without building the weights per scenario.
+
+        Args:
+            cash_flows: (scenarios x rows) cash flows aligned with the sorted rows
+            start_date: Start date for calculations
+            maturity_days: Maturity of each tranche in days from start_date
+            reinvest_rates: (scenarios x tranches) reinvestment rates
+
+        Returns:
+            (scenarios x tranches) reinvestment return totals
+        """
+        cash_flows = np.atleast_2d(cash_flows)
+        num_tranches = len(maturity_days)
+        lower, upper, _ = self.tranche_bounds(start_date, maturity_days)
+        totals = np.zeros((cash_flows.shape[0], num_tranches))
+        counts = upper - lower
+        nonempty = np.flatnonzero(counts > 0)
+        if nonempty.size == 0:
+            return totals
+
+        # Tranches reinvest disjoint row ranges, so every row has a single exponent
+        rows = np.concatenate([np.arange(lower[i], upper[i]) for i in nonempty])
+        tranche = np.repeat(nonempty, counts[nonempty])
+        start_day = pd.Timestamp(start_date).normalize().value // _DAY_NS
+        horizon = (start_day + np.asarray(maturity_days, dtype=np.int64) - self.origin_day) / 365
+        exponent = horizon[tranche] - (self.reinvest_day[rows] - self.origin_day) / 365
+
+        rates = np.broadcast_to(np.asarray(reinvest_rates, dtype=float), (cash_flows.shape[0], num_tranches))
+        growth = 1 + simple_to_compound_annual(rates) / 100.0
+        weighted = cash_flows[:, rows] * (growth[:, tranche] ** exponent - 1)
+        offsets = np.concatenate(([0], np.cumsum(counts[nonempty])[:-1]))
+        totals[:, nonempty] = np.add.reduceat(weighted, offsets, axis=1)
+        return totals
+
+    def tranche_totals_batch(
+        self,
+        start_date: pd.Timestamp,
+        maturity_days: np.ndarray,
+        reinvest_rates: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        tranche_totals for many candidate structures at once.
+
+        Args:
+            start_date: Start date for calculations
+            maturity_days: (candidates x tranches) maturities in days from start_date
+            reinvest_rates: (candidates x tranches) reinvestment rates
+
+        Returns:
+            (candidates x tranches) arrays of (total_cash_flow, total_reinvest,
+            total_principal, total_interest)
+        """
+        maturity_days = np.atleast_2d(np.asarray(maturity_days, dtype=np.int64))
+        reinvest_rates = np.broadcast_to(np.asarray(reinvest_rates, dtype=float), maturity_days.shape)
+
+        start = pd.Timestamp(start_date).normalize()
+        start_ns = np.datetime64(start, "ns").astype(np.int64)
+        running_max = np.maximum.accumulate(start_ns + maturity_days * _DAY_NS, axis=1)
+
+        start_row = int(np.searchsorted(self.installment_ns, start_ns, side="left"))
+        upper = np.maximum(np.searchsorted(self.reinvest_ns, running_max, side="left"), start_row)
+        lower = np.empty_like(upper)
+        lower[:, 0] = start_row
+        lower[:, 1:] = upper[:, :-1]
+        upper_all = upper.copy()
+        upper_all[:, -1] = len(self.cash_flows)
+
+        cash = self._cum_cash[upper_all] - self._cum_cash[lower]
+        principal = self._cum_principal[upper_all] - self._cum_principal[lower]
+        interest = self._cum_interest[upper_all] - self._cum_interest[lower]
+
+        # Oranlar az sayıda farklı değer alır; her oran için ağırlıklı toplam bir kez kurulur
+        start_day = start.value // _DAY_NS
+        in_range_cash = self._cum_cash[upper] - self._cum_cash[lower]
+        reinvest = np.zeros(maturity_days.shape)
+        for rate in np.unique(reinvest_rates):
+            mask = (reinvest_rates == rate) & (upper > lower)
+            if not mask.any():
+                continue
+            weighted = self._weighted_prefix(rate)
+            growth = 1 + simple_to_compound_annual(float(rate)) / 100.0
+            horizon = (start_day + maturity_days[mask] - self.origin_day) / 365
+            reinvest[mask] = (
+                growth ** horizon * (weighted[upper[mask]] - weighted[lower[mask]]) - in_range_cash[mask]
+            )
+        return cash, reinvest, principal, interest
+
+
+def prepare_cash_flows(df: pd.DataFrame, ops_expenses: float = 0.0) -> CashFlowIndex:
+    """
+    Prepare a tape once per request: apply operational expenses to the
+    original cash flows and build the read-only index all evaluations share.
+    """
+    return CashFlowIndex(df, ops_expenses)
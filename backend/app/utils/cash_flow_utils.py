@@ -4,11 +4,12 @@ Utility functions for cash flow processing and tranche calculations.
 import pandas as pd
 import numpy as np
 from datetime import timedelta
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 from app.utils.finance_utils import (
     get_next_business_day,
     simple_to_compound_annual,
-    calculate_reinvestment_date
+    calculate_reinvestment_date,
+    calculate_reinvestment_dates
 )
 
 def assign_cash_flows_to_tranches(
@@ -42,7 +43,9 @@ def assign_cash_flows_to_tranches(
         if pd.isnull(inst_date) or inst_date < start_date:
             continue
         
-        reinvest_date = calculate_reinvestment_date(inst_date)
+        reinvest_date = row.get('reinvest_date')
+        if reinvest_date is None or pd.isnull(reinvest_date):
+            reinvest_date = calculate_reinvestment_date(inst_date)
         assigned = False
         
         # First pass - assign to the first matching tranche
@@ -156,6 +159,125 @@ def assign_cash_flows_to_tranches(
     
     return tranch_cash_flows
 
+def build_daily_ledger(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Collapse a loan-level tape into one row per installment date.
+
+    The tranche engine only depends on the installment date, so summing
+    principal, interest and cash flow per day gives the same tranche totals
+    at O(days) instead of O(loans). Rows without a date are kept as a
+    single trailing NaT row so loan principal totals are unchanged.
+
+    Args:
+        df: Loan-level DataFrame as returned by load_excel_data
+
+    Returns:
+        DataFrame sorted by installment_date with summed amounts per day
+    """
+    sum_columns = [
+        col for col in ['principal_amount', 'interest_amount', 'cash_flow', 'original_cash_flow']
+        if col in df.columns
+    ]
+    aggregations = {col: 'sum' for col in sum_columns}
+    if 'reinvest_date' in df.columns:
+        aggregations['reinvest_date'] = 'first'
+
+    grouped = df.groupby('installment_date', sort=True, dropna=False)
+    ledger = grouped.agg(aggregations)
+    ledger['loan_count'] = grouped.size()
+    return ledger.reset_index()
+
+def assign_cash_flow_indices(
+    df: pd.DataFrame,
+    start_date: pd.Timestamp,
+    all_maturity_dates: List[pd.Timestamp],
+    all_reinvest_rates: List[float],
+    cash_flows: Optional[np.ndarray] = None
+) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    """
+    Vectorized equivalent of assign_cash_flows_to_tranches.
+
+    A cash flow goes to the first tranche (in list order) whose maturity is
+    after its reinvestment date, otherwise to the last tranche. This is the
+    net effect of the three passes of assign_cash_flows_to_tranches, found
+    here with np.searchsorted over the running maximum of the maturities.
+
+    Args:
+        df: DataFrame containing cash flow data
+        start_date: Start date for calculations
+        all_maturity_dates: List of maturity dates for each tranche
+        all_reinvest_rates: List of reinvestment rates for each tranche
+        cash_flows: Optional cash flow vector aligned with df rows used
+            instead of df['cash_flow'] (avoids copying df to adjust it)
+
+    Returns:
+        Tuple of (row positions per tranche, reinvestment returns per tranche).
+        Row positions index into df with iloc and keep the df order.
+    """
+    num_tranches = len(all_maturity_dates)
+    if num_tranches == 0:
+        return [], []
+
+    inst_dates = df['installment_date'].to_numpy(dtype='datetime64[ns]')
+    valid = ~np.isnat(inst_dates) & (inst_dates >= np.datetime64(pd.Timestamp(start_date), 'ns'))
+    positions = np.flatnonzero(valid)
+    if 'reinvest_date' in df.columns:
+        reinvest_dates = df['reinvest_date'].to_numpy(dtype='datetime64[ns]')[positions]
+    else:
+        reinvest_dates = calculate_reinvestment_dates(inst_dates[positions])
+    if cash_flows is None:
+        cash_flows = df['cash_flow'].to_numpy(dtype=float)
+    cash_flows = np.asarray(cash_flows, dtype=float)[positions]
+
+    maturity_dates = np.array(
+        [np.datetime64(pd.Timestamp(d), 'ns') for d in all_maturity_dates]
+    )
+    running_max = np.maximum.accumulate(maturity_dates)
+    tranche_of = np.searchsorted(running_max, reinvest_dates, side='right')
+    np.minimum(tranche_of, num_tranches - 1, out=tranche_of)
+
+    # Reinvestment return until the maturity of the receiving tranche
+    days_diff = (maturity_dates[tranche_of] - reinvest_dates) // np.timedelta64(1, 'D')
+    r_compound = np.array(
+        [simple_to_compound_annual(r) / 100.0 for r in all_reinvest_rates]
+    )[tranche_of]
+    returns = np.where(
+        days_diff > 0,
+        cash_flows * ((1 + r_compound) ** (np.maximum(days_diff, 0) / 365) - 1),
+        0.0
+    )
+
+    order = np.argsort(tranche_of, kind='stable')
+    bounds = np.searchsorted(tranche_of[order], np.arange(num_tranches + 1))
+    tranche_indices = [positions[order[bounds[i]:bounds[i + 1]]] for i in range(num_tranches)]
+    tranche_returns = [returns[order[bounds[i]:bounds[i + 1]]] for i in range(num_tranches)]
+    return tranche_indices, tranche_returns
+
+def calculate_totals_from_indices(
+    df: pd.DataFrame,
+    row_positions: np.ndarray,
+    reinvest_returns: np.ndarray,
+    cash_flows: Optional[np.ndarray] = None
+) -> Tuple[float, float, float, float]:
+    """
+    Array counterpart of calculate_totals for the output of assign_cash_flow_indices.
+
+    Returns:
+        Tuple of (total_cash_flow, total_reinvest, total_principal, total_interest)
+    """
+    if cash_flows is None:
+        cash_flows = df['cash_flow'].to_numpy(dtype=float)
+    total_cash_flow = float(np.asarray(cash_flows, dtype=float)[row_positions].sum())
+    total_principal = (
+        float(df['principal_amount'].to_numpy(dtype=float)[row_positions].sum())
+        if 'principal_amount' in df.columns else 0.0
+    )
+    total_interest = (
+        float(df['interest_amount'].to_numpy(dtype=float)[row_positions].sum())
+        if 'interest_amount' in df.columns else 0.0
+    )
+    return total_cash_flow, float(reinvest_returns.sum()), total_principal, total_interest
+
 def calculate_totals(
     cash_flows: List[Dict[str, Any]], 
     maturity_date: pd.Timestamp, 
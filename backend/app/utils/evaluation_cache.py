@@ -0,0 +1,199 @@
+# backend/app/utils/evaluation_cache.py
+"""
+Bounded LRU cache for tranche evaluation results.
+
+Entries are keyed by a content hash of the dataset, the structure
+parameters (rates and nominals rounded so float noise does not split
+entries) and the operational expenses. The cache is bounded both by entry
+count and by an approximate memory size; least recently used entries are
+evicted first.
+
+Cached values are shared: callers copy what they hand out or modify.
+"""
+
+import sys
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Varsayılan sınırlar: sonuç sözlükleri küçük olduğundan giriş sayısı asıl sınırdır
+DEFAULT_MAX_ENTRIES = 50_000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Anahtar yuvarlama hassasiyeti
+RATE_DECIMALS = 6
+NOMINAL_DECIMALS = 2
+
+
+def _approximate_size(value: Any) -> int:
+    """Rough deep size in bytes of dicts, lists and scalars used in results."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_approximate_size(k) + _approximate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_approximate_size(v) for v in value)
+    elif isinstance(value, np.ndarray):
+        size += value.nbytes
+    return size
+
+
+class EvaluationCache:
+    """
+    Thread-safe LRU cache with hit, miss and eviction counters.
+
+    Args:
+        max_entries: Maximum number of entries kept
+        max_bytes: Approximate memory cap over all cached values
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key (marking it recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> None:
+        """Store value under key and evict least recently used entries over the limits."""
+        if size is None:
+            size = _approximate_size(value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries (e.g. after a new upload); counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and current usage of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Uygulama genelinde paylaşılan önbellek
+evaluation_cache = EvaluationCache()
+
+# DataFrame nesnesi başına hesaplanmış içerik özetleri: id -> (weakref, özet)
+_fingerprints: Dict[int, Tuple[weakref.ref, str]] = {}
+_fingerprint_lock = threading.Lock()
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Content hash of a DataFrame (values and column names).
+
+    The hash is remembered per DataFrame object, so repeated lookups for the
+    stored upload cost a dictionary access. DataFrames are assumed not to be
+    modified in place after they are first hashed, as in the services.
+    """
+    key = id(df)
+    with _fingerprint_lock:
+        known = _fingerprints.get(key)
+        if known is not None and known[0]() is df:
+            return known[1]
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("|".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    fingerprint = digest.hexdigest()
+
+    def forget(_ref, key=key):
+        with _fingerprint_lock:
+            known = _fingerprints.get(key)
+            if known is not None and known[0] is _ref:
+                del _fingerprints[key]
+
+    with _fingerprint_lock:
+        _fingerprints[key] = (weakref.ref(df, forget), fingerprint)
+    return fingerprint
+
+
+def tranche_evaluation_key(
+    kind: str,
+    df: pd.DataFrame,
+    start_date: pd.Timestamp,
+    maturity_days: Sequence[int],
+    base_rates: Sequence[float],
+    spreads: Sequence[float],
+    reinvest_rates: Sequence[float],
+    nominals: Sequence[float],
+    ops_expenses: float
+) -> Tuple:
+    """
+    Cache key of one tranche evaluation.
+
+    Args:
+        kind: Result type, e.g. "metrics" or "results", so different outputs
+            of the same structure do not collide
+        df: Cash flow data the structure is evaluated on
+        start_date: Start date of the structure
+        maturity_days, base_rates, spreads, reinvest_rates, nominals:
+            Per-tranche parameters, Class A tranches followed by Class B
+        ops_expenses: Operational expenses
+
+    Returns:
+        Hashable key tuple
+    """
+    return (
+        kind,
+        dataset_fingerprint(df),
+        pd.Timestamp(start_date).normalize().value,
+        tuple(int(m) for m in maturity_days),
+        tuple(round(float(r), RATE_DECIMALS) for r in base_rates),
+        tuple(round(float(s), RATE_DECIMALS) for s in spreads),
+        tuple(round(float(r), RATE_DECIMALS) for r in reinvest_rates),
+        tuple(round(float(n), NOMINAL_DECIMALS) for n in nominals),
+        round(float(ops_expenses), NOMINAL_DECIMALS),
+    )
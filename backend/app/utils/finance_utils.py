@@ -1,6 +1,8 @@
 # backend/app/utils/finance_utils.py
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
+from typing import Iterable, Optional
 
 def simple_to_compound_annual(simple_rate_percent):
     """Convert an annual simple rate (in %) to an annual compounded rate (in %)."""
@@ -25,20 +27,42 @@ def overnight_to_annual_compound(simple_rate_percent):
     annual_compound = (1 + daily_rate)**365 - 1
     return annual_compound * 100.0
 
-def get_next_business_day(date):
-    """If the date falls on a weekend, move it to the next business day."""
-    while date.weekday() >= 5:  # 5=Saturday, 6=Sunday
+def make_business_day_calendar(holidays: Optional[Iterable] = None) -> np.busdaycalendar:
+    """Build a Monday-Friday business-day calendar excluding the given holidays."""
+    holiday_days = [np.datetime64(pd.Timestamp(d), "D") for d in (holidays or [])]
+    return np.busdaycalendar(weekmask="1111100", holidays=holiday_days)
+
+def get_next_business_day(date, holidays: Optional[Iterable] = None):
+    """If the date falls on a weekend or holiday, move it to the next business day."""
+    holiday_set = {pd.Timestamp(d).date() for d in (holidays or [])}
+    while date.weekday() >= 5 or pd.Timestamp(date).date() in holiday_set:  # 5=Saturday, 6=Sunday
         date += timedelta(days=1)
     return date
 
-def calculate_reinvestment_date(installment_date):
+def calculate_reinvestment_date(installment_date, holidays: Optional[Iterable] = None):
     """Adjust the installment date for weekends and add 1 day."""
-    if installment_date.weekday() >= 5:
-        installment_date = get_next_business_day(installment_date)
+    installment_date = get_next_business_day(installment_date, holidays)
     reinvest_date = installment_date + timedelta(days=1)
-    reinvest_date = get_next_business_day(reinvest_date)
+    reinvest_date = get_next_business_day(reinvest_date, holidays)
     return reinvest_date
 
+def calculate_reinvestment_dates(installment_dates, holidays: Optional[Iterable] = None) -> np.ndarray:
+    """
+    Vectorized calculate_reinvestment_date over a whole date column.
+
+    Uses np.busday_offset on a business-day calendar; the time of day and
+    NaT values are preserved. Returns a datetime64[ns] array.
+    """
+    dates = np.asarray(installment_dates, dtype="datetime64[ns]")
+    calendar = make_business_day_calendar(holidays)
+    days = dates.astype("datetime64[D]")
+    valid = ~np.isnat(days)
+    # Rolling to the next business day and then moving one business day
+    # forward is the same as "roll, add 1 day, roll" in the scalar version
+    reinvest_days = days.copy()
+    reinvest_days[valid] = np.busday_offset(days[valid], 1, roll="forward", busdaycal=calendar)
+    return dates + (reinvest_days - days).astype("timedelta64[ns]")
+
 def get_nearest_maturity(target_maturity, available_maturities):
     """Find the closest maturity day in the available maturities."""
     return min(available_maturities, key=lambda x: abs(x - target_maturity))
@@ -0,0 +1,160 @@
+# backend/app/utils/maturity_combinations.py
+"""
+Gap-valid maturity combinations of an evenly spaced maturity grid.
+
+The classic optimizer tests sorted Class A maturity combinations whose
+consecutive maturities are at least min_gap days apart. On the grid
+start, start + step, ... two maturities i < j grid positions apart are
+valid neighbours when j - i >= g with g = ceil(min_gap / step). Shifting
+the t-th position down by t * (g - 1) maps these combinations one to one
+onto plain k-subsets of range(n - (k - 1) * (g - 1)), keeping both the
+lexicographic order and the order by sum. So combinations are counted
+with math.comb and any one of them can be built from its rank, without
+enumerating the others.
+"""
+
+import math
+from typing import Iterator, List
+
+import numpy as np
+
+
+def _index_gap(step: int, min_gap: int) -> int:
+    """Minimum number of grid positions between consecutive maturities."""
+    return max(1, -(-min_gap // step))
+
+
+def _reduced_size(num_values: int, size: int, gap: int) -> int:
+    """Number of values of the equivalent gap-free subset problem."""
+    return num_values - (size - 1) * (gap - 1)
+
+
+def count_maturity_combinations(num_values: int, size: int, step: int, min_gap: int) -> int:
+    """
+    Number of gap-valid combinations of size maturities from a grid of num_values.
+
+    Args:
+        num_values: Number of maturities on the grid
+        size: Number of Class A tranches
+        step: Grid step in days
+        min_gap: Minimum days between consecutive maturities
+
+    Returns:
+        Combination count, computed without enumeration
+    """
+    if size <= 0:
+        return 0
+    reduced = _reduced_size(num_values, size, _index_gap(step, min_gap))
+    return math.comb(reduced, size) if reduced >= size else 0
+
+
+def iter_maturity_combinations(start: int, step: int, num_values: int, size: int, min_gap: int) -> Iterator[List[int]]:
+    """
+    Gap-valid combinations in lexicographic order, one at a time.
+
+    Same sequence as filtering itertools.combinations of the grid for the
+    minimum gap, but only valid combinations are ever built.
+    """
+    gap = _index_gap(step, min_gap)
+    if size <= 0 or _reduced_size(num_values, size, gap) < size:
+        return
+    positions = [t * gap for t in range(size)]
+    while True:
+        yield [start + p * step for p in positions]
+        # Advance the rightmost position that still leaves room for the ones after it
+        t = size - 1
+        while t >= 0 and positions[t] >= num_values - 1 - (size - 1 - t) * gap:
+            t -= 1
+        if t < 0:
+            return
+        positions[t] += 1
+        for u in range(t + 1, size):
+            positions[u] = positions[u - 1] + gap
+
+
+def _subset_sum_counts(num_values: int, size: int) -> np.ndarray:
+    """counts[t, s]: number of t-subsets of range(num_values) with sum s, for t <= size."""
+    max_sum = size * (2 * num_values - size - 1) // 2
+    dtype = np.int64 if math.comb(num_values, size) < 2 ** 62 else object
+    counts = np.zeros((size + 1, max_sum + 1), dtype=dtype)
+    counts[0, 0] = 1
+    for value in range(num_values):
+        for t in range(min(size, value + 1), 0, -1):
+            counts[t, value:] += counts[t - 1, :max_sum + 1 - value]
+    return counts
+
+
+def _unrank_by_sum(num_values: int, size: int, ranks: List[int]) -> List[List[int]]:
+    """
+    Subsets of range(num_values) at the given ranks, in order of sum with
+    lexicographic order among equal sums (a stable sort by sum).
+    """
+    base = _subset_sum_counts(num_values, size)
+    cumulative = np.cumsum(base[size].astype(object))
+    subsets = []
+    for rank in ranks:
+        total = int(np.searchsorted(cumulative, rank, side="right"))
+        rank -= int(cumulative[total - 1]) if total > 0 else 0
+
+        # Lexicographic unranking among subsets with this sum: remove values
+        # from the count table one by one so it always describes the values
+        # after the current candidate
+        counts = base.copy()
+        remaining = size
+        chosen = []
+        for value in range(num_values):
+            for t in range(1, remaining + 1):
+                counts[t, value:] -= counts[t - 1, :counts.shape[1] - value]
+            rest = total - value
+            with_value = int(counts[remaining - 1, rest]) if rest >= 0 else 0
+            if rank < with_value:
+                chosen.append(value)
+                remaining -= 1
+                total = rest
+                if remaining == 0:
+                    break
+            else:
+                rank -= with_value
+        subsets.append(chosen)
+    return subsets
+
+
+def sample_maturity_combinations(
+    start: int,
+    stop: int,
+    step: int,
+    size: int,
+    min_gap: int,
+    max_samples: int
+) -> List[List[int]]:
+    """
+    Gap-valid maturity combinations to test for one Class A tranche count.
+
+    All combinations in lexicographic order when there are at most
+    max_samples of them; otherwise max_samples combinations stratified by
+    average maturity: the combinations at ranks 0, q, 2q, ... with
+    q = count // max_samples in the stable order by average maturity.
+    Combinations are built directly from their rank, so time and memory
+    do not depend on how many combinations the grid has.
+
+    Args:
+        start, stop, step: Maturity grid range(start, stop + 1, step)
+        size: Number of Class A tranches
+        min_gap: Minimum days between consecutive maturities
+        max_samples: Maximum number of combinations returned
+
+    Returns:
+        List of sorted maturity lists
+    """
+    num_values = len(range(start, stop + 1, step))
+    count = count_maturity_combinations(num_values, size, step, min_gap)
+    if count <= max_samples:
+        return list(iter_maturity_combinations(start, step, num_values, size, min_gap))
+
+    gap = _index_gap(step, min_gap)
+    stride = count // max_samples
+    subsets = _unrank_by_sum(_reduced_size(num_values, size, gap), size, [i * stride for i in range(max_samples)])
+    return [
+        [start + (j + t * (gap - 1)) * step for t, j in enumerate(subset)]
+        for subset in subsets
+    ]
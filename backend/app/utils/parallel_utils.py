@@ -0,0 +1,110 @@
+# backend/app/utils/parallel_utils.py
+"""
+Process pool helpers shared by the optimizers.
+"""
+
+import os
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def resolve_num_workers(requested: Optional[int], num_tasks: int) -> int:
+    """
+    Number of worker processes to use.
+
+    Args:
+        requested: Configured worker count; None or <= 0 means all CPU cores
+        num_tasks: Number of independent tasks, more workers are never used
+
+    Returns:
+        Worker count between 1 and num_tasks
+    """
+    if requested is None or requested <= 0:
+        requested = os.cpu_count() or 1
+    return max(1, min(int(requested), num_tasks))
+
+
+def create_worker_pool(
+    num_workers: int,
+    initializer: Callable[..., None],
+    initargs: Tuple[Any, ...]
+) -> ProcessPoolExecutor:
+    """
+    Process pool whose workers receive the shared request data once.
+
+    Workers are spawned rather than forked: the optimizers run in a thread
+    of the API server, and forking a multi-threaded process can copy locks
+    held by other threads (logging, progress tracking) in a locked state.
+
+    Args:
+        num_workers: Number of worker processes
+        initializer: Called once in every worker with initargs, typically to
+            store the data set and build its CashFlowIndex
+        initargs: Arguments pickled once per worker
+    """
+    return ProcessPoolExecutor(
+        max_workers=num_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+        initargs=initargs
+    )
+
+
+class SharedFrame:
+    """
+    Numeric and datetime columns of a DataFrame copied once into shared memory.
+
+    Worker processes attach to the blocks with attach_shared_frame and get a
+    DataFrame of zero-copy NumPy views, so the tape is not pickled per worker
+    or per task. The creating process owns the blocks and must call close()
+    once the workers are done.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.blocks: List[shared_memory.SharedMemory] = []
+        self.spec: List[Tuple[str, str, str, int]] = []
+        try:
+            for column in df.columns:
+                values = df[column].to_numpy()
+                if values.dtype.kind not in "biufM":
+                    continue
+                block = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+                self.blocks.append(block)
+                np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+                self.spec.append((column, block.name, values.dtype.str, len(values)))
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Release and remove the shared memory blocks."""
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def attach_shared_frame(
+    spec: List[Tuple[str, str, str, int]]
+) -> Tuple[pd.DataFrame, List[shared_memory.SharedMemory]]:
+    """
+    DataFrame view of a SharedFrame in a worker process.
+
+    Returns:
+        (DataFrame backed by the shared blocks, attached blocks). The blocks
+        must stay referenced as long as the DataFrame is used.
+    """
+    blocks = []
+    columns = {}
+    for column, name, dtype, length in spec:
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        view = np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf)
+        view.setflags(write=False)
+        columns[column] = view
+    return pd.DataFrame(columns, copy=False), blocks
@@ -0,0 +1,158 @@
+# backend/app/utils/progress_stream.py
+"""
+Push channel for optimization progress.
+
+Optimizer threads publish progress snapshots to a ProgressBroadcaster. Each
+subscriber (one server-sent events connection) owns a bounded asyncio queue
+fed through loop.call_soon_threadsafe, so publishing never waits for a
+client: with no subscribers it is a no-op, and a slow subscriber only loses
+its oldest pending snapshots. The stream side coalesces pending snapshots to
+at most max_rate events per second, always sending the newest one.
+"""
+
+import json
+import asyncio
+import logging
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Abone başına bekleyen en fazla anlık görüntü; fazlası en eskiden atılır
+DEFAULT_MAX_PENDING = 64
+DEFAULT_MAX_RATE = 5.0
+# Bağlantının açık kaldığını gösteren SSE yorum satırı aralığı
+KEEPALIVE_SECONDS = 15.0
+
+
+class ProgressSubscription:
+    """
+    One consumer of a ProgressBroadcaster, read from an asyncio event loop.
+
+    Args:
+        loop: Event loop the stream is served from
+        max_pending: Snapshots kept while the consumer is behind
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int = DEFAULT_MAX_PENDING):
+        self._loop = loop
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self.max_pending = max(1, int(max_pending))
+        self.dropped = 0
+
+    def publish(self, snapshot: Dict[str, Any]) -> None:
+        """Hand a snapshot to the event loop; callable from any thread, never blocks."""
+        try:
+            self._loop.call_soon_threadsafe(self._put, snapshot)
+        except RuntimeError:
+            # Event loop already closed: the connection is gone
+            pass
+
+    def _put(self, snapshot: Dict[str, Any]) -> None:
+        while self._queue.qsize() >= self.max_pending:
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(snapshot)
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Newest pending snapshot, waiting up to timeout for one (None on timeout)."""
+        try:
+            snapshot = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self.latest() or snapshot
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Newest pending snapshot without waiting (None when nothing is pending)."""
+        snapshot = None
+        while not self._queue.empty():
+            snapshot = self._queue.get_nowait()
+        return snapshot
+
+
+class ProgressBroadcaster:
+    """Fan-out of progress snapshots to the current subscribers."""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self, loop: asyncio.AbstractEventLoop, max_pending: int = DEFAULT_MAX_PENDING) -> ProgressSubscription:
+        subscription = ProgressSubscription(loop, max_pending)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ProgressSubscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, snapshot: Dict[str, Any]) -> None:
+        """Send a snapshot to every subscriber without blocking."""
+        if not self._subscribers:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.publish(snapshot)
+
+
+def format_sse(data: Dict[str, Any], event: str = "progress", event_id: Optional[int] = None) -> str:
+    """One server-sent events message."""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream_progress(
+    broadcaster: ProgressBroadcaster,
+    initial: Dict[str, Any],
+    max_rate: float = DEFAULT_MAX_RATE,
+    finished: Optional[Callable[[], bool]] = None
+) -> AsyncIterator[str]:
+    """
+    Server-sent events for a progress tracker.
+
+    Sends the current snapshot first, then the newest snapshot at most
+    max_rate times per second while there are updates, and a keep-alive
+    comment when there are none.
+
+    Args:
+        broadcaster: Broadcaster of the tracker
+        initial: Current snapshot of the tracker
+        max_rate: Maximum events per second
+        finished: End the stream once this returns True after an event. The
+            owner must publish a snapshot after it becomes True, otherwise
+            the stream only notices it at the next update.
+    """
+    loop = asyncio.get_running_loop()
+    min_interval = 1.0 / max(0.1, max_rate)
+    subscription = broadcaster.subscribe(loop)
+    event_id = 0
+    try:
+        snapshot = initial
+        while True:
+            yield format_sse(snapshot, event_id=event_id)
+            event_id += 1
+            if finished is not None and finished():
+                return
+            sent_at = loop.time()
+
+            snapshot = None
+            while snapshot is None:
+                snapshot = await subscription.next(timeout=KEEPALIVE_SECONDS)
+                if snapshot is None:
+                    yield ": keep-alive\n\n"
+            # Coalesce everything published until the next slot into one event
+            wait = sent_at + min_interval - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                snapshot = subscription.latest() or snapshot
+    finally:
+        broadcaster.unsubscribe(subscription)
@@ -0,0 +1,118 @@
+# backend/app/utils/rate_curve.py
+"""
+Class A rate curves as dense per-day arrays.
+
+A RateCurve is built once per optimization run from the knots of a rate
+table (maturity day -> base rate and reinvest rate) and holds the base and
+reinvest rate of every day 0..max_day, so assigning rates to candidate
+maturities is an array index instead of a nearest-key search per tranche.
+Days past max_day use the rate of max_day.
+
+Interpolation modes between the knots:
+    nearest: rate of the closest knot, the shorter one on ties (same as
+             get_nearest_maturity on the sorted table)
+    step:    rate of the last knot at or before the day
+    linear:  linear between knots
+Outside the knots every mode uses the first or last knot.
+"""
+
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+INTERPOLATION_MODES = ("nearest", "step", "linear")
+MAX_CURVE_DAY = 730
+
+# Default Class A rate tables and structure sizes of the tranche models
+RATE_MODELS = {
+    # Previous model parameters (February 13, 2025)
+    "previous": {
+        "maturities": [61, 120, 182, 274],
+        "base_rates": [45.6, 44.5, 43.3, 42.5],
+        "reinvest_rates": [40.0, 37.25, 32.5, 30.0],
+        "class_b_base_rate": 0.0,
+        "class_b_reinvest_rate": 25.5,
+        "total_a_nominal": 1765000000,  # Original sum from previous model
+    },
+    # New model parameters (April 16, 2025)
+    "new": {
+        "maturities": [59, 94, 150, 189, 275],
+        "base_rates": [45.5, 45.5, 45.5, 45.5, 45.5],
+        "reinvest_rates": [41.0, 38.5, 35.0, 33.5, 31.5],
+        "class_b_base_rate": 0.0,
+        "class_b_reinvest_rate": 30.0,
+        "total_a_nominal": 3169600000,  # Sum of all Class A tranches in new model
+    },
+}
+
+
+def get_rate_model(name: Optional[str]) -> Dict:
+    """Rate model by name; unknown names use the previous model, as the optimizers always did."""
+    return RATE_MODELS["new"] if name == "new" else RATE_MODELS["previous"]
+
+
+def _interpolate(days: np.ndarray, knots: np.ndarray, values: np.ndarray, mode: str) -> np.ndarray:
+    if mode == "linear":
+        return np.interp(days, knots, values)
+    if mode == "step":
+        return values[np.clip(np.searchsorted(knots, days, side="right") - 1, 0, len(knots) - 1)]
+    # nearest: argmin returns the first, i.e. shorter, knot on ties
+    return values[np.abs(days[:, None] - knots[None, :]).argmin(axis=1)]
+
+
+class RateCurve:
+    """
+    Base and reinvest rate of every day up to max_day.
+
+    Args:
+        maturities: Knot maturities in days
+        base_rates: Base rate of each knot
+        reinvest_rates: Reinvest rate of each knot
+        mode: "nearest", "step" or "linear"
+        max_day: Last day held in the arrays
+    """
+
+    def __init__(
+        self,
+        maturities: Sequence[int],
+        base_rates: Sequence[float],
+        reinvest_rates: Sequence[float],
+        mode: str = "nearest",
+        max_day: int = MAX_CURVE_DAY
+    ):
+        if mode not in INTERPOLATION_MODES:
+            raise ValueError(f"Unknown rate interpolation mode: {mode}. Expected one of {INTERPOLATION_MODES}")
+        if not maturities or not (len(maturities) == len(base_rates) == len(reinvest_rates)):
+            raise ValueError("Rate curve needs the same non-zero number of maturities, base rates and reinvest rates")
+
+        order = np.argsort(np.asarray(maturities, dtype=float), kind="stable")
+        self.maturities = np.asarray(maturities, dtype=float)[order]
+        knot_base_rates = np.asarray(base_rates, dtype=float)[order]
+        knot_reinvest_rates = np.asarray(reinvest_rates, dtype=float)[order]
+        self.mode = mode
+        self.max_day = int(max(max_day, self.maturities[-1]))
+
+        days = np.arange(self.max_day + 1, dtype=float)
+        self.base_rates = _interpolate(days, self.maturities, knot_base_rates, mode)
+        self.reinvest_rates = _interpolate(days, self.maturities, knot_reinvest_rates, mode)
+        # Python lists for the per-structure lookups, where NumPy call overhead dominates
+        self._base_rate_list = self.base_rates.tolist()
+        self._reinvest_rate_list = self.reinvest_rates.tolist()
+
+    def _index(self, days: Union[int, Iterable[int], np.ndarray]) -> np.ndarray:
+        return np.clip(np.asarray(days, dtype=np.int64), 0, self.max_day)
+
+    def rates(self, days: Union[int, Iterable[int], np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Base and reinvest rates of the given maturity days, in the shape of days."""
+        index = self._index(days)
+        return self.base_rates[index], self.reinvest_rates[index]
+
+    def base_rate_list(self, days: Iterable[int]) -> list:
+        """Base rates of the given maturities as Python floats."""
+        rates, last = self._base_rate_list, self.max_day
+        return [rates[min(max(int(day), 0), last)] for day in days]
+
+    def reinvest_rate_list(self, days: Iterable[int]) -> list:
+        """Reinvest rates of the given maturities as Python floats."""
+        rates, last = self._reinvest_rate_list, self.max_day
+        return [rates[min(max(int(day), 0), last)] for day in days]
@@ -0,0 +1,180 @@
+# backend/app/utils/result_cache.py
+"""
+Persistent cache of completed optimization results.
+
+Results are stored as JSON in a local SQLite database, keyed by a hash of
+the dataset fingerprint, the optimizer and the canonical (sorted key) JSON
+of the request settings, so an identical request after a page change or a
+server restart is answered without rerunning the search. Entries of other
+datasets are dropped when a new tape is uploaded, and the least recently
+used entries are dropped over max_entries.
+
+The database path is taken from the ABS_RESULT_CACHE_PATH environment
+variable (empty: cache disabled), by default backend/.cache/.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[2] / ".cache" / "optimization_results.sqlite3"
+DEFAULT_MAX_ENTRIES = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS optimization_results (
+    key TEXT PRIMARY KEY,
+    dataset TEXT NOT NULL,
+    method TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+)
+"""
+
+
+def settings_key(dataset: str, method: str, settings: Iterable[Dict[str, Any]]) -> str:
+    """
+    Cache key of a run.
+
+    Args:
+        dataset: Dataset fingerprint
+        method: Optimizer name
+        settings: JSON-serializable settings dicts of the request
+
+    Returns:
+        Hex digest of the canonical JSON of the inputs
+    """
+    canonical = json.dumps([dataset, method, list(settings)], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    SQLite-backed result store with hit and miss counters.
+
+    Args:
+        path: Database file; None disables the cache
+        max_entries: Maximum number of results kept
+    """
+
+    def __init__(self, path: Optional[Path], max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path) if path else None
+        self.max_entries = int(max_entries)
+        self._lock = threading.Lock()
+        self._ready = False
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _connect(self) -> sqlite3.Connection:
+        # The cache directory is not in the repository; SQLite does not create it
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.path), timeout=10)
+        if not self._ready:
+            try:
+                connection.execute(_SCHEMA)
+            except sqlite3.Error:
+                connection.close()
+                raise
+            self._ready = True
+        return connection
+
+    def _execute(self, operation):
+        """Run operation(connection) in a transaction; cache errors never fail a request."""
+        if not self.enabled:
+            return None
+        try:
+            with self._lock:
+                connection = self._connect()
+                try:
+                    with connection:
+                        return operation(connection)
+                finally:
+                    connection.close()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Result cache unavailable: {e}")
+            return None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Stored result for key, or None."""
+        def lookup(connection):
+            row = connection.execute("SELECT result FROM optimization_results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                connection.execute("UPDATE optimization_results SET last_used_at = ? WHERE key = ?", (time.time(), key))
+            return row
+
+        row = self._execute(lookup)
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, dataset: str, method: str, result: Dict[str, Any]) -> None:
+        """Store a result and drop the least recently used ones over max_entries."""
+        now = time.time()
+        payload = json.dumps(result, default=str)
+
+        def store(connection):
+            connection.execute(
+                "INSERT OR REPLACE INTO optimization_results VALUES (?, ?, ?, ?, ?, ?)",
+                (key, dataset, method, payload, now, now)
+            )
+            connection.execute(
+                "DELETE FROM optimization_results WHERE key NOT IN "
+                "(SELECT key FROM optimization_results ORDER BY last_used_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+        self._execute(store)
+
+    def invalidate(self, keep_dataset: Optional[str] = None) -> int:
+        """Drop the results of every dataset except keep_dataset; returns the number dropped."""
+        def drop(connection):
+            if keep_dataset is None:
+                return connection.execute("DELETE FROM optimization_results").rowcount
+            return connection.execute("DELETE FROM optimization_results WHERE dataset != ?", (keep_dataset,)).rowcount
+
+        dropped = self._execute(drop) or 0
+        if dropped:
+            logger.info(f"Result cache: dropped {dropped} results of previous datasets")
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and current size of the cache."""
+        entries = self._execute(
+            lambda connection: connection.execute("SELECT COUNT(*) FROM optimization_results").fetchone()[0]
+        )
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "path": str(self.path) if self.path else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries or 0,
+            "max_entries": self.max_entries,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _default_path() -> Optional[Path]:
+    configured = os.environ.get("ABS_RESULT_CACHE_PATH")
+    if configured is None:
+        return DEFAULT_CACHE_PATH
+    return Path(configured) if configured.strip() else None
+
+
+# Uygulama genelinde paylaşılan sonuç önbelleği
+result_cache = ResultCache(_default_path())
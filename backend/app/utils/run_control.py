@@ -0,0 +1,117 @@
+# backend/app/utils/run_control.py
+"""
+Cooperative cancellation and run budgets for the optimizers.
+
+An optimization runs under a RunControl installed for its thread. The
+search loops and the nominal adjustment ask it between units of work
+whether to stop, so a cancelled or over-budget run ends early with the best
+structure found so far instead of running to completion. Worker processes
+do not see the control; their parent stops handing them work.
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Durma nedenleri
+STOP_CANCELLED = "cancelled"
+STOP_MAX_SECONDS = "max_seconds"
+STOP_MAX_EVALUATIONS = "max_evaluations"
+
+
+class RunControl:
+    """
+    Cancellation flag and wall-clock / evaluation budgets of one run.
+
+    Args:
+        max_seconds: Wall-clock budget from start(); None for no limit
+        max_evaluations: Structure evaluation budget; None for no limit
+    """
+
+    def __init__(self, max_seconds: Optional[float] = None, max_evaluations: Optional[int] = None):
+        self.max_seconds = max_seconds
+        self.max_evaluations = max_evaluations
+        self.evaluations = 0
+        self.started = False
+        self.started_at = time.monotonic()
+        self.stop_reason: Optional[str] = None  # set when a stop is first observed
+        self._cancelled = threading.Event()
+
+    def start(self, max_seconds: Optional[float] = None, max_evaluations: Optional[int] = None) -> None:
+        """Start the clock, adding the given budgets (the tighter limit wins)."""
+        if max_seconds is not None:
+            self.max_seconds = max_seconds if self.max_seconds is None else min(self.max_seconds, max_seconds)
+        if max_evaluations is not None:
+            self.max_evaluations = (max_evaluations if self.max_evaluations is None
+                                    else min(self.max_evaluations, max_evaluations))
+        self.started = True
+        self.started_at = time.monotonic()
+
+    def cancel(self) -> None:
+        """Ask the run to stop; safe to call from any thread."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def add_evaluations(self, count: int = 1) -> None:
+        """Count structures scored by the optimizer."""
+        self.evaluations += count
+
+    def should_stop(self) -> bool:
+        """True once the run is cancelled or out of budget; the first reason is kept."""
+        if self.stop_reason is not None:
+            return True
+        if self.cancelled:
+            self.stop_reason = STOP_CANCELLED
+        elif self.max_seconds is not None and self.elapsed_seconds >= self.max_seconds:
+            self.stop_reason = STOP_MAX_SECONDS
+        elif self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            self.stop_reason = STOP_MAX_EVALUATIONS
+        else:
+            return False
+        logger.info(f"Stopping optimization run: {self.stop_reason} after {self.elapsed_seconds:.1f}s "
+                    f"and {self.evaluations} evaluations")
+        return True
+
+
+# Control of the run in the current thread, set by run_control_scope
+_current_run_control: ContextVar[Optional[RunControl]] = ContextVar("run_control", default=None)
+
+
+def current_run_control() -> Optional[RunControl]:
+    """RunControl installed for the current thread, if any."""
+    return _current_run_control.get()
+
+
+def should_stop() -> bool:
+    """Whether the run of the current thread should stop (False without a control)."""
+    control = _current_run_control.get()
+    return control is not None and control.should_stop()
+
+
+def count_evaluations(count: int = 1) -> None:
+    """Count structures scored by the run of the current thread (no-op without a control)."""
+    control = _current_run_control.get()
+    if control is not None:
+        control.add_evaluations(count)
+
+
+@contextmanager
+def run_control_scope(control: RunControl) -> Iterator[RunControl]:
+    """Install control for the current thread while the block runs."""
+    token = _current_run_control.set(control)
+    try:
+        yield control
+    finally:
+        _current_run_control.reset(token)
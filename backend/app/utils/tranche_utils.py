@@ -4,6 +4,7 @@ Optimization ve Calculation servisleri arasında ortak hesaplama
 fonksiyonlarını içeren utility modülü.
 """
 
+import copy
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Any, Tuple, Optional
@@ -12,84 +13,127 @@ from app.utils.finance_utils import (
     get_nearest_maturity
 )
 from app.utils.cash_flow_utils import (
-    assign_cash_flows_to_tranches,
-    calculate_totals
+    assign_cash_flow_indices,
+    calculate_totals_from_indices
 )
+from app.utils.cash_flow_index import (
+    CashFlowIndex,
+    apply_operational_expenses
+)
+from app.utils.evaluation_cache import EvaluationCache, tranche_evaluation_key
+from app.utils.run_control import should_stop
 
-def calculate_tranche_results(
+def _collect_tranche_totals(
     df: pd.DataFrame,
     start_date: pd.Timestamp,
-    a_maturities: List[int],
-    a_base_rates: List[float],
-    a_spreads: List[float],
-    a_reinvest_rates: List[float],
-    a_nominals: List[float],
-    b_maturity: int,
-    b_base_rate: float,
-    b_spread: float,
-    b_reinvest_rate: float,
-    b_nominal: float,
-    ops_expenses: float = 0.0
-) -> Dict[str, Any]:
+    all_maturity_days: List[int],
+    all_reinvest_rates: List[float],
+    ops_expenses: float,
+    cash_flow_index: Optional[CashFlowIndex],
+    evaluation_context: Optional["TrancheEvaluationContext"] = None
+) -> Tuple[List[Tuple[float, float, float, float]], float]:
     """
-    Hem optimization hem de calculation servislerinde kullanılacak
-    ortak tranche hesaplama mantığını içerir.
-    
-    Args:
-        df: Nakit akışı verileri içeren DataFrame
-        start_date: Başlangıç tarihi
-        a_maturities: Class A vadeleri (gün)
-        a_base_rates: Class A baz faiz oranları
-        a_spreads: Class A spread değerleri
-        a_reinvest_rates: Class A yeniden yatırım oranları
-        a_nominals: Class A nominal değerleri
-        b_maturity: Class B vadesi (gün)
-        b_base_rate: Class B baz faiz oranı
-        b_spread: Class B spread değeri
-        b_reinvest_rate: Class B yeniden yatırım oranı
-        b_nominal: Class B nominal değeri
-        ops_expenses: Operasyon giderleri
-        
-    Returns:
-        Hesaplanmış sonuçları içeren sözlük
+    Her tranche için (nakit akışı, reinvestment getirisi, anapara, faiz)
+    toplamlarını ve toplam kredi anaparasını döndürür.
     """
-    # Geçici dataframe kopyası
-    df_temp = df.copy()
-    df_temp["cash_flow"] = df_temp["original_cash_flow"].copy()
+    if evaluation_context is not None:
+        if not evaluation_context.matches(start_date, all_maturity_days, all_reinvest_rates, ops_expenses):
+            raise ValueError("TrancheEvaluationContext was built for a different maturity/reinvest rate vector")
+        return evaluation_context.tranche_totals, evaluation_context.total_loan_principal
     
-    # Operasyonel giderleri düş (16 Şubat 2025)
-    if ops_expenses > 0:
-        target_date = pd.Timestamp("2025-02-16")
-        mask = df_temp["installment_date"].dt.date == target_date.date()
-        if mask.any():
-            idx = df_temp[mask].index[0]
-            df_temp.at[idx, "cash_flow"] = max(0, df_temp.at[idx, "cash_flow"] - ops_expenses)
+    if cash_flow_index is not None:
+        if cash_flow_index.ops_expenses != float(ops_expenses):
+            raise ValueError(
+                f"CashFlowIndex was built for operational expenses {cash_flow_index.ops_expenses}, got {ops_expenses}"
+            )
+        # Tranche toplamlarını prefix-sum indeksinden oku
+        tranche_totals = list(zip(*cash_flow_index.tranche_totals(
+            start_date, all_maturity_days, all_reinvest_rates
+        )))
+        return tranche_totals, cash_flow_index.total_loan_principal
+
+    # Operasyonel giderleri (16 Şubat 2025) DataFrame kopyalamadan vektör üzerinde düş
+    cash_flows = apply_operational_expenses(
+        df["original_cash_flow"].to_numpy(dtype=float),
+        df["installment_date"].to_numpy(dtype="datetime64[ns]"),
+        ops_expenses
+    )
     
-    # Tüm parametreleri birleştir
-    all_maturity_days = a_maturities + [b_maturity]
-    all_base_rates = a_base_rates + [b_base_rate]
-    all_spreads = a_spreads + [b_spread]
-    all_reinvest_rates = a_reinvest_rates + [b_reinvest_rate]
-    all_nominals = a_nominals + [b_nominal]
+    # Nakit akışlarını tranchelere dağıt (vektörel)
     all_maturity_dates = [start_date + pd.Timedelta(days=days) for days in all_maturity_days]
-    
-    # Nakit akışlarını tranchelere dağıt
-    tranch_cash_flows = assign_cash_flows_to_tranches(
-        df_temp, start_date, all_maturity_dates, all_reinvest_rates
+    tranche_indices, tranche_returns = assign_cash_flow_indices(
+        df, start_date, all_maturity_dates, all_reinvest_rates, cash_flows=cash_flows
     )
-    
-    # Tranche sonuçlarını hesapla
-    results = []
+    tranche_totals = [
+        calculate_totals_from_indices(df, tranche_indices[i], tranche_returns[i], cash_flows=cash_flows)
+        for i in range(len(all_maturity_days))
+    ]
+    return tranche_totals, df["principal_amount"].sum()
+
+class TrancheEvaluationContext:
+    """
+    Sabit bir başlangıç tarihi, vade ve yeniden yatırım oranı vektörü için
+    tranche toplamları.
+
+    Nakit akışlarının tranchelere dağıtımı nominallerden ve kupon
+    oranlarından bağımsızdır; yalnızca bunları değiştiren değerlendirmeler
+    bu toplamları yeniden kullanır ve sadece buffer şelalesini çalıştırır.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        start_date: pd.Timestamp,
+        all_maturity_days: List[int],
+        all_reinvest_rates: List[float],
+        ops_expenses: float = 0.0,
+        cash_flow_index: Optional[CashFlowIndex] = None
+    ):
+        self.start_date = pd.Timestamp(start_date)
+        self.all_maturity_days = tuple(int(d) for d in all_maturity_days)
+        self.all_reinvest_rates = tuple(float(r) for r in all_reinvest_rates)
+        self.ops_expenses = float(ops_expenses)
+        self.tranche_totals, self.total_loan_principal = _collect_tranche_totals(
+            df, self.start_date, list(self.all_maturity_days), list(self.all_reinvest_rates),
+            ops_expenses, cash_flow_index
+        )
+
+    def matches(
+        self,
+        start_date: pd.Timestamp,
+        all_maturity_days: List[int],
+        all_reinvest_rates: List[float],
+        ops_expenses: float
+    ) -> bool:
+        """Bu toplamların verilen yapı için geçerli olup olmadığını döndürür."""
+        return (
+            self.ops_expenses == float(ops_expenses)
+            and self.all_maturity_days == tuple(int(d) for d in all_maturity_days)
+            and self.all_reinvest_rates == tuple(float(r) for r in all_reinvest_rates)
+            and self.start_date == pd.Timestamp(start_date)
+        )
+
+def _run_waterfall(
+    tranche_totals: List[Tuple[float, float, float, float]],
+    num_a_tranches: int,
+    all_maturity_days: List[int],
+    all_base_rates: List[float],
+    all_spreads: List[float],
+    all_reinvest_rates: List[float],
+    all_nominals: List[float]
+) -> List[Dict[str, Any]]:
+    """
+    Buffer şelalesini çalıştırır; rapor ve metrik API'lerinin ortak çekirdeği.
+    Her tranche için ham sayısal sonuçları içeren bir sözlük döndürür.
+    """
+    steps = []
     buffer = 0.0
     
     for i, days in enumerate(all_maturity_days):
-        is_a = i < len(a_maturities)
-        t_name = f"Class {'A' if is_a else 'B'}{i+1 if is_a else ''}".strip()
+        is_a = i < num_a_tranches
         
         # Nakit akışı, reinvestment ve buffer hesapla
-        c_flow, r_ret, total_principal, total_interest = calculate_totals(
-            tranch_cash_flows[i], all_maturity_dates[i], all_reinvest_rates[i]
-        )
+        c_flow, r_ret, total_principal, total_interest = tranche_totals[i]
         
         # Buffer faiz getirisi hesapla
         buf_reinv = 0.0
@@ -104,13 +148,10 @@ def calculate_tranche_results(
         nominal = all_nominals[i]
         
         # Faiz oranı parametreleri
-        base_rate = all_base_rates[i]
-        spread = all_spreads[i]
-        total_rate = base_rate + spread/100
+        total_rate = all_base_rates[i] + all_spreads[i]/100
         
         if is_a:
             # Class A için hesaplama
-            total_rate = base_rate + spread/100
             disc = 1 / (1 + total_rate/100 * days/365) if days else 1
             principal = nominal * disc
             interest = nominal - principal
@@ -131,7 +172,468 @@ def calculate_tranche_results(
         new_buffer = max(0.0, available - total_pay)
         buf_ratio = new_buffer / nominal * 100 if nominal else 0.0
         
-        # Sonuçları ekle
+        steps.append({
+            "is_a": is_a,
+            "total_rate": total_rate,
+            "coupon_rate": coupon_rate,
+            "eff_coupon": eff_coupon,
+            "nominal": nominal,
+            "buffer_in": buffer,
+            "cash_flow": c_flow,
+            "reinvest_return": r_ret,
+            "buffer_reinvest": buf_reinv,
+            "available": available,
+            "principal": principal,
+            "interest": interest,
+            "coupon": coupon,
+            "total_pay": total_pay,
+            "buffer_out": new_buffer,
+            "buffer_ratio": buf_ratio,
+        })
+        
+        # Buffer güncelle
+        buffer = new_buffer
+    
+    return steps
+
+def _summarize_waterfall(steps: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Şelale adımlarından optimizasyonun kullandığı skaler metrikleri üretir."""
+    # Sonuçları Class A ve B olarak ayır
+    a_steps = [s for s in steps if s["is_a"]]
+    b_steps = [s for s in steps if not s["is_a"]]
+    
+    # Toplamaları hesapla
+    class_a_principal = sum(s["principal"] for s in a_steps)
+    class_b_principal = sum(s["principal"] for s in b_steps)
+    
+    return {
+        "class_a_total": sum(s["total_pay"] for s in a_steps),
+        "class_b_total": sum(s["total_pay"] for s in b_steps),
+        "class_a_principal": class_a_principal,
+        "class_b_principal": class_b_principal,
+        "class_a_interest": sum(s["interest"] for s in a_steps),
+        "class_b_coupon": sum(s["coupon"] for s in b_steps),
+        # En düşük buffer oranı
+        "min_buffer_actual": min(s["buffer_ratio"] for s in a_steps) if a_steps else 0.0,
+        "total_principal_paid": class_a_principal + class_b_principal,
+        # Doğrudan kupon oranı ve efektif kupon oranı
+        "direct_coupon_rate": steps[-1]["coupon_rate"] if b_steps else 0.0,
+        "effective_coupon_rate": steps[-1]["eff_coupon"] if b_steps else 0.0,
+    }
+
+def class_a_buffer_ratio_bound(
+    tranche_totals: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    a_maturity_days: List[int],
+    a_reinvest_rates: List[float],
+    nominal_lower_bounds: List[float]
+) -> float:
+    """
+    Öndeki Class A tranchelerinin minimum buffer oranı için üst sınır.
+    
+    Bir nominal büyüdükçe sonraki bufferlar yalnızca küçülür ve her oran
+    kendi nominaline bölünür; bu yüzden şelaleyi nominallerin alt
+    sınırlarıyla çalıştırmak her buffer oranını yukarıdan sınırlar. Sonuç
+    minimum buffer şartının altındaysa bu vadelerle başlayan hiçbir yapı
+    geçerli olamaz.
+    
+    Args:
+        tranche_totals: Öndeki tranchelerin CashFlowIndex.tranche_totals çıktısı
+            (include_tail=False, kuyruk nakit akışları hariç)
+        a_maturity_days: Öndeki tranchelerin vadeleri (gün)
+        a_reinvest_rates: Öndeki tranchelerin yeniden yatırım oranları
+        nominal_lower_bounds: Her tranche için nominal alt sınırı
+        
+    Returns:
+        Minimum buffer oranı (%) üst sınırı
+    """
+    buffer = 0.0
+    min_ratio = float('inf')
+    cash_flows, reinvest_returns = tranche_totals[0], tranche_totals[1]
+    for i, days in enumerate(a_maturity_days):
+        buf_reinv = 0.0
+        if i > 0 and buffer > 0 and days > a_maturity_days[i-1]:
+            factor = (1 + simple_to_compound_annual(a_reinvest_rates[i])/100)**(
+                (days - a_maturity_days[i-1]) / 365
+            ) - 1
+            buf_reinv = buffer * factor
+        available = cash_flows[i] + reinvest_returns[i] + buffer + buf_reinv
+        nominal = nominal_lower_bounds[i]
+        buffer = max(0.0, available - nominal)
+        min_ratio = min(min_ratio, buffer / nominal * 100 if nominal else 0.0)
+    return min_ratio
+
+def class_b_coupon_rate_bound(
+    tranche_totals: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    maturity_days: List[int],
+    reinvest_rates: List[float],
+    nominal_upper_bounds: List[float],
+    remaining_cash: float,
+    class_a_total: float,
+    class_b_nominal: float,
+    class_b_maturity: int
+) -> float:
+    """
+    Öndeki Class A tranchelerinden sonra gelebilecek her yapı için Class B
+    efektif kupon oranının alt sınırı.
+    
+    Buffer sıfırda kesilmeden taşındığında şelale nominallerde doğrusaldır
+    ve kesme buffer'ı yalnızca büyütür. Öndeki tranchelerin nominalleri üst
+    sınırlarıyla ödenir; sonraki tranchelerin nakit akışları yeniden yatırım
+    getirisi ve buffer faizi olmadan, nominalleri ise toplam Class A
+    nominalinin kalanı olarak sayılır. Nakit akışları ve yeniden yatırım
+    oranları negatif değilse her gerçek kupon bu sınırın üstündedir.
+    
+    Args:
+        tranche_totals: Öndeki tranchelerin CashFlowIndex.tranche_totals çıktısı
+            (include_tail=False). Yapı tamamsa Class B tranchesi kuyrukla
+            birlikte son eleman olarak eklenebilir; getirisi de sayılır.
+        maturity_days: Öndeki tranchelerin vadeleri (gün)
+        reinvest_rates: Öndeki tranchelerin yeniden yatırım oranları
+        nominal_upper_bounds: Öndeki her Class A tranchesi için nominal üst sınırı
+        remaining_cash: Öndeki tranchelerden sonraki toplam nakit akışı
+        class_a_total: Toplam Class A nominali üst sınırı
+        class_b_nominal: Class B nominali üst sınırı
+        class_b_maturity: Class B vadesi (gün)
+        
+    Returns:
+        Class B efektif kupon oranı (%) alt sınırı
+    """
+    if class_b_nominal <= 0 or class_b_maturity <= 0:
+        return 0.0
+    buffer = 0.0
+    cash_flows, reinvest_returns = tranche_totals[0], tranche_totals[1]
+    for i, days in enumerate(maturity_days):
+        if i > 0 and days > maturity_days[i-1]:
+            buffer *= (1 + simple_to_compound_annual(reinvest_rates[i])/100)**(
+                (days - maturity_days[i-1]) / 365
+            )
+        nominal = nominal_upper_bounds[i] if i < len(nominal_upper_bounds) else 0.0
+        buffer += cash_flows[i] + reinvest_returns[i] - nominal
+    
+    coupon = buffer + remaining_cash - (class_a_total - sum(nominal_upper_bounds)) - class_b_nominal
+    return coupon / class_b_nominal * 365 / class_b_maturity * 100
+
+def calculate_tranche_metrics(
+    df: pd.DataFrame,
+    start_date: pd.Timestamp,
+    a_maturities: List[int],
+    a_base_rates: List[float],
+    a_spreads: List[float],
+    a_reinvest_rates: List[float],
+    a_nominals: List[float],
+    b_maturity: int,
+    b_base_rate: float,
+    b_spread: float,
+    b_reinvest_rate: float,
+    b_nominal: float,
+    ops_expenses: float = 0.0,
+    cash_flow_index: Optional[CashFlowIndex] = None,
+    evaluation_context: Optional[TrancheEvaluationContext] = None,
+    cache: Optional[EvaluationCache] = None
+) -> Dict[str, float]:
+    """
+    calculate_tranche_results ile aynı hesaplamayı yapar ancak yalnızca
+    optimizasyonun kullandığı skaler metrikleri döndürür (rapor tablosu,
+    tarih formatlama ve faiz dönüşüm tablosu üretilmez).
+    
+    Args:
+        calculate_tranche_results ile aynı
+        
+    Returns:
+        effective/direct kupon oranı, min buffer, anapara, faiz ve toplam
+        ödeme metriklerini içeren sözlük
+    """
+    all_maturity_days = a_maturities + [b_maturity]
+    all_base_rates = a_base_rates + [b_base_rate]
+    all_spreads = a_spreads + [b_spread]
+    all_reinvest_rates = a_reinvest_rates + [b_reinvest_rate]
+    all_nominals = a_nominals + [b_nominal]
+    
+    cache_key = None
+    if cache is not None:
+        cache_key = tranche_evaluation_key(
+            "metrics", df, start_date, all_maturity_days, all_base_rates,
+            all_spreads, all_reinvest_rates, all_nominals, ops_expenses
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+    
+    tranche_totals, _ = _collect_tranche_totals(
+        df, start_date, all_maturity_days, all_reinvest_rates, ops_expenses, cash_flow_index,
+        evaluation_context
+    )
+    steps = _run_waterfall(
+        tranche_totals, len(a_maturities), all_maturity_days,
+        all_base_rates, all_spreads, all_reinvest_rates, all_nominals
+    )
+    summary = _summarize_waterfall(steps)
+    if cache_key is not None:
+        cache.put(cache_key, dict(summary))
+    return summary
+
+def _run_waterfall_batch(
+    tranche_totals: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    num_a_tranches: int,
+    maturity_days: np.ndarray,
+    base_rates: np.ndarray,
+    spreads: np.ndarray,
+    reinvest_rates: np.ndarray,
+    nominals: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    _run_waterfall + _summarize_waterfall, aday yapılar boyunca vektörel.
+    Buffer, tranche sütunları üzerinde tüm adaylar için aynı anda taşınır;
+    işlem sırası skaler sürümle aynıdır.
+    """
+    cash, reinvest, _, _ = tranche_totals
+    num_candidates, num_tranches = maturity_days.shape
+    days_all = maturity_days.astype(float)
+
+    buffer = np.zeros(num_candidates)
+    zeros = np.zeros(num_candidates)
+    totals = {key: np.zeros(num_candidates) for key in (
+        "class_a_total", "class_b_total", "class_a_principal", "class_b_principal",
+        "class_a_interest", "class_b_coupon"
+    )}
+    min_buffer_actual = np.full(num_candidates, np.inf) if num_a_tranches else zeros.copy()
+    direct_coupon_rate = zeros
+    effective_coupon_rate = zeros
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i in range(num_tranches):
+            days = days_all[:, i]
+
+            # Buffer faiz getirisi hesapla
+            buf_reinv = zeros
+            if i > 0:
+                prev_days = days_all[:, i - 1]
+                factor = (1 + simple_to_compound_annual(reinvest_rates[:, i]) / 100) ** (
+                    (days - prev_days) / 365
+                ) - 1
+                buf_reinv = np.where((buffer > 0) & (days > prev_days), buffer * factor, 0.0)
+
+            # Toplam kullanılabilir nakit
+            available = cash[:, i] + reinvest[:, i] + buffer + buf_reinv
+            nominal = nominals[:, i]
+            total_rate = base_rates[:, i] + spreads[:, i] / 100
+
+            if i < num_a_tranches:
+                disc = np.where(days != 0, 1 / (1 + total_rate / 100 * days / 365), 1.0)
+                principal = nominal * disc
+                total_pay = nominal
+                totals["class_a_total"] += total_pay
+                totals["class_a_principal"] += principal
+                totals["class_a_interest"] += nominal - principal
+            else:
+                principal = np.maximum(0.001, nominal)
+                coupon = np.maximum(0, available - principal)
+                total_pay = principal + coupon
+                has_principal = principal > 0.001
+                direct_coupon_rate = np.where(has_principal, coupon / principal * 100, 0.0)
+                effective_coupon_rate = np.where(
+                    has_principal & (days > 0), coupon / principal * 365 / days * 100, 0.0
+                )
+                totals["class_b_total"] += total_pay
+                totals["class_b_principal"] += principal
+                totals["class_b_coupon"] += coupon
+
+            # Buffer hesapla
+            buffer = np.maximum(0.0, available - total_pay)
+            if i < num_a_tranches:
+                buf_ratio = np.where(nominal != 0, buffer / nominal * 100, 0.0)
+                min_buffer_actual = np.minimum(min_buffer_actual, buf_ratio)
+
+    has_b = num_tranches > num_a_tranches
+    totals.update({
+        "min_buffer_actual": min_buffer_actual,
+        "total_principal_paid": totals["class_a_principal"] + totals["class_b_principal"],
+        "direct_coupon_rate": direct_coupon_rate if has_b else zeros,
+        "effective_coupon_rate": effective_coupon_rate if has_b else zeros,
+    })
+    return totals
+
+def calculate_tranche_metrics_batch(
+    cash_flow_index: CashFlowIndex,
+    start_date: pd.Timestamp,
+    maturity_days: np.ndarray,
+    base_rates: np.ndarray,
+    spreads: np.ndarray,
+    reinvest_rates: np.ndarray,
+    nominals: np.ndarray,
+    num_a_tranches: Optional[int] = None,
+    evaluation_context: Optional[TrancheEvaluationContext] = None
+) -> Dict[str, np.ndarray]:
+    """
+    calculate_tranche_metrics'in çok sayıda aday yapı için tek çağrıda
+    çalışan sürümü.
+
+    Tüm girdiler (aday x tranche) matrisleridir; Class B son sütundur.
+    Nakit akışı dağıtımı ve buffer şelalesi adaylar boyunca vektörel
+    hesaplanır.
+
+    Args:
+        cash_flow_index: prepare_cash_flows ile hazırlanmış veri seti
+        start_date: Başlangıç tarihi
+        maturity_days: Vadeler (gün)
+        base_rates: Baz faiz oranları
+        spreads: Spread değerleri
+        reinvest_rates: Yeniden yatırım oranları
+        nominals: Nominal tutarlar
+        num_a_tranches: Class A tranche sayısı (varsayılan: sütun sayısı - 1)
+        evaluation_context: Tüm adaylar aynı vade/oran vektörünü paylaşıyorsa
+            önceden hesaplanmış tranche toplamları
+
+    Returns:
+        calculate_tranche_metrics ile aynı anahtarlara sahip, her aday için
+        bir değer içeren dizi sözlüğü
+    """
+    maturity_days = np.atleast_2d(np.asarray(maturity_days, dtype=np.int64))
+    shape = maturity_days.shape
+    base_rates, spreads, reinvest_rates, nominals = (
+        np.broadcast_to(np.asarray(values, dtype=float), shape)
+        for values in (base_rates, spreads, reinvest_rates, nominals)
+    )
+    if num_a_tranches is None:
+        num_a_tranches = shape[1] - 1
+
+    if evaluation_context is not None:
+        if not all(
+            evaluation_context.matches(start_date, row_days, row_rates, cash_flow_index.ops_expenses)
+            for row_days, row_rates in zip(maturity_days, reinvest_rates)
+        ):
+            raise ValueError("TrancheEvaluationContext was built for a different maturity/reinvest rate vector")
+        tranche_totals = tuple(
+            np.broadcast_to(np.asarray(column, dtype=float), shape)
+            for column in zip(*evaluation_context.tranche_totals)
+        )
+    else:
+        tranche_totals = cash_flow_index.tranche_totals_batch(start_date, maturity_days, reinvest_rates)
+    return _run_waterfall_batch(
+        tranche_totals, num_a_tranches, maturity_days,
+        base_rates, spreads, reinvest_rates, nominals
+    )
+
+def calculate_tranche_metrics_from_totals(
+    tranche_totals: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    maturity_days: np.ndarray,
+    base_rates: np.ndarray,
+    spreads: np.ndarray,
+    reinvest_rates: np.ndarray,
+    nominals: np.ndarray,
+    num_a_tranches: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Önceden hesaplanmış tranche toplamları için vektörel buffer şelalesi.
+
+    Nakit akışları yapıdan farklı yollarla (ör. stres senaryoları) tranche
+    toplamlarına dönüştürüldüğünde kullanılır; girdiler ve çıktı
+    calculate_tranche_metrics_batch ile aynıdır.
+
+    Args:
+        tranche_totals: (aday x tranche) nakit akışı ve reinvestment getirisi
+            toplamları; anapara ve faiz toplamları şelalede kullanılmaz
+        maturity_days, base_rates, spreads, reinvest_rates, nominals:
+            (aday x tranche) ile yayınlanabilen yapı parametreleri
+        num_a_tranches: Class A tranche sayısı (varsayılan: sütun sayısı - 1)
+
+    Returns:
+        calculate_tranche_metrics ile aynı anahtarlara sahip dizi sözlüğü
+    """
+    shape = np.shape(tranche_totals[0])
+    maturity_days = np.broadcast_to(np.asarray(maturity_days, dtype=np.int64), shape)
+    base_rates, spreads, reinvest_rates, nominals = (
+        np.broadcast_to(np.asarray(values, dtype=float), shape)
+        for values in (base_rates, spreads, reinvest_rates, nominals)
+    )
+    if num_a_tranches is None:
+        num_a_tranches = shape[1] - 1
+    return _run_waterfall_batch(
+        tranche_totals, num_a_tranches, maturity_days,
+        base_rates, spreads, reinvest_rates, nominals
+    )
+
+def calculate_tranche_results(
+    df: pd.DataFrame,
+    start_date: pd.Timestamp,
+    a_maturities: List[int],
+    a_base_rates: List[float],
+    a_spreads: List[float],
+    a_reinvest_rates: List[float],
+    a_nominals: List[float],
+    b_maturity: int,
+    b_base_rate: float,
+    b_spread: float,
+    b_reinvest_rate: float,
+    b_nominal: float,
+    ops_expenses: float = 0.0,
+    cash_flow_index: Optional[CashFlowIndex] = None,
+    evaluation_context: Optional[TrancheEvaluationContext] = None,
+    cache: Optional[EvaluationCache] = None
+) -> Dict[str, Any]:
+    """
+    Hem optimization hem de calculation servislerinde kullanılacak
+    ortak tranche hesaplama mantığını içerir.
+    
+    Args:
+        df: Nakit akışı verileri içeren DataFrame
+        start_date: Başlangıç tarihi
+        a_maturities: Class A vadeleri (gün)
+        a_base_rates: Class A baz faiz oranları
+        a_spreads: Class A spread değerleri
+        a_reinvest_rates: Class A yeniden yatırım oranları
+        a_nominals: Class A nominal değerleri
+        b_maturity: Class B vadesi (gün)
+        b_base_rate: Class B baz faiz oranı
+        b_spread: Class B spread değeri
+        b_reinvest_rate: Class B yeniden yatırım oranı
+        b_nominal: Class B nominal değeri
+        ops_expenses: Operasyon giderleri
+        cash_flow_index: Aynı veri ve operasyon gideriyle kurulmuş CashFlowIndex
+            (verilirse tranche toplamları df taranmadan indeksten okunur)
+        evaluation_context: Aynı vade ve oran vektörü için önceden hesaplanmış
+            tranche toplamları (verilirse yalnızca şelale çalıştırılır)
+        cache: Sonuçların saklandığı EvaluationCache (verilirse aynı veri ve
+            yapı için daha önce hesaplanmış sonucun kopyası döndürülür)
+        
+    Returns:
+        Hesaplanmış sonuçları içeren sözlük
+    """
+    # Tüm parametreleri birleştir
+    all_maturity_days = a_maturities + [b_maturity]
+    all_base_rates = a_base_rates + [b_base_rate]
+    all_spreads = a_spreads + [b_spread]
+    all_reinvest_rates = a_reinvest_rates + [b_reinvest_rate]
+    all_nominals = a_nominals + [b_nominal]
+    
+    cache_key = None
+    if cache is not None:
+        cache_key = tranche_evaluation_key(
+            "results", df, start_date, all_maturity_days, all_base_rates,
+            all_spreads, all_reinvest_rates, all_nominals, ops_expenses
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+    all_maturity_dates = [start_date + pd.Timedelta(days=days) for days in all_maturity_days]
+    
+    tranche_totals, total_loan_principal = _collect_tranche_totals(
+        df, start_date, all_maturity_days, all_reinvest_rates, ops_expenses, cash_flow_index,
+        evaluation_context
+    )
+    
+    # Tranche sonuçlarını hesapla
+    steps = _run_waterfall(
+        tranche_totals, len(a_maturities), all_maturity_days,
+        all_base_rates, all_spreads, all_reinvest_rates, all_nominals
+    )
+    summary = _summarize_waterfall(steps)
+    
+    # Rapor tablosunu oluştur
+    results = []
+    for i, (days, step) in enumerate(zip(all_maturity_days, steps)):
+        is_a = step["is_a"]
+        t_name = f"Class {'A' if is_a else 'B'}{i+1 if is_a else ''}".strip()
         results.append({
             "Tranche": t_name,
             "Start Date": start_date.strftime("%d/%m/%Y"),
@@ -139,49 +641,29 @@ def calculate_tranche_results(
             "Maturity Date": all_maturity_dates[i].strftime("%d/%m/%Y"),
             "Base Rate (%)": all_base_rates[i],
             "Spread (bps)": all_spreads[i],
-            "Total Interest Rate (%)": total_rate,
-            "Coupon Rate (%)": coupon_rate,
-            "Effective Coupon (%)": eff_coupon,
-            "Original Nominal": nominal,
-            "Adjusted Nominal": nominal,
-            "Buffer In": buffer,
-            "Cash Flow Total": c_flow,
-            "Reinvestment Return": r_ret,
-            "Buffer Reinvestment": buf_reinv,
-            "Total Available": available,
-            "Principal": principal,
-            "Interest": interest,
-            "Coupon Payment": coupon,
-            "Nominal Payment": nominal,
-            "Total Payment": total_pay,
-            "Buffer Out": new_buffer,
-            "Buffer Cash Flow Ratio (%)": buf_ratio,
+            "Total Interest Rate (%)": step["total_rate"],
+            "Coupon Rate (%)": step["coupon_rate"],
+            "Effective Coupon (%)": step["eff_coupon"],
+            "Original Nominal": step["nominal"],
+            "Adjusted Nominal": step["nominal"],
+            "Buffer In": step["buffer_in"],
+            "Cash Flow Total": step["cash_flow"],
+            "Reinvestment Return": step["reinvest_return"],
+            "Buffer Reinvestment": step["buffer_reinvest"],
+            "Total Available": step["available"],
+            "Principal": step["principal"],
+            "Interest": step["interest"],
+            "Coupon Payment": step["coupon"],
+            "Nominal Payment": step["nominal"],
+            "Total Payment": step["total_pay"],
+            "Buffer Out": step["buffer_out"],
+            "Buffer Cash Flow Ratio (%)": step["buffer_ratio"],
             "Discount Factor": 1.0,
             "Is Class A": is_a,
         })
-        
-        # Buffer güncelle
-        buffer = new_buffer
     
-    # Sonuçları Class A ve B olarak ayır
-    a_results = [r for r in results if r["Is Class A"]]
-    b_results = [r for r in results if not r["Is Class A"]]
-    
-    # Toplamaları hesapla
-    class_a_principal = sum(r["Principal"] for r in a_results)
-    class_b_principal = sum(r["Principal"] for r in b_results)
-    class_a_interest = sum(r["Interest"] for r in a_results)
-    class_b_coupon = sum(r["Coupon Payment"] for r in b_results)
-    class_a_total = sum(r["Total Payment"] for r in a_results)
-    class_b_total = sum(r["Total Payment"] for r in b_results)
-    
-    # En düşük buffer oranı
-    min_buffer_actual = min(r["Buffer Cash Flow Ratio (%)"] for r in a_results) if a_results else 0.0
-    
-    # Toplam ödenen ve finans maliyeti
-    total_principal_paid = class_a_principal + class_b_principal
-    total_loan_principal = df_temp["principal_amount"].sum()
-    financing_cost = total_principal_paid - total_loan_principal
+    # Finans maliyeti
+    financing_cost = summary["total_principal_paid"] - total_loan_principal
     
     # Faiz oranı dönüşüm bilgileri
     rate_conversions = []
@@ -218,27 +700,26 @@ def calculate_tranche_results(
             "Effective Coupon Rate (%)": eff_coupon_rate,
         })
     
-    # Doğrudan kupon oranı ve efektif kupon oranı
-    direct_coupon_rate = results[-1]["Coupon Rate (%)"] if b_results else 0.0
-    effective_coupon_rate = results[-1]["Effective Coupon (%)"] if b_results else 0.0
-    
     # Sonuçları döndür
-    return {
+    output = {
         "tranche_results": results,
         "interest_rate_conversions": rate_conversions,
-        "class_a_total": class_a_total,
-        "class_b_total": class_b_total,
-        "class_a_principal": class_a_principal,
-        "class_b_principal": class_b_principal,
-        "class_a_interest": class_a_interest,
-        "class_b_coupon": class_b_coupon,
-        "min_buffer_actual": min_buffer_actual,
-        "total_principal_paid": total_principal_paid,
+        "class_a_total": summary["class_a_total"],
+        "class_b_total": summary["class_b_total"],
+        "class_a_principal": summary["class_a_principal"],
+        "class_b_principal": summary["class_b_principal"],
+        "class_a_interest": summary["class_a_interest"],
+        "class_b_coupon": summary["class_b_coupon"],
+        "min_buffer_actual": summary["min_buffer_actual"],
+        "total_principal_paid": summary["total_principal_paid"],
         "total_loan_principal": total_loan_principal,
         "financing_cost": financing_cost,
-        "direct_coupon_rate": direct_coupon_rate,
-        "effective_coupon_rate": effective_coupon_rate
+        "direct_coupon_rate": summary["direct_coupon_rate"],
+        "effective_coupon_rate": summary["effective_coupon_rate"]
     }
+    if cache_key is not None:
+        cache.put(cache_key, copy.deepcopy(output))
+    return output
 
 def simple_to_maturity_compound(simple_rate_percent, days):
     """Convert a simple rate over 'days' to an equivalent annual compounded rate."""
@@ -255,6 +736,292 @@ def overnight_to_annual_compound(simple_rate_percent):
     annual_compound = (1 + daily_rate)**365 - 1
     return annual_compound * 100.0
 
+# Class A nominal ölçekleme çözücüleri
+NOMINAL_SOLVERS = ("heuristic", "newton")
+
+def _record_solver_stats(
+    stats: Optional[Dict[str, Any]],
+    solver: str,
+    evaluations: int,
+    converged: bool,
+    waterfall_passes: Optional[int] = None
+) -> None:
+    """
+    Bir ayarlama çağrısının yakınsama bilgisini stats sözlüğüne ekler.
+    evaluations tam değerlendirmeleri (tranche toplamları + şelale),
+    waterfall_passes sabit toplamlar üzerindeki şelale geçişlerini sayar.
+    """
+    if stats is None:
+        return
+    if waterfall_passes is None:
+        waterfall_passes = evaluations
+    stats["solver"] = solver
+    stats["calls"] = stats.get("calls", 0) + 1
+    stats["converged"] = stats.get("converged", 0) + int(converged)
+    stats["evaluations"] = stats.get("evaluations", 0) + evaluations
+    stats["waterfall_passes"] = stats.get("waterfall_passes", 0) + waterfall_passes
+    stats["max_evaluations"] = max(stats.get("max_evaluations", 0), evaluations)
+    stats["mean_evaluations"] = stats["evaluations"] / stats["calls"]
+
+def merge_solver_stats(stats: Dict[str, Any], other: Optional[Dict[str, Any]]) -> None:
+    """
+    Başka bir stats sözlüğündeki sayaçları stats'a ekler (ör. işçi
+    süreçlerinden dönen ayarlama istatistikleri).
+    """
+    if not other:
+        return
+    stats["solver"] = other.get("solver", stats.get("solver"))
+    for key in ("calls", "converged", "evaluations", "waterfall_passes"):
+        stats[key] = stats.get(key, 0) + other.get(key, 0)
+    stats["max_evaluations"] = max(stats.get("max_evaluations", 0), other.get("max_evaluations", 0))
+    if stats.get("calls"):
+        stats["mean_evaluations"] = stats["evaluations"] / stats["calls"]
+
+def _scaled_class_b_coupon(
+    tranche_totals: List[Tuple[float, float, float, float]],
+    all_maturity_days: List[int],
+    all_reinvest_rates: List[float],
+    base_a_nominals: List[float],
+    class_b_nominal: float,
+    scale: float
+) -> Tuple[float, float, float]:
+    """
+    Class A nominalleri base_a_nominals * scale iken (yuvarlamasız) şelaleyi
+    çalıştırır.
+
+    Nakit akışı dağıtımı nominallerden bağımsız olduğundan Class B kuponu
+    ölçeğin parçalı doğrusal, konveks ve azalan bir fonksiyonudur; türevi
+    buffer zinciri boyunca ileri yönde taşınır.
+
+    Returns:
+        (efektif Class B kupon oranı, ölçeğe göre türevi, minimum Class A buffer oranı)
+    """
+    num_a_tranches = len(base_a_nominals)
+    buffer = 0.0
+    d_buffer = 0.0
+    min_ratio = float('inf') if num_a_tranches else 0.0
+    coupon_rate = 0.0
+    d_coupon_rate = 0.0
+    
+    for i, days in enumerate(all_maturity_days):
+        c_flow, r_ret, _, _ = tranche_totals[i]
+        
+        buf_reinv = 0.0
+        d_buf_reinv = 0.0
+        if i > 0 and buffer > 0 and days > all_maturity_days[i-1]:
+            factor = (1 + simple_to_compound_annual(all_reinvest_rates[i])/100)**(
+                (days - all_maturity_days[i-1]) / 365
+            ) - 1
+            buf_reinv = buffer * factor
+            d_buf_reinv = d_buffer * factor
+        
+        available = c_flow + r_ret + buffer + buf_reinv
+        d_available = d_buffer + d_buf_reinv
+        
+        if i < num_a_tranches:
+            nominal = base_a_nominals[i] * scale
+            remaining = available - nominal
+            buffer = max(0.0, remaining)
+            d_buffer = d_available - base_a_nominals[i] if remaining > 0 else 0.0
+            min_ratio = min(min_ratio, buffer / nominal * 100 if nominal else 0.0)
+        else:
+            principal = max(0.001, class_b_nominal)
+            remaining = available - principal
+            coupon = max(0, remaining)
+            d_coupon = d_available if remaining > 0 else 0.0
+            if principal > 0.001 and days > 0:
+                coupon_rate = coupon / principal * 365 / days * 100
+                d_coupon_rate = d_coupon / principal * 365 / days * 100
+            else:
+                coupon_rate = d_coupon_rate = 0.0
+            buffer = max(0.0, remaining - coupon)
+            d_buffer = 0.0
+    
+    return coupon_rate, d_coupon_rate, min_ratio
+
+def _find_monotone_root(
+    func,
+    lower: float,
+    upper: float,
+    f_lower: float,
+    f_upper: float,
+    d_lower: Optional[float],
+    tolerance: float,
+    max_iterations: int = 50
+) -> Tuple[float, int]:
+    """
+    Azalan bir fonksiyonun [lower, upper] aralığındaki kökü.
+
+    func(x) -> (değer, türev|None) döndürür. Türev varsa ve adım aralık
+    içinde kalıyorsa Newton adımı, aksi halde Illinois (düzeltilmiş regula
+    falsi) adımı atılır. f_lower > 0 > f_upper olmalıdır.
+
+    Returns:
+        (kök; yakınsama olmazsa func >= 0 tarafındaki uç, değerlendirme sayısı)
+    """
+    evaluations = 0
+    x, f_x, d_x = lower, f_lower, d_lower
+    last_side = 0
+    
+    for _ in range(max_iterations):
+        candidate = x - f_x / d_x if d_x is not None and d_x < 0 else None
+        if candidate is None or not (lower < candidate < upper):
+            candidate = (lower * f_upper - upper * f_lower) / (f_upper - f_lower)
+        
+        x = candidate
+        f_x, d_x = func(x)
+        evaluations += 1
+        
+        if abs(f_x) <= tolerance:
+            return x, evaluations
+        if f_x > 0:
+            lower, f_lower = x, f_x
+            # Illinois: aynı uç art arda değişirse diğer ucun ağırlığını yarıla
+            if last_side == 1:
+                f_upper /= 2
+            last_side = 1
+        else:
+            upper, f_upper = x, f_x
+            if last_side == -1:
+                f_lower /= 2
+            last_side = -1
+        
+        if upper - lower <= 1e-12 * upper:
+            break
+    
+    return lower, evaluations
+
+def _adjust_class_a_nominals_newton(
+    df: pd.DataFrame,
+    start_date: pd.Timestamp,
+    a_maturities: List[int],
+    a_nominals: List[float],
+    a_base_rates: List[float],
+    a_spreads: List[float],
+    a_reinvest_rates: List[float],
+    b_maturity: int,
+    b_base_rate: float,
+    b_spread: float,
+    b_reinvest_rate: float,
+    class_b_nominal: float,
+    target_class_b_coupon_rate: float,
+    target_class_b_percent: float,
+    min_buffer: float,
+    ops_expenses: float,
+    max_allowed_diff: float,
+    class_b_percent_deviation: float,
+    evaluation_context: TrancheEvaluationContext,
+    stats: Optional[Dict[str, Any]]
+) -> Tuple[List[float], bool, float]:
+    """
+    adjust_class_a_nominals_for_target_coupon için Newton/Illinois çözücüsü.
+
+    Tranche toplamları evaluation_context'ten okunur; ölçek faktörü, izin
+    verilen aralık
+    (ayarlama sınırları ve Class B yüzde bandı) içinde Class B kuponunun
+    hedefe eşit olduğu nokta olarak bulunur ve buffer kısıtı gerekiyorsa
+    ikinci bir kök ile daraltılır. Sonuç 1000'e yuvarlanıp tam hesapla
+    doğrulanır. Tipik olarak iki tam değerlendirme (toplamlar + doğrulama)
+    ve birkaç ucuz şelale geçişi yeterlidir.
+    """
+    original_a_total = sum(a_nominals)
+    original_proportions = [n / original_a_total for n in a_nominals]
+    base_a_nominals = [original_proportions[i] * original_a_total for i in range(len(a_nominals))]
+    num_a_tranches = len(a_nominals)
+    
+    min_adjustment = 0.001
+    max_adjustment = 3.0
+    min_class_b_percent = max(0.1, target_class_b_percent - class_b_percent_deviation)
+    max_class_b_percent = min(50, target_class_b_percent + class_b_percent_deviation)
+    
+    actual_class_b_percent = (class_b_nominal / (original_a_total + class_b_nominal)) * 100
+    
+    # Class B yüzde bandını ölçek aralığına çevir: B / (A + B) -> A = B * (100 / yüzde - 1)
+    lower = max(min_adjustment, class_b_nominal * (100 / max_class_b_percent - 1) / original_a_total)
+    upper = min(max_adjustment, class_b_nominal * (100 / min_class_b_percent - 1) / original_a_total)
+    if lower > upper:
+        _record_solver_stats(stats, "newton", 0, False, 0)
+        return a_nominals.copy(), False, actual_class_b_percent
+    
+    all_maturity_days = a_maturities + [b_maturity]
+    all_reinvest_rates = a_reinvest_rates + [b_reinvest_rate]
+    tranche_totals, _ = _collect_tranche_totals(
+        df, start_date, all_maturity_days, all_reinvest_rates, ops_expenses, None, evaluation_context
+    )
+    evaluations = 1
+    passes = 0
+    
+    def waterfall(scale):
+        return _scaled_class_b_coupon(
+            tranche_totals, all_maturity_days, all_reinvest_rates,
+            base_a_nominals, class_b_nominal, scale
+        )
+    
+    def coupon_gap(scale):
+        coupon_rate, d_coupon_rate, _ = waterfall(scale)
+        return coupon_rate - target_class_b_coupon_rate, d_coupon_rate
+    
+    def buffer_gap(scale):
+        return waterfall(scale)[2] - min_buffer, None
+    
+    # Kupon ölçekle azalır: uçlarda hedef aşılmıyorsa çözüm uçtadır
+    tolerance = 1e-9 * max(1.0, abs(target_class_b_coupon_rate))
+    coupon_lower, d_lower, buffer_lower = waterfall(lower)
+    coupon_upper, _, _ = waterfall(upper)
+    f_lower = coupon_lower - target_class_b_coupon_rate
+    f_upper = coupon_upper - target_class_b_coupon_rate
+    passes += 2
+    
+    if buffer_lower < min_buffer:
+        # Bandın en küçük Class A tutarında bile buffer yetersiz
+        _record_solver_stats(stats, "newton", evaluations, False, passes)
+        return a_nominals.copy(), False, actual_class_b_percent
+    
+    if f_lower <= 0:
+        scale = lower
+    elif f_upper >= 0:
+        scale = upper
+    else:
+        scale, root_passes = _find_monotone_root(
+            coupon_gap, lower, upper, f_lower, f_upper, d_lower, tolerance
+        )
+        passes += root_passes
+    
+    # Buffer oranı da ölçekle azalır; kısıt ihlal ediliyorsa sınıra kadar geri çekil
+    buffer_at_scale = waterfall(scale)[2]
+    passes += 1
+    if buffer_at_scale < min_buffer:
+        scale, root_passes = _find_monotone_root(
+            buffer_gap, lower, scale, buffer_lower - min_buffer, buffer_at_scale - min_buffer, None, 1e-9
+        )
+        passes += root_passes
+    
+    # 1000'e yuvarla ve tam hesapla doğrula; yuvarlama kısıtı bozarsa içeri doğru bir adım kaydır
+    step = 1000 * num_a_tranches / original_a_total
+    for _ in range(4):
+        nominals = [max(1000, round(n * scale / 1000) * 1000) for n in base_a_nominals]
+        result = calculate_tranche_metrics(
+            df, start_date,
+            a_maturities, a_base_rates, a_spreads, a_reinvest_rates, nominals,
+            b_maturity, b_base_rate, b_spread, b_reinvest_rate, class_b_nominal,
+            ops_expenses, evaluation_context=evaluation_context
+        )
+        evaluations += 1
+        passes += 1
+        
+        class_b_percent = (class_b_nominal / (sum(nominals) + class_b_nominal)) * 100
+        if class_b_percent > max_class_b_percent:
+            scale += step
+        elif class_b_percent < min_class_b_percent or result['min_buffer_actual'] < min_buffer:
+            scale -= step
+        else:
+            success = abs(result['effective_coupon_rate'] - target_class_b_coupon_rate) <= max_allowed_diff
+            _record_solver_stats(stats, "newton", evaluations, success, passes)
+            return nominals, success, class_b_percent
+    
+    _record_solver_stats(stats, "newton", evaluations, False, passes)
+    return a_nominals.copy(), False, actual_class_b_percent
+
 def adjust_class_a_nominals_for_target_coupon(
     df: pd.DataFrame,
     start_date: pd.Timestamp,
@@ -274,7 +1041,11 @@ def adjust_class_a_nominals_for_target_coupon(
     ops_expenses: float = 0.0,
     max_allowed_diff: float = 0.5,
     class_b_percent_deviation: float = 1.0,
-    max_iterations: int = 30
+    max_iterations: int = 30,
+    cash_flow_index: Optional[CashFlowIndex] = None,
+    solver: str = "heuristic",
+    stats: Optional[Dict[str, Any]] = None,
+    evaluation_context: Optional[TrancheEvaluationContext] = None
 ) -> Tuple[List[float], bool, float]:
     """
     Class A nominal miktarlarını hedef Class B kupon oranına ulaşacak şekilde
@@ -300,10 +1071,43 @@ def adjust_class_a_nominals_for_target_coupon(
         max_allowed_diff: İzin verilen maksimum fark
         class_b_percent_deviation: İzin verilen Class B yüzde sapması
         max_iterations: Maksimum iterasyon sayısı
+        cash_flow_index: Her değerlendirmede kullanılacak CashFlowIndex (opsiyonel)
+        solver: "heuristic" (adaptif arama) veya "newton" (2-4 değerlendirmede
+            kesin ölçek faktörü)
+        stats: Verilirse değerlendirme sayısı ve yakınsama bilgisi eklenir
+        evaluation_context: Bu vade/oran vektörü için tranche toplamları
+            (verilmezse bir kez hesaplanır; denemeler yalnızca şelaleyi çalıştırır)
         
     Returns:
         (ayarlanmış_nominal_listesi, başarı_bayrağı, gerçek_class_b_yüzdesi)
     """
+    if solver not in NOMINAL_SOLVERS:
+        raise ValueError(f"Unknown nominal solver: {solver}. Expected one of {NOMINAL_SOLVERS}")
+    
+    # Durdurulan çalışmada ayarlama yapılmaz; çağıran orijinal nominallerle devam eder
+    if should_stop():
+        return list(a_nominals), False, class_b_nominal / (sum(a_nominals) + class_b_nominal) * 100
+    
+    # Sınırları kontrol et
+    b_maturity = max(1, min(365, b_maturity))
+    
+    # Vadeler ve oranlar sabit: tranche toplamları bir kez hesaplanır,
+    # nominal denemeleri yalnızca buffer şelalesini çalıştırır
+    if evaluation_context is None:
+        evaluation_context = TrancheEvaluationContext(
+            df, start_date, a_maturities + [b_maturity], a_reinvest_rates + [b_reinvest_rate],
+            ops_expenses, cash_flow_index
+        )
+    
+    if solver == "newton":
+        return _adjust_class_a_nominals_newton(
+            df, start_date,
+            a_maturities, a_nominals, a_base_rates, a_spreads, a_reinvest_rates,
+            b_maturity, b_base_rate, b_spread, b_reinvest_rate, class_b_nominal,
+            target_class_b_coupon_rate, target_class_b_percent, min_buffer, ops_expenses,
+            max_allowed_diff, class_b_percent_deviation, evaluation_context, stats
+        )
+    
     # Başlangıç parametreleri
     original_a_total = sum(a_nominals)
     original_proportions = [n / original_a_total for n in a_nominals]
@@ -312,20 +1116,18 @@ def adjust_class_a_nominals_for_target_coupon(
     min_adjustment = 0.001  # Orijinalin %0.1'ine kadar düşebilir
     max_adjustment = 3.0    # Orijinalin 3 katına kadar çıkabilir
     
-    # Sınırları kontrol et
-    b_maturity = max(1, min(365, b_maturity))
-    
     # Class B yüzde hesapla
     total_nominal = original_a_total + class_b_nominal
     actual_class_b_percent = (class_b_nominal / total_nominal) * 100
     
     # İlk değerlendirme
-    result = calculate_tranche_results(
+    result = calculate_tranche_metrics(
         df, start_date,
         a_maturities, a_base_rates, a_spreads, a_reinvest_rates, a_nominals,
         b_maturity, b_base_rate, b_spread, b_reinvest_rate, class_b_nominal,
-        ops_expenses
+        ops_expenses, evaluation_context=evaluation_context
     )
+    evaluations = 1
     
     baseline_coupon_rate = result['effective_coupon_rate']
     baseline_min_buffer = result['min_buffer_actual']
@@ -342,12 +1144,13 @@ def adjust_class_a_nominals_for_target_coupon(
         test_nominals = [max(1000, round(n / 1000) * 1000) for n in test_nominals]
         
         # Düzeltilmiş değerleri test et
-        test_result = calculate_tranche_results(
+        test_result = calculate_tranche_metrics(
             df, start_date,
             a_maturities, a_base_rates, a_spreads, a_reinvest_rates, test_nominals,
             b_maturity, b_base_rate, b_spread, b_reinvest_rate, class_b_nominal,
-            ops_expenses
+            ops_expenses, evaluation_context=evaluation_context
         )
+        evaluations += 1
         
         direct_coupon_rate = test_result['effective_coupon_rate']
         direct_min_buffer = test_result['min_buffer_actual']
@@ -364,6 +1167,7 @@ def adjust_class_a_nominals_for_target_coupon(
         
         # Doğrudan yaklaşım yeterince iyiyse kullan
         if direct_min_buffer >= min_buffer and abs(direct_coupon_rate - target_class_b_coupon_rate) <= max_allowed_diff and is_class_b_percent_valid:
+            _record_solver_stats(stats, "heuristic", evaluations, True)
             return test_nominals, True, test_class_b_percent
         
         # Başlangıç ​​değerini ayarla
@@ -402,6 +1206,10 @@ def adjust_class_a_nominals_for_target_coupon(
     
     # İyileştirilmiş adaptif arama döngüsü
     for iteration in range(max_iterations):
+        # İptal veya bütçe aşımında o ana kadarki en iyi sonuçla dön
+        if should_stop():
+            break
+        
         # Mevcut ayarlama faktörünü uygula
         current_nominals = [original_proportions[i] * original_a_total * current_adjustment 
                            for i in range(len(a_nominals))]
@@ -410,12 +1218,13 @@ def adjust_class_a_nominals_for_target_coupon(
         current_nominals = [max(1000, round(n / 1000) * 1000) for n in current_nominals]
         
         # Mevcut ayarlamayı değerlendir
-        result = calculate_tranche_results(
+        result = calculate_tranche_metrics(
             df, start_date,
             a_maturities, a_base_rates, a_spreads, a_reinvest_rates, current_nominals,
             b_maturity, b_base_rate, b_spread, b_reinvest_rate, class_b_nominal,
-            ops_expenses
+            ops_expenses, evaluation_context=evaluation_context
         )
+        evaluations += 1
         
         coupon_rate = result['effective_coupon_rate']
         min_buffer_actual = result['min_buffer_actual']
@@ -500,4 +1309,5 @@ def adjust_class_a_nominals_for_target_coupon(
         if abs(current_adjustment - last_adjustment) < 0.001 and iteration > 10:
             break
     
+    _record_solver_stats(stats, "heuristic", evaluations, success)
     return best_nominals, success, best_class_b_percent
\ No newline at end of file
@@ -0,0 +1,95 @@
+# backend/benchmarks/bench_bayesian.py
+"""
+Structure score against evaluation count for the optimization methods.
+
+All methods run on the same tape. Evaluations are the structure evaluations
+each run requests (evaluation cache lookups, so repeated structures count).
+Scores are the evaluate_params score of the selected structure, the fitness
+the genetic and Bayesian searches maximize. For the Bayesian runs "best at"
+is the evaluation that found the returned structure.
+
+Run from the backend directory:
+    python -m benchmarks.bench_bayesian --budgets 20 40 80
+    python -m benchmarks.bench_bayesian --surrogate ET --seeds 0 1 2
+"""
+import argparse
+import contextlib
+import io
+import logging
+import time
+
+from app.models.input_models import GeneralSettings, OptimizationSettings
+from app.services import optimization_service
+from app.services.optimization_service import (
+    evaluate_params,
+    perform_bayesian_optimization,
+    perform_genetic_optimization,
+    perform_optimization
+)
+from app.utils.cash_flow_utils import build_daily_ledger
+from app.utils.evaluation_cache import evaluation_cache
+from app.utils.rate_curve import RateCurve
+from app.utils.result_cache import ResultCache
+from benchmarks.synthetic_tape import make_loan_tape
+
+
+def structure_score(ledger, general_settings, settings, result):
+    """evaluate_params score of an optimization result."""
+    rate_curve = RateCurve(result.class_a_maturities, result.class_a_rates, result.class_a_reinvest)
+    evaluation = evaluate_params(
+        ledger, general_settings.start_date, result.class_a_maturities, result.class_a_nominals,
+        result.class_b_maturity, rate_curve, result.class_b_rate, result.class_b_reinvest,
+        settings.min_class_b_percent, settings.class_b_percent_deviation,
+        settings.target_class_b_coupon_rate, general_settings.min_buffer,
+        general_settings.operational_expenses
+    )
+    return evaluation["score"]
+
+
+def run(optimize, ledger, general_settings, settings):
+    """Run one optimization and return (result, evaluations, seconds)."""
+    evaluation_cache.clear()
+    before = evaluation_cache.stats()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = optimize(ledger, general_settings, settings)
+    elapsed = time.perf_counter() - started
+    after = evaluation_cache.stats()
+    evaluations = (after["hits"] + after["misses"]) - (before["hits"] + before["misses"])
+    return result, evaluations, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--loans", type=int, default=100_000)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[20, 40, 80])
+    parser.add_argument("--surrogate", default="GP")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--population", type=int, default=50)
+    parser.add_argument("--generations", type=int, default=40)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    # Every run must execute: a stored result would be timed as a speed-up
+    optimization_service.result_cache = ResultCache(None)
+
+    ledger = build_daily_ledger(make_loan_tape(args.loans))
+    general_settings = GeneralSettings(start_date="2025-02-13", operational_expenses=1000.0, min_buffer=5.0)
+
+    print(f"{args.loans:,} loans, {args.surrogate} surrogate")
+    print(f"{'method':>16} {'seed':>5} {'evaluations':>12} {'best at':>8} {'seconds':>9} {'score':>18}")
+    for seed in args.seeds:
+        base = dict(random_seed=seed, population_size=args.population, num_generations=args.generations,
+                    bayesian_surrogate=args.surrogate)
+        runs = [("classic", perform_optimization, OptimizationSettings(**base)),
+                ("genetic", perform_genetic_optimization, OptimizationSettings(**base))]
+        runs += [(f"bayesian/{budget}", perform_bayesian_optimization,
+                  OptimizationSettings(evaluation_budget=budget, **base)) for budget in args.budgets]
+        for name, optimize, settings in runs:
+            result, evaluations, elapsed = run(optimize, ledger, general_settings, settings)
+            score = structure_score(ledger, general_settings, settings, result)
+            best_at = (result.search_stats or {}).get("best_evaluation") or "-"
+            print(f"{name:>16} {seed:>5} {evaluations:>12} {best_at:>8} {elapsed:>9.2f} {score:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
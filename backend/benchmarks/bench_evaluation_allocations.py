@@ -0,0 +1,100 @@
+# backend/benchmarks/bench_evaluation_allocations.py
+"""
+Memory allocated per structure evaluation.
+
+Compares the old per-call pattern (copy the DataFrame and re-apply the
+operational expenses before every evaluation) with the current
+calculate_tranche_metrics paths: without a prepared dataset, and with the
+read-only dataset from prepare_cash_flows shared across evaluations.
+
+Run from the backend directory:
+    python -m benchmarks.bench_evaluation_allocations --loans 100000
+"""
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from app.utils.cash_flow_index import prepare_cash_flows
+from app.utils.tranche_utils import calculate_tranche_metrics
+from benchmarks.synthetic_tape import make_loan_tape
+
+START_DATE = pd.Timestamp("2025-02-13")
+OPS_EXPENSES = 7_835_293.0
+
+STRUCTURE = dict(
+    a_maturities=[61, 120, 182, 274],
+    a_base_rates=[45.6, 44.5, 43.3, 42.5],
+    a_spreads=[0.0, 0.0, 0.0, 0.0],
+    a_reinvest_rates=[40.0, 37.25, 32.5, 32.5],
+    a_nominals=[480e6, 310e6, 375e6, 640e6],
+    b_maturity=300,
+    b_base_rate=0.0,
+    b_spread=0.0,
+    b_reinvest_rate=25.5,
+    b_nominal=450e6,
+)
+
+
+def _evaluate(df, cash_flow_index=None):
+    return calculate_tranche_metrics(
+        df, START_DATE, ops_expenses=OPS_EXPENSES, cash_flow_index=cash_flow_index, **STRUCTURE
+    )
+
+
+def evaluate_with_copy(df):
+    """Evaluation as the optimizers did it before prepare_cash_flows."""
+    df_temp = df.copy()
+    df_temp["cash_flow"] = df_temp["original_cash_flow"].copy()
+    mask = df_temp["installment_date"].dt.date == pd.Timestamp("2025-02-16").date()
+    if mask.any():
+        idx = df_temp[mask].index[0]
+        df_temp.at[idx, "cash_flow"] = max(0, df_temp.at[idx, "cash_flow"] - OPS_EXPENSES)
+    return _evaluate(df_temp)
+
+
+def measure(label, func, repeats):
+    """Peak traced memory and wall time per call, after one warm-up call."""
+    func()
+    peak = 0
+    tracemalloc.start()
+    for _ in range(repeats):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    elapsed = (time.perf_counter() - started) / repeats
+
+    print(f"{label:<32} {peak / 1024:>12,.1f} KiB {elapsed * 1000:>10.3f} ms")
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--loans", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    df = make_loan_tape(args.loans)
+    prepared = prepare_cash_flows(df, OPS_EXPENSES)
+
+    reference = evaluate_with_copy(df)
+    for candidate in (_evaluate(df), _evaluate(df, prepared)):
+        for key, value in reference.items():
+            assert abs(candidate[key] - value) <= 1e-6 * max(1.0, abs(value)), key
+
+    print(f"{args.loans:,} loans, peak allocation and time per evaluation")
+    copied = measure("copy + re-apply ops (old)", lambda: evaluate_with_copy(df), args.repeats)
+    vector = measure("no prepared dataset", lambda: _evaluate(df), args.repeats)
+    shared = measure("prepared dataset", lambda: _evaluate(df, prepared), args.repeats)
+    print(f"reduction vs old: {copied / max(vector, 1):.1f}x without, {copied / max(shared, 1):.1f}x with prepared dataset")
+
+
+if __name__ == "__main__":
+    main()
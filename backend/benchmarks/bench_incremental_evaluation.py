@@ -0,0 +1,109 @@
+# backend/benchmarks/bench_incremental_evaluation.py
+"""
+Cost of one classic-optimizer maturity combination: four nominal
+strategies, each adjusted to the target coupon and then scored.
+
+"recompute" runs the same number of evaluations through
+calculate_tranche_metrics, re-deriving the tranche totals every time as the
+optimizers did before TrancheEvaluationContext; "shared ctx" runs the
+combination with one context, so only the buffer waterfall is repeated.
+
+Run from the backend directory:
+    python -m benchmarks.bench_incremental_evaluation --loans 100000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from app.services.optimization_service import evaluate_params
+from app.utils.cash_flow_index import prepare_cash_flows
+from app.utils.rate_curve import RateCurve
+from app.utils.tranche_utils import (
+    TrancheEvaluationContext,
+    adjust_class_a_nominals_for_target_coupon,
+    calculate_tranche_metrics
+)
+from benchmarks.synthetic_tape import make_loan_tape
+
+START_DATE = pd.Timestamp("2025-02-13")
+OPS_EXPENSES = 7_835_293.0
+MATURITIES = [61, 120, 182, 274]
+BASE_RATES = [45.6, 44.5, 43.3, 42.5]
+REINVEST_RATES = [40.0, 37.25, 32.5, 30.0]
+B_MATURITY, B_BASE_RATE, B_REINVEST_RATE = 330, 42.5, 25.5
+TARGET_COUPON, TARGET_B_PERCENT, MIN_BUFFER = 1000.0, 12.0, 5.0
+STRATEGY_NOMINALS = [
+    [441_250_000] * 4,
+    [167_000_000, 328_000_000, 498_000_000, 772_000_000],
+    [620_000_000, 450_000_000, 400_000_000, 295_000_000],
+    [392_000_000, 510_000_000, 471_000_000, 392_000_000],
+]
+B_NOMINAL = 240_682_000
+
+
+def run_combination(df, prepared, stats=None):
+    context = TrancheEvaluationContext(
+        df, START_DATE, MATURITIES + [B_MATURITY], REINVEST_RATES + [B_REINVEST_RATE],
+        OPS_EXPENSES, prepared
+    )
+    scores = []
+    for nominals in STRATEGY_NOMINALS:
+        adjusted, _, _ = adjust_class_a_nominals_for_target_coupon(
+            df, START_DATE, MATURITIES, nominals, BASE_RATES, [0.0] * 4, REINVEST_RATES,
+            B_MATURITY, B_BASE_RATE, 0.0, B_REINVEST_RATE, B_NOMINAL,
+            TARGET_COUPON, TARGET_B_PERCENT, MIN_BUFFER, OPS_EXPENSES,
+            cash_flow_index=prepared, stats=stats, evaluation_context=context
+        )
+        evaluation = evaluate_params(
+            df, START_DATE, MATURITIES, adjusted, B_MATURITY,
+            RateCurve(MATURITIES, BASE_RATES, REINVEST_RATES),
+            B_BASE_RATE, B_REINVEST_RATE, TARGET_B_PERCENT, 1.0, TARGET_COUPON, MIN_BUFFER,
+            OPS_EXPENSES, cash_flow_index=prepared, evaluation_context=context
+        )
+        scores.append(evaluation["score"])
+    return scores
+
+
+def recompute_evaluations(df, prepared, count):
+    """count full evaluations, each deriving the tranche totals again."""
+    for _ in range(count):
+        calculate_tranche_metrics(
+            df, START_DATE, MATURITIES, BASE_RATES, [0.0] * 4, REINVEST_RATES, STRATEGY_NOMINALS[0],
+            B_MATURITY, B_BASE_RATE, 0.0, B_REINVEST_RATE, B_NOMINAL,
+            OPS_EXPENSES, cash_flow_index=prepared
+        )
+
+
+def timed(func, repeats):
+    func()
+    started = time.perf_counter()
+    for _ in range(repeats):
+        result = func()
+    return (time.perf_counter() - started) / repeats * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--loans", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    df = make_loan_tape(args.loans)
+    prepared = prepare_cash_flows(df, OPS_EXPENSES)
+
+    stats = {}
+    run_combination(df, prepared, stats)
+    # Nominal adjustment evaluations plus one scoring evaluation per strategy
+    evaluations = stats["evaluations"] + len(STRATEGY_NOMINALS)
+
+    print(f"{args.loans:,} loans, {evaluations} evaluations per maturity combination (ms)")
+    print(f"{'dataset':<16} {'recompute':>10} {'shared ctx':>11} {'speed-up':>9}")
+    for label, index in (("DataFrame", None), ("prepared index", prepared)):
+        recompute, _ = timed(lambda: recompute_evaluations(df, index, evaluations), args.repeats)
+        shared, _ = timed(lambda: run_combination(df, index), args.repeats)
+        print(f"{label:<16} {recompute:>10.2f} {shared:>11.2f} {recompute / shared:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
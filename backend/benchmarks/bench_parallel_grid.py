@@ -0,0 +1,72 @@
+# backend/benchmarks/bench_parallel_grid.py
+"""
+Optimizer wall time for different worker process counts.
+
+Every run must select the same structure as the single-process run; the
+speed-up is relative to num_workers=1. Worker start-up (spawn, imports and
+the initializer building the CashFlowIndex) is included in the timings.
+The genetic optimizer runs with a fixed random_seed.
+
+Run from the backend directory:
+    python -m benchmarks.bench_parallel_grid --workers 1 2 4 8 16
+    python -m benchmarks.bench_parallel_grid --method genetic --population 200
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import time
+
+from app.models.input_models import GeneralSettings, OptimizationSettings
+from app.services import optimization_service
+from app.services.optimization_service import perform_genetic_optimization, perform_optimization
+from app.utils.cash_flow_utils import build_daily_ledger
+from app.utils.result_cache import ResultCache
+from benchmarks.synthetic_tape import make_loan_tape
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--loans", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--tranches", type=int, nargs=2, default=[2, 5])
+    parser.add_argument("--maturity-step", type=int, default=10)
+    parser.add_argument("--solver", default="heuristic")
+    parser.add_argument("--method", choices=["classic", "genetic"], default="classic")
+    parser.add_argument("--population", type=int, default=50)
+    parser.add_argument("--generations", type=int, default=40)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    # Every run must execute: a stored result would be timed as a speed-up
+    optimization_service.result_cache = ResultCache(None)
+
+    ledger = build_daily_ledger(make_loan_tape(args.loans))
+    general_settings = GeneralSettings(start_date="2025-02-13", operational_expenses=1000.0, min_buffer=5.0)
+
+    print(f"{args.loans:,} loans, {os.cpu_count()} CPUs, {args.method}, tranches {args.tranches[0]}-{args.tranches[1]}, "
+          f"maturity step {args.maturity_step}, {args.solver} solver")
+    optimize = perform_genetic_optimization if args.method == "genetic" else perform_optimization
+    print(f"{'workers':>8} {'seconds':>9} {'speed-up':>9}")
+    reference = None
+    serial_time = None
+    for num_workers in args.workers:
+        settings = OptimizationSettings(
+            a_tranches_range=args.tranches, maturity_step=args.maturity_step,
+            nominal_solver=args.solver, num_workers=num_workers,
+            population_size=args.population, num_generations=args.generations, random_seed=0
+        )
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = optimize(ledger, general_settings, settings)
+        elapsed = time.perf_counter() - started
+
+        structure = (result.best_strategy, result.class_a_maturities, result.class_a_nominals, result.class_b_nominal)
+        if reference is None:
+            reference, serial_time = structure, elapsed
+        assert structure == reference, f"{num_workers} workers selected a different structure"
+        print(f"{num_workers:>8} {elapsed:>9.2f} {serial_time / elapsed:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# backend/benchmarks/synthetic_tape.py
+"""
+Synthetic loan tapes for the benchmarks, shaped like load_excel_data output.
+"""
+import numpy as np
+import pandas as pd
+
+from app.utils.finance_utils import calculate_reinvestment_dates
+
+
+def make_loan_tape(n_loans: int = 100_000, seed: int = 0,
+                   start_date: str = "2025-02-13", horizon_days: int = 330,
+                   scale: float = 4.0) -> pd.DataFrame:
+    """Random loan-level tape with installments spread over horizon_days."""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp(start_date) + pd.to_timedelta(rng.integers(-5, horizon_days, n_loans), unit="D")
+    principal = (rng.uniform(1000, 50000, n_loans) * scale).round(2)
+    interest = (principal * rng.uniform(0.01, 0.2, n_loans)).round(2)
+
+    df = pd.DataFrame({
+        "installment_date": dates,
+        "principal_amount": principal,
+        "interest_amount": interest,
+    })
+    df["cash_flow"] = df["principal_amount"] + df["interest_amount"]
+    df["original_cash_flow"] = df["cash_flow"].copy()
+    df["reinvest_date"] = calculate_reinvestment_dates(df["installment_date"])
+    return df
@@ -30,6 +30,10 @@ const OptimizationProgress = ({ isOptimizing, onComplete }) => {
   const [lastProgressUpdate, setLastProgressUpdate] = useState(Date.now());
   const [lastProgressValue, setLastProgressValue] = useState(0);
   const [errorOccurred, setErrorOccurred] = useState(false);
+  const [bestCouponRate, setBestCouponRate] = useState(null);
+  const [bestClassBPercent, setBestClassBPercent] = useState(null);
+  // Falls back to polling when the progress stream is unavailable
+  const [streamFailed, setStreamFailed] = useState(typeof window === 'undefined' || !window.EventSource);
   
   // Start polling when optimization starts
   useEffect(() => {
@@ -44,6 +48,9 @@ const OptimizationProgress = ({ isOptimizing, onComplete }) => {
       setLastProgressUpdate(Date.now());
       setLastProgressValue(0);
       setErrorOccurred(false);
+      setBestCouponRate(null);
+      setBestClassBPercent(null);
+      setStreamFailed(typeof window === 'undefined' || !window.EventSource);
     } else if (!isOptimizing && pollingActive) {
       console.log("Stopping optimization progress polling");
       setPollingActive(false);
@@ -60,11 +67,55 @@ const OptimizationProgress = ({ isOptimizing, onComplete }) => {
     }
   };
   
-  // Polling effect
+  // Progress stream effect: the server pushes updates (at most 5 per second)
+  useEffect(() => {
+    if (!pollingActive || streamFailed) {
+      return undefined;
+    }
+    
+    const source = new EventSource(`${API_URL}/optimize/progress/stream?max_rate=5`);
+    
+    source.addEventListener('progress', (event) => {
+      const data = JSON.parse(event.data);
+      
+      setProgress(data.progress);
+      setPhase(data.phase);
+      setMessage(data.message);
+      setBestCouponRate(data.best_coupon_rate);
+      setBestClassBPercent(data.best_class_b_percent);
+      setLastProgressUpdate(Date.now());
+      setLastProgressValue(data.progress);
+      setStuckDetected(false);
+      
+      if (data.phase === 'Error') {
+        setErrorOccurred(true);
+      }
+      
+      // If progress is 100%, notify parent component
+      if (data.progress >= 100) {
+        console.log("Optimization completed (progress 100%)");
+        source.close();
+        setPollingActive(false);
+        if (onComplete) {
+          onComplete();
+        }
+      }
+    });
+    
+    source.onerror = (error) => {
+      console.error('Progress stream unavailable, falling back to polling:', error);
+      source.close();
+      setStreamFailed(true);
+    };
+    
+    return () => source.close();
+  }, [pollingActive, streamFailed, onComplete]);
+  
+  // Polling effect, used when the progress stream is not available
   useEffect(() => {
     let intervalId;
     
-    if (pollingActive) {
+    if (pollingActive && streamFailed) {
       // Poll every second
       intervalId = setInterval(async () => {
         try {
@@ -92,6 +143,8 @@ const OptimizationProgress = ({ isOptimizing, onComplete }) => {
             setProgress(data.progress);
             setPhase(data.phase);
             setMessage(data.message);
+            setBestCouponRate(data.best_coupon_rate);
+            setBestClassBPercent(data.best_class_b_percent);
             setLastProgressUpdate(Date.now());
             
             if (hasProgressChanged) {
@@ -135,7 +188,7 @@ const OptimizationProgress = ({ isOptimizing, onComplete }) => {
         clearInterval(intervalId);
       }
     };
-  }, [pollingActive, onComplete, progress, message, pollCount, lastProgressUpdate, lastProgressValue]);
+  }, [pollingActive, streamFailed, onComplete, progress, message, pollCount, lastProgressUpdate, lastProgressValue]);
   
   // Auto-complete if we've been at 100% for a while
   useEffect(() => {
@@ -231,6 +284,22 @@ const OptimizationProgress = ({ isOptimizing, onComplete }) => {
             {progress}%
           </Typography>
         </Box>
+        {bestCouponRate != null && (
+          <Box sx={{ display: 'flex', gap: 1, mt: 1 }}>
+            <Chip 
+              label={`Best coupon rate: ${bestCouponRate.toFixed(2)}%`} 
+              size="small" 
+              variant="outlined"
+            />
+            {bestClassBPercent != null && (
+              <Chip 
+                label={`Class B: ${bestClassBPercent.toFixed(2)}%`} 
+                size="small" 
+                variant="outlined"
+              />
+            )}
+          </Box>
+        )}
       </Box>
       
       <Divider sx={{ my: 1 }} />
@@ -72,7 +72,8 @@ const strategyNames = {
   decreasing: "Decreasing by Maturity",
   middle_weighted: "Middle-Weighted",
   classic: "Standard Optimization",
-  genetic: "Evolutionary Algorithm"
+  genetic: "Evolutionary Algorithm",
+  bayesian: "Bayesian Optimization (Experimental)"
 };
 
 const OptimizationResults = ({ results }) => {
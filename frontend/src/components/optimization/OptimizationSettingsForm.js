@@ -35,6 +35,7 @@ import TrendingDownIcon from '@mui/icons-material/TrendingDown';
 import EqualizerIcon from '@mui/icons-material/Equalizer';
 import SpeedIcon from '@mui/icons-material/Speed';
 import GridOnIcon from '@mui/icons-material/GridOn';
+import InsightsIcon from '@mui/icons-material/Insights';
 
 const OptimizationSettingsForm = ({ values, onChange }) => {
   const theme = useTheme();
@@ -123,6 +124,12 @@ const OptimizationSettingsForm = ({ values, onChange }) => {
       icon: <AccountTreeIcon sx={{ fontSize: 36, color: darkBlueColors.secondary }} />,
       description: "Uses advanced genetic algorithms to intelligently search for optimal structures",
       color: darkBlueColors.secondary
+    },
+    bayesian: {
+      title: "Bayesian Optimization (Experimental)",
+      icon: <InsightsIcon sx={{ fontSize: 36, color: darkBlueColors.success }} />,
+      description: "Experimental: learns a surrogate model of the score to find good structures in few evaluations; the evolutionary algorithm reaches higher scores",
+      color: darkBlueColors.success
     }
   };
 
@@ -600,6 +607,57 @@ const OptimizationSettingsForm = ({ values, onChange }) => {
           </Box>
         )}
         
+        {optimizationMethod === 'bayesian' && (
+          <Box sx={{ mt: 3 }}>
+            <Typography 
+              variant="subtitle2" 
+              gutterBottom 
+              fontWeight="medium" 
+              sx={{ color: darkBlueColors.textPrimary }}
+            >
+              Bayesian Optimization Settings
+            </Typography>
+            
+            <FormControl fullWidth sx={{ mb: 4 }}>
+              <FormLabel sx={{ color: darkBlueColors.textPrimary }}>Evaluation Budget</FormLabel>
+              <Slider
+                value={values.evaluation_budget || 60}
+                onChange={(e, newValue) => onChange({ ...values, evaluation_budget: newValue })}
+                min={10}
+                max={200}
+                step={10}
+                valueLabelDisplay="auto"
+                marks={[
+                  { value: 10, label: '10' },
+                  { value: 60, label: '60' },
+                  { value: 200, label: '200' },
+                ]}
+                sx={{ 
+                  color: darkBlueColors.success,
+                  '& .MuiSlider-markLabel': {
+                    color: darkBlueColors.textSecondary,
+                  },
+                  '& .MuiSlider-thumb': {
+                    boxShadow: `0 0 0 2px ${darkBlueColors.cardBackground}, 0 0 0 4px ${alpha(darkBlueColors.success, 0.8)}`,
+                  },
+                  '& .MuiSlider-rail': {
+                    backgroundColor: alpha(darkBlueColors.textSecondary, 0.3),
+                  },
+                  '& .MuiSlider-track': {
+                    backgroundColor: darkBlueColors.success,
+                  },
+                  '& .MuiSlider-valueLabel': {
+                    backgroundColor: darkBlueColors.success,
+                  },
+                }}
+              />
+              <Typography variant="body2" sx={{ color: darkBlueColors.textSecondary }}>
+                Number of structures evaluated - each evaluation refines the surrogate model
+              </Typography>
+            </FormControl>
+          </Box>
+        )}
+        
         <Divider sx={{ my: 3, borderColor: alpha(darkBlueColors.divider, 0.7) }} />
         
         {/* Common settings for all optimization methods - İsteğe göre metin değişiklikleri burada yapıldı */}
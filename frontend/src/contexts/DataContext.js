@@ -112,6 +112,7 @@ export const DataProvider = ({ children }) => {
     additional_days_for_class_b: 10,
     population_size: 50,
     num_generations: 40,
+    evaluation_budget: 60,
   });
 
   /* -------------- originals for <Reset> -------------- */
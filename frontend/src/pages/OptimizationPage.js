@@ -47,7 +47,7 @@ const OptimizationPage = () => {
   const [activeStep, setActiveStep] = useState(0);
 
   const methodName = (m) =>
-    ({ classic: 'Standard Optimization', genetic: 'Evolutionary Algorithm' }[m] ||
+    ({ classic: 'Standard Optimization', genetic: 'Evolutionary Algorithm', bayesian: 'Bayesian Optimization (Experimental)' }[m] ||
     m);
 
   /* --------------------- Form change -------------------- */
@@ -47,7 +47,7 @@ import SettingsIcon from '@mui/icons-material/Settings';
 import CompareIcon from '@mui/icons-material/Compare';
 import { useData } from '../contexts/DataContext';
 import { useNavigate } from 'react-router-dom';
-import { runStressTest } from '../services/apiService';
+import { runStressTest, runStressGrid } from '../services/apiService';
 
 // Import Recharts components
 import {
@@ -714,8 +714,31 @@ const StressTestingPage = () => {
       // Debug: Log the complete request payload
       console.log('FULL REQUEST PAYLOAD:', JSON.stringify(requestParams, null, 2));
       
+      // Sensitivity lines: NPL and prepayment swept around the selected scenario
+      const sensitivitySteps = 11;
+      const fixedAxis = (value) => ({ start: value, stop: value, steps: 1 });
+      const sweepAxis = (value, floor) => ({
+        start: 0,
+        stop: Math.min(100, Math.max(floor, value * 2)),
+        steps: sensitivitySteps
+      });
+      
       // Call the API
-      const response = await runStressTest(requestParams);
+      const [response, nplGrid, prepaymentGrid] = await Promise.all([
+        runStressTest(requestParams),
+        runStressGrid({
+          structure: formattedStructure,
+          npl_rate: sweepAxis(nplRate, 10),
+          prepayment_rate: fixedAxis(prepaymentRate),
+          reinvestment_shift: fixedAxis(reinvestmentShift)
+        }),
+        runStressGrid({
+          structure: formattedStructure,
+          npl_rate: fixedAxis(nplRate),
+          prepayment_rate: sweepAxis(prepaymentRate, 50),
+          reinvestment_shift: fixedAxis(reinvestmentShift)
+        })
+      ]);
       
       console.log('Received stress test response:', response);
       
@@ -749,8 +772,16 @@ const StressTestingPage = () => {
           }
         ],
         sensitivityAnalysis: {
-          npl: [],
-          prepayment: [],
+          npl: nplGrid.npl_rates.map((value, i) => ({
+            value,
+            modeled: nplGrid.baseline.class_b_coupon_rate,
+            realized: nplGrid.class_b_coupon_rate[i][0][0]
+          })),
+          prepayment: prepaymentGrid.prepayment_rates.map((value, j) => ({
+            value,
+            modeled: prepaymentGrid.baseline.class_b_coupon_rate,
+            realized: prepaymentGrid.class_b_coupon_rate[0][j][0]
+          })),
           reinvestment: []
         },
         combinedScenarios: []
@@ -21,11 +21,15 @@ const apiClient = axios.create({
 /**
  * Excel dosyası yükle
  * @param {File} file
+ * @param {string[]|null} [holidays=null] – ek tatil günleri (YYYY-MM-DD)
  * @returns {Promise<Object>}
  */
-const uploadFile = async (file) => {
+const uploadFile = async (file, holidays = null) => {
   const formData = new FormData();
   formData.append('file', file);
+  if (holidays && holidays.length > 0) {
+    formData.append('holidays', holidays.join(','));
+  }
 
   try {
     console.log('Uploading file:', file.name);
@@ -100,10 +104,10 @@ const calculateResults = async (params, optResult = null) => {
 /* --------------------------------------------------------------------- */
 
 /**
- * Yapı optimizasyonu (classic | genetic)
+ * Yapı optimizasyonu (classic | genetic | bayesian)
  *
  * @param {Object} params – OptimizationRequest gövdesi
- * @param {'classic'|'genetic'} [method='classic']
+ * @param {'classic'|'genetic'|'bayesian'} [method='classic']
  * @returns {Promise<Object>}
  */
 const optimizeStructure = async (params, method = 'classic') => {
@@ -140,6 +144,10 @@ const optimizeStructure = async (params, method = 'classic') => {
 
     if (axios.isCancel(error)) {
       console.log('Request canceled:', error.message);
+      // İstemci tarafı iptal sunucudaki çalışmayı durdurmaz; sunucuya da bildir
+      apiClient.post('/optimize/cancel/').catch((cancelError) =>
+        console.error('Error cancelling optimization on the server:', cancelError)
+      );
       throw new Error(
         'Optimization process was canceled: ' + error.message
       );
@@ -230,6 +238,54 @@ const runStressTest = async (params) => {
   }
 };
 
+// Senaryo ızgarası: npl_rate / prepayment_rate / reinvestment_shift eksenleri
+// ({ start, stop, steps }) için yoğun [npl][prepayment][shift] dizileri döner
+const runStressGrid = async (params) => {
+  try {
+    const response = await apiClient.post('/stress-test/grid', params);
+    return response.data;
+  } catch (error) {
+    console.error('Error running stress grid:', error);
+    if (error.response) {
+      console.error('Response status:', error.response.status);
+      console.error('Response data:', error.response.data);
+    }
+    throw error;
+  }
+};
+
+// Monte Carlo: npl_rate / prepayment_rate / reinvestment_shift dağılımlarından
+// (fixed | uniform | normal | triangular) tohumlu yollar; P1/P5/P50 ve ihlal olasılığı döner
+const runMonteCarloStress = async (params) => {
+  try {
+    const response = await apiClient.post('/stress-test/monte-carlo', params);
+    return response.data;
+  } catch (error) {
+    console.error('Error running Monte Carlo stress test:', error);
+    if (error.response) {
+      console.error('Response status:', error.response.status);
+      console.error('Response data:', error.response.data);
+    }
+    throw error;
+  }
+};
+
+// Break-even: min_buffer eşiği ya da sıfır Class B kuponuna kadar dayanılabilen
+// NPL / erken ödeme / reinvestment kayması seviyeleri
+const runBreakevenAnalysis = async (params) => {
+  try {
+    const response = await apiClient.post('/stress-test/breakeven', params);
+    return response.data;
+  } catch (error) {
+    console.error('Error running break-even analysis:', error);
+    if (error.response) {
+      console.error('Response status:', error.response.status);
+      console.error('Response data:', error.response.data);
+    }
+    throw error;
+  }
+};
+
 /* --------------------------------------------------------------------- */
 /*                                EXPORT                                 */
 /* --------------------------------------------------------------------- */
@@ -240,4 +296,7 @@ export {
   optimizeStructure,
   pollOptimizationProgress,
   runStressTest,
+  runStressGrid,
+  runMonteCarloStress,
+  runBreakevenAnalysis,
 };
\ No newline at end of file